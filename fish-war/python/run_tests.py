@@ -13,6 +13,28 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 # テストモジュールをインポート
 from tests.test_board_game_logic import TestBoardGameLogic
 from tests.test_board_game_logic_maguro import TestMaguroVictory
+from tests.test_board_game_bitboard import TestBitboard
+from tests.test_board_game_session import TestGameSession
+from tests.test_board_game_zobrist import TestZobrist
+from tests.test_board_game_tablebase import TestTablebase
+from tests.test_board_game_search import TestSearch
+from tests.test_board_game_mcts import TestMCTS
+from tests.test_self_play import TestSelfPlay
+from tests.test_batch_game import TestBatchCorpus
+from tests.test_board_game_move_codec import TestMoveCodec
+from tests.test_board_game_record import TestGameRecord
+from tests.test_board_game_position_index import TestPositionIndex
+from tests.test_board_game_batch import TestBatchEngine
+from tests.test_benchmark import TestBenchmark
+from tests.test_board_game_instrumentation import TestInstrumentation
+from tests.test_board_game_persistent import TestPersistentState
+from tests.test_board_game_types import TestFlyweightTypes
+from tests.test_game_server import TestGameServer
+from tests.test_board_game_replay import TestReplayCursor
+from tests.test_board_game_transition_cache import TestTransitionCache
+from tests.test_board_game_symmetry import TestSymmetry
+from tests.test_game_engine import TestGameEngine
+from tests.test_game_analysis import TestGameAnalysis
 
 def run_tests():
     """テストを実行"""
@@ -23,6 +45,28 @@ def run_tests():
     # テストクラスを追加
     suite.addTests(loader.loadTestsFromTestCase(TestBoardGameLogic))
     suite.addTests(loader.loadTestsFromTestCase(TestMaguroVictory))
+    suite.addTests(loader.loadTestsFromTestCase(TestBitboard))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameSession))
+    suite.addTests(loader.loadTestsFromTestCase(TestZobrist))
+    suite.addTests(loader.loadTestsFromTestCase(TestTablebase))
+    suite.addTests(loader.loadTestsFromTestCase(TestSearch))
+    suite.addTests(loader.loadTestsFromTestCase(TestMCTS))
+    suite.addTests(loader.loadTestsFromTestCase(TestSelfPlay))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchCorpus))
+    suite.addTests(loader.loadTestsFromTestCase(TestMoveCodec))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameRecord))
+    suite.addTests(loader.loadTestsFromTestCase(TestPositionIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmark))
+    suite.addTests(loader.loadTestsFromTestCase(TestInstrumentation))
+    suite.addTests(loader.loadTestsFromTestCase(TestPersistentState))
+    suite.addTests(loader.loadTestsFromTestCase(TestFlyweightTypes))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameServer))
+    suite.addTests(loader.loadTestsFromTestCase(TestReplayCursor))
+    suite.addTests(loader.loadTestsFromTestCase(TestTransitionCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestSymmetry))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameAnalysis))
     
     # テストを実行
     runner = unittest.TextTestRunner(verbosity=2)
@@ -2,13 +2,25 @@
 """
 おさかな対戦 - バッチ実行
 コマンドライン引数で棋譜を受け取って実行
+--corpus を指定すると1行1局の棋譜ファイル（- なら標準入力）を一括で検証する
 """
 
+import argparse
+import json
+import os
 import sys
+from itertools import islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
 from board_game_logic import (
     initialize_game, get_board_text, get_game_info_text,
-    parse_move, make_move
+    parse_move, make_move, apply_move
 )
+from parallel_utils import ordered_map
+import board_game_instrumentation
+
+
+DEFAULT_CHUNK_SIZE = 256
 
 
 def run_batch_game(moves):
@@ -67,14 +79,106 @@ def run_batch_game(moves):
         print("ゲームは継続中です。")
 
 
+def replay_record(line_number: int, line: str) -> dict:
+    """1局分の棋譜（空白区切りの手）を再生し、結果または最初のエラーを返す"""
+    game_state = initialize_game()
+    moves = line.split()
+    for ply, move_str in enumerate(moves):
+        move = parse_move(move_str)
+        if not move:
+            return {'line': line_number, 'ply': ply, 'move': move_str, 'error': f"無効な手 '{move_str}'"}
+        
+        _, error = apply_move(game_state, move)
+        if error:
+            return {'line': line_number, 'ply': ply, 'move': move_str, 'error': error}
+    
+    return {'line': line_number, 'plies': len(moves), 'result': game_state.game_result}
+
+
+def _replay_chunk(task: Tuple[List[Tuple[int, str]], bool]) -> Tuple[int, str, Optional[dict]]:
+    """(チャンク, 計測するか) の複数局をまとめて再生し、(局数, JSONL文字列, 計測結果) を返す
+    （プロセス間通信の回数を減らすため）
+
+    計測の指定はタスクで渡す（spawn で起動したワーカーは呼び出し元の enable() を引き継がない）。
+    """
+    chunk, instrument = task
+    if instrument:
+        board_game_instrumentation.enable()
+    text = ''.join(
+        json.dumps(replay_record(line_number, line), ensure_ascii=False) + '\n'
+        for line_number, line in chunk
+    )
+    # 計測が有効ならこのチャンクの分を呼び出し元に返す（ワーカープロセスの結果も集計するため）
+    stats = None
+    if instrument:
+        stats = board_game_instrumentation.snapshot()
+        board_game_instrumentation.reset()
+    return len(chunk), text, stats
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Tuple[int, str]]]:
+    """空行を除いた棋譜を (行番号, 行) のチャンクに分けて順に返す"""
+    records = (
+        (line_number, line)
+        for line_number, line in enumerate(lines, 1)
+        if line.strip()
+    )
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_corpus(lines: Iterable[str], output: IO[str], workers: int = 1,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """棋譜コーパスを読みながら検証し、1局1行のJSONLを入力順に書き出す（処理した局数を返す）
+
+    読み込みと結果の保持は実行中のチャンク分だけなので、メモリ使用量はコーパスの大きさに依存しない。
+    """
+    games = 0
+    instrument = board_game_instrumentation.is_enabled()
+    tasks = ((chunk, instrument) for chunk in _chunks(lines, chunk_size))
+    for count, text, stats in ordered_map(_replay_chunk, tasks, workers):
+        output.write(text)
+        games += count
+        if stats:
+            board_game_instrumentation.merge(stats)
+    return games
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("使用方法: python batch_game.py <手1> <手2> ...")
-        print("例: python batch_game.py \"い↑B3B2\" \"い↓B1B2\" \"た→C3C2\"")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="おさかな対戦 バッチ実行")
+    parser.add_argument('moves', nargs='*', help="手（例: \"い↑B3B2\" \"い↓B1B2\" \"た→C3C2\"）")
+    parser.add_argument('--corpus', help="1行1局の棋譜ファイル（- なら標準入力）を一括で検証する")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="--corpus の並列プロセス数")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="--corpus の1タスクあたりの局数")
+    # --profile（または環境変数 FISH_WAR_INSTRUMENT=1）で各段階の処理時間を終了時に表示する
+    parser.add_argument('--profile', nargs='?', const='text', choices=('text', 'json'),
+                        help="各段階の処理時間を終了時に標準エラー出力に表示する（json ならJSONで表示）")
+    args = parser.parse_args()
+    
+    if args.corpus is None and not args.moves:
+        parser.error("手または --corpus を指定してください")
+    if args.corpus is not None and args.moves:
+        parser.error("--corpus と手は同時に指定できません")
+    if args.profile:
+        board_game_instrumentation.enable()
     
-    moves = sys.argv[1:]
-    run_batch_game(moves)
+    try:
+        if args.corpus is None:
+            run_batch_game(args.moves)
+        elif args.corpus == '-':
+            run_corpus(sys.stdin, sys.stdout, args.workers, args.chunk_size)
+        else:
+            with open(args.corpus, encoding='utf-8') as f:
+                run_corpus(f, sys.stdout, args.workers, args.chunk_size)
+    finally:
+        if board_game_instrumentation.is_enabled():
+            if args.profile == 'json':
+                print(board_game_instrumentation.report_json(), file=sys.stderr)
+            else:
+                print(board_game_instrumentation.format_report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
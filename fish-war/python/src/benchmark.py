@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - ベンチマーク
+perft（指定手数までの局面数）と主要な処理のマイクロベンチマークを計測し、
+JSONの基準値と比較して遅くなった処理を検出する
+
+    python3 src/benchmark.py run --output benchmarks/baseline.json
+    python3 src/benchmark.py compare benchmarks/baseline.json --threshold 0.25
+    python3 src/benchmark.py perft --depth 5
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from board_game_types import GameState, Move
+from board_game_logic import (
+    initialize_game, parse_move, format_move, validate_move, make_move, apply_move, undo_move,
+    generate_legal_moves, get_board_hash, check_for_draw, parse_position_text
+)
+from batch_game import replay_record
+
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+
+# perft の対象局面（初期局面と、シード付きランダム対局の途中局面）
+PERFT_POSITIONS: Dict[str, str] = {
+    'initial': '',
+    'turn9': 'かsまsたs00000000たfかf00まf00 first - いい 9',
+    'turn17': '00かsたs00まsたf00まfかf000000 first い い 17',
+    'turn25': 'まsかsたs0000たf0000まfいsかf00 first い - 25',
+}
+PERFT_DEPTHS = {'initial': 7, 'turn9': 6, 'turn17': 5, 'turn25': 6}
+
+
+def perft_position(name: str) -> GameState:
+    """perft の対象局面を作成"""
+    text = PERFT_POSITIONS[name]
+    return parse_position_text(text) if text else initialize_game()
+
+
+def perft(game_state: GameState, depth: int) -> int:
+    """depth 手先の局面数を数える（終局した局面からは先へ進まない）"""
+    if depth == 0:
+        return 1
+    moves = generate_legal_moves(game_state)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        record, _ = apply_move(game_state, move)
+        nodes += perft(game_state, depth - 1)
+        undo_move(game_state, record)
+    return nodes
+
+
+def _sample_states(count: int, seed: int = 0) -> List[GameState]:
+    """シード付きランダム対局から局面を集める"""
+    rng = random.Random(seed)
+    states = []
+    game_state = initialize_game()
+    while len(states) < count:
+        game_state, _ = make_move(game_state, rng.choice(generate_legal_moves(game_state)))
+        if game_state.game_result:
+            game_state = initialize_game()
+        else:
+            states.append(game_state)
+    return states
+
+
+def _sample_corpus(count: int, seed: int = 0, max_plies: int = 100) -> List[str]:
+    """シード付きランダム対局の棋譜（1行1局）を作成"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        game_state = initialize_game()
+        moves = []
+        while game_state.game_result is None and len(moves) < max_plies:
+            move = rng.choice(generate_legal_moves(game_state))
+            moves.append(format_move(move))
+            apply_move(game_state, move)
+        lines.append(' '.join(moves))
+    return lines
+
+
+def _time_per_op(operation: Callable[[], int], repeat: int) -> float:
+    """operation（処理した件数を返す）を repeat 回実行し、1件あたりの最短時間（ナノ秒）を返す"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        count = operation()
+        best = min(best, (time.perf_counter_ns() - start) / count)
+    return best
+
+
+def _micro_benchmarks(scale: int) -> Dict[str, Callable[[], int]]:
+    """マイクロベンチマークの一覧（名前 → 処理した件数を返す関数）"""
+    states = _sample_states(200)
+    pairs: List[Tuple[GameState, Move]] = [
+        (state, move) for state in states for move in generate_legal_moves(state)
+    ]
+    move_texts = [format_move(move) for _, move in pairs]
+    corpus = _sample_corpus(20 * scale)
+
+    def parse_moves() -> int:
+        for _ in range(scale):
+            for text in move_texts:
+                parse_move(text)
+        return scale * len(move_texts)
+
+    def validate_moves() -> int:
+        for _ in range(scale):
+            for state, move in pairs:
+                validate_move(state, move)
+        return scale * len(pairs)
+
+    def make_moves() -> int:
+        for state, move in pairs[:200 * scale]:
+            make_move(state, move)
+        return min(len(pairs), 200 * scale)
+
+    def copy_states() -> int:
+        for _ in range(scale):
+            for state in states:
+                state.copy()
+        return scale * len(states)
+
+    def board_hashes() -> int:
+        for _ in range(5 * scale):
+            for state in states:
+                get_board_hash(state.board)
+        return 5 * scale * len(states)
+
+    def draw_checks() -> int:
+        for _ in range(20 * scale):
+            for state in states:
+                check_for_draw(state)
+        return 20 * scale * len(states)
+
+    def replay_corpus() -> int:
+        for line_number, line in enumerate(corpus, 1):
+            replay_record(line_number, line)
+        return len(corpus)
+
+    return {
+        'parse_move': parse_moves,
+        'validate_move': validate_moves,
+        'make_move': make_moves,
+        'game_state_copy': copy_states,
+        'get_board_hash': board_hashes,
+        'check_for_draw': draw_checks,
+        'corpus_replay_per_game': replay_corpus,
+    }
+
+
+def run_benchmarks(quick: bool = False, repeat: int = 5, only: Optional[List[str]] = None,
+                   report: Optional[Callable[[str, dict], None]] = None) -> dict:
+    """全ベンチマークを実行して結果の辞書を返す"""
+    scale = 1 if quick else 5
+    results = {}
+
+    for name, operation in _micro_benchmarks(scale).items():
+        if only and name not in only:
+            continue
+        results[name] = {'ns_per_op': round(_time_per_op(operation, repeat), 1)}
+        if report:
+            report(name, results[name])
+
+    for position, depth in PERFT_DEPTHS.items():
+        name = f"perft_{position}"
+        if only and name not in only:
+            continue
+        depth = depth - 1 if quick else depth
+        nodes = 0
+
+        def count_nodes() -> int:
+            nonlocal nodes
+            nodes = perft(perft_position(position), depth)
+            return nodes
+
+        ns_per_node = _time_per_op(count_nodes, max(1, repeat // 2))
+        results[name] = {'depth': depth, 'nodes': nodes, 'ns_per_op': round(ns_per_node, 1)}
+        if report:
+            report(name, results[name])
+
+    return {
+        'version': BASELINE_VERSION,
+        'python': platform.python_version(),
+        'quick': quick,
+        'benchmarks': results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """基準値と比べて threshold を超えて遅くなった処理と perft の局面数の不一致を返す"""
+    failures = []
+    for name, expected in baseline['benchmarks'].items():
+        actual = current['benchmarks'].get(name)
+        if actual is None:
+            continue
+        if 'nodes' in expected and expected.get('depth') == actual.get('depth') and expected['nodes'] != actual['nodes']:
+            failures.append(f"{name}: 局面数が一致しません（基準 {expected['nodes']}, 今回 {actual['nodes']}）")
+        ratio = actual['ns_per_op'] / expected['ns_per_op'] - 1
+        if ratio > threshold:
+            failures.append(
+                f"{name}: {ratio:+.0%} 遅くなりました（基準 {expected['ns_per_op']} ns, 今回 {actual['ns_per_op']} ns）"
+            )
+    return failures
+
+
+def _print_result(name: str, result: dict) -> None:
+    nodes = f"  {result['nodes']} 局面（深さ {result['depth']}）" if 'nodes' in result else ''
+    print(f"{name:<24} {result['ns_per_op']:>12.1f} ns/op{nodes}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦のベンチマーク")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="ベンチマークを実行して結果を保存")
+    run.add_argument('--output', help="結果を書き出すJSONファイル")
+    compare = subparsers.add_parser('compare', help="ベンチマークを実行して基準値と比較（遅くなっていれば終了コード1）")
+    compare.add_argument('baseline', help="基準値のJSONファイル")
+    compare.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="許容する遅れの割合（0.25 で25%%）")
+    for command in (run, compare):
+        command.add_argument('--quick', action='store_true', help="件数と perft の深さを減らして短時間で実行")
+        command.add_argument('--repeat', type=int, default=5, help="各ベンチマークの繰り返し回数（最短時間を採用）")
+        command.add_argument('--only', nargs='+', help="実行するベンチマーク名")
+
+    perft_parser = subparsers.add_parser('perft', help="perft の局面数を表示")
+    perft_parser.add_argument('--depth', type=int, default=4)
+    perft_parser.add_argument('--position', default='initial', choices=sorted(PERFT_POSITIONS))
+    args = parser.parse_args()
+
+    if args.command == 'perft':
+        game_state = perft_position(args.position)
+        for depth in range(1, args.depth + 1):
+            start = time.perf_counter()
+            nodes = perft(game_state, depth)
+            print(f"深さ {depth}: {nodes} 局面 ({time.perf_counter() - start:.2f} 秒)")
+        return
+
+    if args.command == 'compare':
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        quick = args.quick or baseline.get('quick', False)
+    else:
+        quick = args.quick
+
+    current = run_benchmarks(quick=quick, repeat=args.repeat, only=args.only, report=_print_result)
+
+    if args.command == 'run':
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, ensure_ascii=False, indent=2)
+                f.write('\n')
+        return
+
+    failures = compare_results(baseline, current, args.threshold)
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print(f"基準値からの遅れはすべて {args.threshold:.0%} 以内です")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+おさかな対戦 - NumPyによる一括対局エンジン
+N局の状態を配列で保持し、合法手の判定と着手を全局まとめて行う（NumPy が必要）
+
+手は board_game_move_codec の手のコード（0〜779）で表す。
+盤面の各マスは BitboardState.board_key と同じ符号（0 は空き、player * 5 + type + 1）で持ち、
+千日手判定の履歴には盤面を48ビットに詰めたキー（board_key）を使う。
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board_game_types import GameState
+from board_game_logic import MOVE_TABLE, initialize_game
+from board_game_bitboard import (
+    BitboardState, from_game_state, to_game_state, NUM_SQUARES, NUM_COLS, NUM_TYPES, MAGURO, INADA, BURI
+)
+from board_game_move_codec import (
+    NUM_MOVE_CODES, NUM_BOARD_MOVE_CODES, TYPE_INDEX, board_move_code
+)
+
+
+# 結果の符号（0 は対局中）
+ONGOING, FIRST_WIN, SECOND_WIN, DRAW = 0, 1, 2, 3
+RESULT_NAMES = {FIRST_WIN: 'first', SECOND_WIN: 'second', DRAW: 'draw'}
+RESULT_CODES = {None: ONGOING, 'first': FIRST_WIN, 'second': SECOND_WIN, 'draw': DRAW}
+
+NUM_PIECE_CODES = 2 * NUM_TYPES + 1
+REPETITION_LIMIT = 3
+
+
+def _build_tables():
+    """手のコードごとの移動元・移動先・コマ種類と、形の上で指せる移動の候補"""
+    codes = np.arange(NUM_BOARD_MOVE_CODES)
+    move_type = codes // (NUM_SQUARES * NUM_SQUARES)
+    move_from = codes // NUM_SQUARES % NUM_SQUARES
+    move_to = codes % NUM_SQUARES
+    # 手番ごとの、移動元にあるべきコマの符号（形の上で指せない手は -1 で、どのマスとも一致しない）
+    expected = np.full((2, NUM_BOARD_MOVE_CODES), -1, dtype=np.int8)
+    for (piece_type, player), per_square in MOVE_TABLE.items():
+        side = 0 if player == 'first' else 1
+        type_index = TYPE_INDEX[piece_type]
+        for from_sq, destinations in enumerate(per_square):
+            for to_row, to_col, _ in destinations:
+                expected[side, board_move_code(type_index, from_sq, to_row * NUM_COLS + to_col)] = (
+                    side * NUM_TYPES + type_index + 1
+                )
+    # どちらかの手番で指しうる移動だけを合法手判定の対象にする
+    candidates = np.flatnonzero((expected >= 0).any(axis=0))
+    return move_type, move_from, move_to, candidates, expected[:, candidates]
+
+
+MOVE_TYPE, MOVE_FROM, MOVE_TO, CANDIDATES, CANDIDATE_PIECE = _build_tables()
+CANDIDATE_FROM = MOVE_FROM[CANDIDATES]
+CANDIDATE_TO = MOVE_TO[CANDIDATES]
+NUM_DROP_CODES = NUM_MOVE_CODES - NUM_BOARD_MOVE_CODES
+# 合法手になりうる手のコード（昇順。形の上で指せる移動とすべての配置）
+LEGAL_CODES = np.concatenate([CANDIDATES, np.arange(NUM_BOARD_MOVE_CODES, NUM_MOVE_CODES)])
+
+# 各マスの符号を48ビットの盤面キーに詰めるためのシフト量
+BOARD_KEY_SHIFTS = (np.arange(NUM_SQUARES, dtype=np.uint64) * np.uint64(4))
+# 手番ごとの相手陣地のマス
+ENEMY_SQUARES = np.array([[0, 1, 2], [9, 10, 11]])
+
+
+def _square_codes(state: BitboardState) -> np.ndarray:
+    """ビットボード表現の盤面をマスごとの符号の配列に変換"""
+    return np.array([state.board_key >> (4 * sq) & 0xF for sq in range(NUM_SQUARES)], dtype=np.int8)
+
+
+class BatchGameEngine:
+    """N局を同時に進める対局エンジン
+
+    各配列は公開属性で、直接読み出せる:
+        board   (N, 12) int8   マスごとのコマの符号
+        hands   (N, 2, 5) int8 プレイヤー・コマ種類ごとの手ゴマの数
+        side    (N,) int8      手番（0: 先手, 1: 後手）
+        turn    (N,) int32     ターン数
+        result  (N,) int8      結果（ONGOING / FIRST_WIN / SECOND_WIN / DRAW）
+        maguro_flags (N, 2) bool  まぐろの相手陣地到達フラグ
+    """
+
+    def __init__(self, num_games: int, auto_reset: bool = True, history_capacity: int = 64):
+        self.num_games = num_games
+        self.auto_reset = auto_reset
+        self.board = np.zeros((num_games, NUM_SQUARES), dtype=np.int8)
+        self.hands = np.zeros((num_games, 2, NUM_TYPES), dtype=np.int8)
+        self.side = np.zeros(num_games, dtype=np.int8)
+        self.turn = np.zeros(num_games, dtype=np.int32)
+        self.result = np.zeros(num_games, dtype=np.int8)
+        self.maguro_flags = np.zeros((num_games, 2), dtype=bool)
+        self.history = np.zeros((num_games, history_capacity), dtype=np.uint64)
+        self.history_length = np.zeros(num_games, dtype=np.int32)
+
+        self._initial_board = _square_codes(from_game_state(initialize_game()))
+        self.reset()
+
+    @classmethod
+    def from_game_states(cls, game_states: Sequence[GameState], auto_reset: bool = True) -> 'BatchGameEngine':
+        """GameState の列から作成"""
+        engine = cls(len(game_states), auto_reset=auto_reset,
+                     history_capacity=max([64] + [len(state.history) for state in game_states]))
+        for index, game_state in enumerate(game_states):
+            engine.set_state(index, from_game_state(game_state))
+        return engine
+
+    def reset(self, games: Optional[np.ndarray] = None) -> None:
+        """指定した局（省略時は全局）を初期局面に戻す"""
+        if games is None:
+            games = np.arange(self.num_games)
+        self.board[games] = self._initial_board
+        self.hands[games] = 0
+        # 千日手の判定は履歴の未使用部分が0であることを前提にする（盤面キーは0にならない）
+        self.history[games] = 0
+        self.side[games] = 0
+        self.turn[games] = 1
+        self.result[games] = ONGOING
+        self.maguro_flags[games] = False
+        self.history[games, 0] = self._board_keys(self._initial_board[None, :])[0]
+        self.history_length[games] = 1
+
+    def set_state(self, index: int, state: BitboardState) -> None:
+        """1局分の状態をビットボード表現から設定"""
+        if len(state.history) > self.history.shape[1]:
+            self._grow_history(len(state.history))
+        self.board[index] = _square_codes(state)
+        self.hands[index] = [[state.hand_count(player, t) for t in range(NUM_TYPES)] for player in range(2)]
+        self.side[index] = state.side
+        self.turn[index] = state.turn
+        self.result[index] = RESULT_CODES[state.result]
+        self.maguro_flags[index] = [bool(state.maguro_flags & 1), bool(state.maguro_flags & 2)]
+        self.history[index] = 0
+        self.history[index, :len(state.history)] = state.history
+        self.history_length[index] = len(state.history)
+
+    def to_game_state(self, index: int) -> GameState:
+        """1局分の状態を GameState に変換"""
+        state = BitboardState()
+        for sq in range(NUM_SQUARES):
+            code = int(self.board[index, sq])
+            if code:
+                state.pieces[code - 1] |= 1 << sq
+                state.board_key |= code << (4 * sq)
+        for player in range(2):
+            for piece_type in range(NUM_TYPES):
+                state.hands |= int(self.hands[index, player, piece_type]) << (4 * (player * NUM_TYPES + piece_type))
+        state.side = int(self.side[index])
+        state.turn = int(self.turn[index])
+        state.result = RESULT_NAMES.get(int(self.result[index]))
+        state.maguro_flags = int(self.maguro_flags[index, 0]) | int(self.maguro_flags[index, 1]) << 1
+        state.history = [int(key) for key in self.history[index, :self.history_length[index]]]
+        return to_game_state(state)
+
+    def planes(self) -> np.ndarray:
+        """盤面を (N, 10, 12) のコマ種類・プレイヤーごとの0/1平面に変換"""
+        return self.board[:, None, :] == np.arange(1, NUM_PIECE_CODES, dtype=np.int8)[None, :, None]
+
+    def legal_mask(self) -> np.ndarray:
+        """(N, 780) の合法手マスク（終局した局はすべて False）"""
+        mask = np.zeros((self.num_games, NUM_MOVE_CODES), dtype=bool)
+        mask[:, LEGAL_CODES] = self.legal_candidates()
+        return mask
+
+    def legal_candidates(self) -> np.ndarray:
+        """(N, len(LEGAL_CODES)) の合法手マスク（列は LEGAL_CODES の手。終局した局はすべて False）
+
+        legal_mask より軽いため、全局の合法手を毎手調べるときはこちらを使う。
+        """
+        # 列方向の取り出しは np.take で行う（添字で取り出すと列優先の配列になり、以降の比較が遅い）
+        side = self.side.astype(np.intp)
+        low = (self.side * NUM_TYPES)[:, None]
+        # 手番側のコマがあるマス（移動先にできない）
+        own = (self.board > low) & (self.board <= low + NUM_TYPES)
+        board_moves = (
+            (np.take(self.board, CANDIDATE_FROM, axis=1) == np.take(CANDIDATE_PIECE, side, axis=0))
+            & ~np.take(own, CANDIDATE_TO, axis=1)
+        )
+
+        # 手ゴマの配置（コード順はコマ種類×配置先）
+        in_hand = self.hands[np.arange(self.num_games), side] > 0
+        empty = self.board == 0
+        drops = (in_hand[:, :, None] & empty[:, None, :]).reshape(-1, NUM_DROP_CODES)
+
+        candidates = np.concatenate([board_moves, drops], axis=1)
+        candidates[self.result != ONGOING] = False
+        return candidates
+
+    def _board_keys(self, board: np.ndarray) -> np.ndarray:
+        return np.bitwise_or.reduce(board.astype(np.uint64) << BOARD_KEY_SHIFTS, axis=1)
+
+    def _grow_history(self, minimum: int) -> None:
+        capacity = self.history.shape[1]
+        while capacity < minimum:
+            capacity *= 2
+        grown = np.zeros((self.num_games, capacity), dtype=np.uint64)
+        grown[:, :self.history.shape[1]] = self.history
+        self.history = grown
+
+    def step(self, actions: np.ndarray, validate: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """各局に1手ずつ指す（終局済みの局の手は無視する）
+
+        この手で終局した局の (終局フラグ, 結果) を返す。auto_reset なら終局した局は初期局面に戻す。
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        games = np.flatnonzero(self.result == ONGOING)
+        codes = actions[games]
+        if validate:
+            legal = self.legal_mask()[games, codes]
+            if not legal.all():
+                bad = games[~legal][0]
+                raise ValueError(f"不正な手です: 対局 {bad}, 手のコード {actions[bad]}")
+
+        side = self.side[games].astype(np.intp)
+
+        # 手ゴマの配置
+        is_drop = codes >= NUM_BOARD_MOVE_CODES
+        drop_games, drop_side = games[is_drop], side[is_drop]
+        drop_type, drop_to = np.divmod(codes[is_drop] - NUM_BOARD_MOVE_CODES, NUM_SQUARES)
+        self.board[drop_games, drop_to] = drop_side * NUM_TYPES + drop_type + 1
+        self.hands[drop_games, drop_side, drop_type] -= 1
+
+        # 盤上の移動
+        move_games, move_side, move_codes = games[~is_drop], side[~is_drop], codes[~is_drop]
+        move_from, move_to = MOVE_FROM[move_codes], MOVE_TO[move_codes]
+        piece = self.board[move_games, move_from]
+        target = self.board[move_games, move_to]
+        # いなだの出世（まぐろ捕獲判定より先）
+        enemy_row = np.where(move_side == 0, move_to < NUM_COLS, move_to >= NUM_SQUARES - NUM_COLS)
+        promote = (MOVE_TYPE[move_codes] == INADA) & enemy_row
+        self.board[move_games, move_from] = 0
+        self.board[move_games, move_to] = np.where(promote, piece + (BURI - INADA), piece)
+
+        # 捕獲したコマを手ゴマに（ぶりはいなだに戻す）
+        captured = target > 0
+        captured_type = (target[captured] - 1) % NUM_TYPES
+        hand_type = np.where(captured_type == BURI, INADA, captured_type)
+        np.add.at(self.hands, (move_games[captured], move_side[captured], hand_type), 1)
+
+        finished = np.zeros(self.num_games, dtype=bool)
+        # まぐろを捕獲したら即勝利（履歴・手番・到達フラグは更新しない）
+        maguro_captured = np.zeros(len(games), dtype=bool)
+        maguro_captured[np.flatnonzero(~is_drop)[captured][captured_type == MAGURO]] = True
+        winners = games[maguro_captured]
+        self.result[winners] = side[maguro_captured] + 1
+        finished[winners] = True
+
+        rest = games[~maguro_captured]
+        self._finish_move(rest, finished)
+
+        results = np.where(finished, self.result, ONGOING).astype(np.int8)
+        if self.auto_reset and finished.any():
+            self.reset(np.flatnonzero(finished))
+        return finished, results
+
+    def _finish_move(self, games: np.ndarray, finished: np.ndarray) -> None:
+        """履歴追加・手番交代・まぐろ勝利と千日手の判定"""
+        if len(games) == 0:
+            return
+        if self.history_length[games].max() >= self.history.shape[1]:
+            self._grow_history(self.history.shape[1] + 1)
+        # 全局が対局中なら行を取り出さずに配列をそのまま使う
+        all_games = len(games) == self.num_games
+        board = self.board if all_games else self.board[games]
+        keys = self._board_keys(board)
+        lengths = self.history_length[games]
+        self.history[games, lengths] = keys
+        self.history_length[games] = lengths + 1
+
+        self.side[games] ^= 1
+        self.turn[games] += 1
+
+        self.maguro_flags[games, 0] |= (board[:, ENEMY_SQUARES[0]] == MAGURO + 1).any(axis=1)
+        self.maguro_flags[games, 1] |= (board[:, ENEMY_SQUARES[1]] == NUM_TYPES + MAGURO + 1).any(axis=1)
+
+        # 手番側のまぐろが相手陣地に残っていれば手番側の勝ち
+        side = self.side[games].astype(np.intp)
+        own_maguro = (side * NUM_TYPES + MAGURO + 1).astype(np.int8)
+        in_territory = (board[np.arange(len(games))[:, None], ENEMY_SQUARES[side]] == own_maguro[:, None]).any(axis=1)
+        wins = self.maguro_flags[games, side] & in_territory
+
+        # 千日手（同じ盤面が3回）
+        width = int(lengths.max()) + 1
+        history = self.history[:, :width] if all_games else self.history[games, :width]
+        repeats = np.count_nonzero(history == keys[:, None], axis=1)
+        draws = ~wins & (repeats >= REPETITION_LIMIT)
+
+        self.result[games[wins]] = side[wins] + 1
+        self.result[games[draws]] = DRAW
+        finished[games[wins | draws]] = True
+
+
+def legal_codes(mask_row: np.ndarray) -> List[int]:
+    """合法手マスクの1行を手のコードの一覧に変換"""
+    return np.flatnonzero(mask_row).tolist()
+
+
+def random_actions(mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """各局の合法手から一様ランダムに1手ずつ選ぶ（mask は legal_mask か legal_candidates の値。合法手がない局は 0）"""
+    if mask.shape[1] == NUM_MOVE_CODES:
+        # 合法手になりうる列だけで累積和を取る（LEGAL_CODES は昇順なので選ぶ手は変わらない）
+        mask = np.take(mask, LEGAL_CODES, axis=1)
+    cumulative = mask.cumsum(axis=1, dtype=np.int16)
+    counts = cumulative[:, -1]
+    choice = (rng.random(len(mask)) * counts).astype(np.int16)
+    actions = LEGAL_CODES[(cumulative > choice[:, None]).argmax(axis=1)]
+    return np.where(counts > 0, actions, 0)
@@ -0,0 +1,418 @@
+"""
+おさかな対戦 - ビットボード版ゲーム状態
+12マスをコマ種類・プレイヤーごとのビットマスクに詰め込んだ軽量な状態表現
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from board_game_types import (
+    PieceType, Player, Board, GameState, Move,
+    PIECE_MOVES, FORWARD_DIRECTION, PIECES
+)
+from board_game_logic import initialize_game
+from board_game_move_codec import MOVES, square_of_position, board_move_code, placement_code
+
+
+# マス番号は row * 3 + col（A1=0, B1=1, C1=2, A2=3, ..., C4=11）
+NUM_ROWS = 4
+NUM_COLS = 3
+NUM_SQUARES = NUM_ROWS * NUM_COLS
+FULL_MASK = (1 << NUM_SQUARES) - 1
+
+PIECE_TYPES: List[PieceType] = list(PieceType)
+TYPE_INDEX: Dict[PieceType, int] = {t: i for i, t in enumerate(PIECE_TYPES)}
+NUM_TYPES = len(PIECE_TYPES)
+
+MAGURO = TYPE_INDEX[PieceType.MAGURO]
+INADA = TYPE_INDEX[PieceType.INADA]
+BURI = TYPE_INDEX[PieceType.BURI]
+
+PLAYERS: List[Player] = ['first', 'second']
+PLAYER_INDEX: Dict[str, int] = {'first': 0, 'second': 1}
+
+# 各プレイヤーにとっての相手陣地（先手は1行目、後手は4行目）
+ENEMY_ROW_MASK = [0b111, 0b111 << 9]
+
+# 手ゴマの個数は (player * 5 + type) ごとに4ビットずつ詰める
+HAND_BITS = 4
+HAND_MAX = (1 << HAND_BITS) - 1
+
+# (コマ種類番号, 移動元マス, 移動先マス)。手ゴマの配置は移動元マスを -1 とする
+BitboardMove = Tuple[int, int, int]
+
+
+def _build_destination_masks() -> List[List[List[int]]]:
+    """プレイヤー・コマ種類・マスごとの移動先ビットマスクを作成"""
+    masks = []
+    for player in PLAYERS:
+        per_type = []
+        for piece_type in PIECE_TYPES:
+            per_square = []
+            for sq in range(NUM_SQUARES):
+                row, col = divmod(sq, NUM_COLS)
+                mask = 0
+                for dc, dr in PIECE_MOVES[piece_type]:
+                    new_row = row + dr * FORWARD_DIRECTION[player]
+                    new_col = col + dc
+                    if 0 <= new_row < NUM_ROWS and 0 <= new_col < NUM_COLS:
+                        mask |= 1 << (new_row * NUM_COLS + new_col)
+                per_square.append(mask)
+            per_type.append(per_square)
+        masks.append(per_type)
+    return masks
+
+
+DESTINATION_MASKS = _build_destination_masks()
+
+
+def square_of(row: int, col: int) -> int:
+    """配列インデックスをマス番号に変換"""
+    return row * NUM_COLS + col
+
+
+def iter_bits(mask: int):
+    """ビットマスクの立っているマス番号を昇順に列挙"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def board_key_to_hash(board_key: int) -> str:
+    """盤面キーを get_board_hash と同じ文字列に変換"""
+    board_str = ""
+    for sq in range(NUM_SQUARES):
+        code = (board_key >> (4 * sq)) & 0xF
+        if code:
+            player, piece_type = divmod(code - 1, NUM_TYPES)
+            board_str += f"{PIECE_TYPES[piece_type].value}{PLAYERS[player][0]}"
+        else:
+            board_str += "00"
+    return board_str
+
+
+def hash_to_board_key(board_hash: str) -> int:
+    """get_board_hash の文字列を盤面キーに変換"""
+    type_by_char = {t.value: i for i, t in enumerate(PIECE_TYPES)}
+    player_by_char = {p[0]: i for i, p in enumerate(PLAYERS)}
+    board_key = 0
+    for sq in range(NUM_SQUARES):
+        cell = board_hash[2 * sq:2 * sq + 2]
+        if cell != "00":
+            code = 1 + player_by_char[cell[1]] * NUM_TYPES + type_by_char[cell[0]]
+            board_key |= code << (4 * sq)
+    return board_key
+
+
+class BitboardState:
+    """ビットボードで表現したゲーム状態
+
+    pieces[player * 5 + type] がそのコマの位置のビットマスク、
+    board_key は各マス4ビット（0: 空、1〜10: player * 5 + type + 1）の盤面キー。
+    history には get_board_hash の代わりに盤面キーを積む。
+    """
+
+    __slots__ = (
+        'pieces', 'hands', 'side', 'turn', 'result',
+        'maguro_flags', 'board_key', 'history', 'counts'
+    )
+
+    def __init__(self):
+        self.pieces: List[int] = [0] * (2 * NUM_TYPES)
+        self.hands = 0
+        self.side = 0
+        self.turn = 1
+        self.result: Optional[str] = None
+        self.maguro_flags = 0
+        self.board_key = 0
+        self.history: List[int] = []
+        self.counts: Dict[int, int] = {}
+
+    def copy(self) -> 'BitboardState':
+        """浅いコピーを作成（整数はイミュータブルなのでリストと辞書のみ複製）"""
+        new = BitboardState.__new__(BitboardState)
+        new.pieces = self.pieces[:]
+        new.hands = self.hands
+        new.side = self.side
+        new.turn = self.turn
+        new.result = self.result
+        new.maguro_flags = self.maguro_flags
+        new.board_key = self.board_key
+        new.history = self.history[:]
+        new.counts = self.counts.copy()
+        return new
+
+    @property
+    def current_player(self) -> Player:
+        return PLAYERS[self.side]
+
+    def occupancy(self, player: int) -> int:
+        """指定プレイヤーのコマがあるマスのビットマスク"""
+        base = player * NUM_TYPES
+        pieces = self.pieces
+        return pieces[base] | pieces[base + 1] | pieces[base + 2] | pieces[base + 3] | pieces[base + 4]
+
+    def piece_at(self, sq: int) -> Optional[Tuple[int, int]]:
+        """マスにある (player, type) を返す"""
+        code = (self.board_key >> (4 * sq)) & 0xF
+        if not code:
+            return None
+        return divmod(code - 1, NUM_TYPES)
+
+    def hand_count(self, player: int, piece_type: int) -> int:
+        """手ゴマの個数"""
+        return (self.hands >> (HAND_BITS * (player * NUM_TYPES + piece_type))) & HAND_MAX
+
+    def generate_moves(self) -> List[BitboardMove]:
+        """合法手をすべて列挙"""
+        if self.result:
+            return []
+        side = self.side
+        own = self.occupancy(side)
+        empty = FULL_MASK & ~(own | self.occupancy(side ^ 1))
+        moves = []
+        dest_by_type = DESTINATION_MASKS[side]
+        base = side * NUM_TYPES
+        for piece_type in range(NUM_TYPES):
+            dest_table = dest_by_type[piece_type]
+            for from_sq in iter_bits(self.pieces[base + piece_type]):
+                for to_sq in iter_bits(dest_table[from_sq] & ~own):
+                    moves.append((piece_type, from_sq, to_sq))
+        for piece_type in range(NUM_TYPES):
+            if self.hand_count(side, piece_type):
+                for to_sq in iter_bits(empty):
+                    moves.append((piece_type, -1, to_sq))
+        return moves
+
+    def play(self, move: BitboardMove) -> tuple:
+        """合法手をその場で適用し、unplay 用の情報を返す（妥当性は検証しない）"""
+        undo = (
+            self.pieces[:], self.hands, self.side, self.turn, self.result,
+            self.maguro_flags, self.board_key
+        )
+        return undo + (self.advance(move),)
+
+    def advance(self, move: BitboardMove) -> bool:
+        """合法手をその場で適用する（取り消し情報を作らない。履歴に追加したかを返す）"""
+        piece_type, from_sq, to_sq = move
+        side = self.side
+        pieces = self.pieces
+        idx = side * NUM_TYPES + piece_type
+        to_bit = 1 << to_sq
+
+        if from_sq < 0:
+            # 手ゴマの配置
+            pieces[idx] |= to_bit
+            self.hands -= 1 << (HAND_BITS * idx)
+            self.board_key |= (idx + 1) << (4 * to_sq)
+        else:
+            target = (self.board_key >> (4 * to_sq)) & 0xF
+            pieces[idx] &= ~(1 << from_sq)
+
+            # いなだの出世判定（まぐろ捕獲判定より先に実行）
+            if piece_type == INADA and to_bit & ENEMY_ROW_MASK[side]:
+                idx = side * NUM_TYPES + BURI
+            pieces[idx] |= to_bit
+
+            key = self.board_key & ~((0xF << (4 * from_sq)) | (0xF << (4 * to_sq)))
+            self.board_key = key | ((idx + 1) << (4 * to_sq))
+
+            # 相手のコマを捕獲
+            if target:
+                pieces[target - 1] &= ~to_bit
+                captured_type = (target - 1) % NUM_TYPES
+                # ぶりは捕獲時にいなだに降格
+                hand_type = INADA if captured_type == BURI else captured_type
+                self.hands += 1 << (HAND_BITS * (side * NUM_TYPES + hand_type))
+
+                # まぐろを捕獲したら即勝利
+                if captured_type == MAGURO:
+                    self.result = PLAYERS[side]
+                    return False
+
+        # 履歴に追加
+        board_key = self.board_key
+        self.history.append(board_key)
+        self.counts[board_key] = self.counts.get(board_key, 0) + 1
+
+        # 手番交代
+        self.side = side ^ 1
+        self.turn += 1
+
+        # まぐろ位置の更新
+        if pieces[MAGURO] & ENEMY_ROW_MASK[0]:
+            self.maguro_flags |= 1
+        if pieces[NUM_TYPES + MAGURO] & ENEMY_ROW_MASK[1]:
+            self.maguro_flags |= 2
+
+        # まぐろ勝利判定（相手が1手打った後の手番のプレイヤーのみ勝利しうる）
+        mover = self.side
+        if (self.maguro_flags >> mover) & 1 and pieces[mover * NUM_TYPES + MAGURO] & ENEMY_ROW_MASK[mover]:
+            self.result = PLAYERS[mover]
+        # 引き分け判定
+        elif self.counts[board_key] >= 3:
+            self.result = 'draw'
+
+        return True
+
+    def unplay(self, undo: tuple) -> None:
+        """play で適用した手を取り消す"""
+        (pieces, self.hands, self.side, self.turn, self.result,
+         self.maguro_flags, board_key, appended) = undo
+        if appended:
+            key = self.history.pop()
+            count = self.counts[key] - 1
+            if count:
+                self.counts[key] = count
+            else:
+                del self.counts[key]
+        self.pieces = pieces
+        self.board_key = board_key
+
+    def position_key(self) -> int:
+        """盤面・手ゴマ・手番を一意に表す整数キー"""
+        return self.board_key | (self.hands << 48) | (self.side << 88)
+
+
+def move_to_bitboard(move: Move) -> BitboardMove:
+    """Move をビットボード用の手に変換"""
+    to_sq = square_of_position(move.to_position)
+    if move.is_placement:
+        return TYPE_INDEX[move.piece_type], -1, to_sq
+    return TYPE_INDEX[move.piece_type], square_of_position(move.from_position), to_sq
+
+
+def bitboard_to_move(move: BitboardMove) -> Move:
+    """ビットボード用の手を（共有の）Move に変換"""
+    piece_type, from_sq, to_sq = move
+    if from_sq < 0:
+        return MOVES[placement_code(piece_type, to_sq)]
+    return MOVES[board_move_code(piece_type, from_sq, to_sq)]
+
+
+def from_game_state(game_state: GameState) -> BitboardState:
+    """GameState をビットボード表現に変換（手ゴマの並び順は種類順に正規化される）"""
+    state = BitboardState()
+    for row in range(NUM_ROWS):
+        for col in range(NUM_COLS):
+            piece = game_state.board[row][col]
+            if piece:
+                sq = square_of(row, col)
+                idx = PLAYER_INDEX[piece.player] * NUM_TYPES + TYPE_INDEX[piece.type]
+                state.pieces[idx] |= 1 << sq
+                state.board_key |= (idx + 1) << (4 * sq)
+
+    for player, pieces in game_state.hand_pieces.items():
+        counts = Counter(pieces)
+        for piece_type, count in counts.items():
+            if count > HAND_MAX:
+                raise ValueError(f"手ゴマの{piece_type.value}が多すぎます: {count}")
+            idx = PLAYER_INDEX[player] * NUM_TYPES + TYPE_INDEX[piece_type]
+            state.hands |= count << (HAND_BITS * idx)
+
+    state.side = PLAYER_INDEX[game_state.current_player]
+    state.turn = game_state.turn
+    state.result = game_state.game_result
+    state.maguro_flags = (
+        (1 if game_state.maguro_in_enemy_territory['first'] else 0)
+        | (2 if game_state.maguro_in_enemy_territory['second'] else 0)
+    )
+    state.history = [hash_to_board_key(h) for h in game_state.history]
+    state.counts = dict(Counter(state.history))
+    return state
+
+
+def to_game_state(state: BitboardState) -> GameState:
+    """ビットボード表現を GameState に変換"""
+    board: Board = [[None for _ in range(NUM_COLS)] for _ in range(NUM_ROWS)]
+    for sq in range(NUM_SQUARES):
+        cell = state.piece_at(sq)
+        if cell:
+            player, piece_type = cell
+            row, col = divmod(sq, NUM_COLS)
+            board[row][col] = PIECES[(PIECE_TYPES[piece_type], PLAYERS[player])]
+
+    hand_pieces = {'first': [], 'second': []}
+    for player in range(2):
+        for piece_type in range(NUM_TYPES):
+            hand_pieces[PLAYERS[player]].extend(
+                [PIECE_TYPES[piece_type]] * state.hand_count(player, piece_type)
+            )
+
+    return GameState(
+        board=board,
+        hand_pieces=hand_pieces,
+        current_player=state.current_player,
+        turn=state.turn,
+        game_result=state.result,
+        history=[board_key_to_hash(key) for key in state.history],
+        maguro_in_enemy_territory={
+            'first': bool(state.maguro_flags & 1),
+            'second': bool(state.maguro_flags & 2)
+        }
+    )
+
+
+def validate_bitboard_move(state: BitboardState, move: Move) -> Optional[str]:
+    """移動の妥当性を検証（validate_move と同じエラーメッセージを返す）"""
+    if state.result:
+        return "ゲームは既に終了しています"
+
+    side = state.side
+    to_sq = square_of_position(move.to_position)
+    piece_type = TYPE_INDEX[move.piece_type]
+
+    if move.is_placement:
+        if not state.hand_count(side, piece_type):
+            return f"{move.piece_type.value}を持っていません"
+        if (state.board_key >> (4 * to_sq)) & 0xF:
+            return "配置先にコマが存在します"
+        return None
+
+    if not move.from_position:
+        return "移動元が指定されていません"
+
+    from_sq = square_of_position(move.from_position)
+    cell = state.piece_at(from_sq)
+    if not cell:
+        return "移動元にコマが存在しません"
+
+    player, actual_type = cell
+    if player != side:
+        return "相手のコマは動かせません"
+
+    if actual_type != piece_type:
+        return (
+            f"指定されたコマ（{move.piece_type.value}）と"
+            f"実際のコマ（{PIECE_TYPES[actual_type].value}）が一致しません"
+        )
+
+    if not DESTINATION_MASKS[side][actual_type][from_sq] & (1 << to_sq):
+        return "その位置には移動できません"
+
+    if state.occupancy(side) & (1 << to_sq):
+        return "自分のコマがある位置には移動できません"
+
+    return None
+
+
+def make_bitboard_move(state: BitboardState, move: Move) -> Tuple[BitboardState, Optional[str]]:
+    """移動を実行し、新しいビットボード状態を返す（make_move と同じ結果になる）"""
+    error = validate_bitboard_move(state, move)
+    if error:
+        return state, error
+
+    new_state = state.copy()
+    new_state.play(move_to_bitboard(move))
+    return new_state, None
+
+
+def initialize_bitboard_game() -> BitboardState:
+    """ゲームの初期状態をビットボード表現で作成"""
+    return from_game_state(initialize_game())
+
+
+def get_bitboard_hash(state: BitboardState) -> str:
+    """get_board_hash と同じ文字列を返す"""
+    return board_key_to_hash(state.board_key)
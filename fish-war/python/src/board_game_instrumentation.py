@@ -0,0 +1,142 @@
+"""
+おさかな対戦 - 処理時間の計測
+make_move の各段階（検証・コピー・盤面更新・盤面ハッシュ・まぐろ判定・引き分け判定）の
+呼び出し回数と累計時間を計測する
+
+enable() するか、環境変数 FISH_WAR_INSTRUMENT=1 を設定して install() を呼ぶと有効になる
+（board_game_logic はインポート時に環境変数を見て install() を呼ぶ）。
+有効にすると board_game_logic の各段階の関数を計測用の関数に置き換え、無効にすると元に戻すため、
+無効な間は計測のコストがかからない。board_game_logic 内部からの呼び出しだけが計測対象で、
+時間は各段階の内側で呼んだ別の段階を除いた時間を数える。スレッドからの同時呼び出しには対応しない。
+"""
+
+import functools
+import importlib
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from board_game_types import GameState
+
+
+ENV_VAR = 'FISH_WAR_INSTRUMENT'
+LOGIC_MODULE = 'board_game_logic'
+
+# 段階名 → (置き換える関数の持ち主（board_game_logic はモジュール名）, 属性名)
+# board_game_logic はインポート時に install() を呼ぶため、ここではインポートせず enable() で参照する
+STAGES: Dict[str, Tuple[object, str]] = {
+    'validate_move': (LOGIC_MODULE, 'validate_move'),
+    'copy': (GameState, 'copy'),
+    'board_mutation': (LOGIC_MODULE, '_apply_validated_move'),
+    'get_board_hash': (LOGIC_MODULE, 'get_board_hash'),
+    'update_maguro_status': (LOGIC_MODULE, 'update_maguro_status'),
+    'check_maguro_victory': (LOGIC_MODULE, 'check_maguro_victory'),
+    'check_for_draw': (LOGIC_MODULE, 'check_for_draw'),
+}
+
+
+@dataclass
+class StageStats:
+    """1段階の計測結果"""
+    calls: int = 0
+    seconds: float = 0.0
+
+
+_originals: Dict[str, Callable] = {}
+_calls: Dict[str, int] = {stage: 0 for stage in STAGES}
+_nanoseconds: Dict[str, int] = {stage: 0 for stage in STAGES}
+# 実行中の各段階の内側で呼ばれた段階の合計時間
+_child_time: List[int] = []
+
+
+def _instrument(stage: str, function: Callable) -> Callable:
+    """関数を呼び出し回数と時間を数える関数で包む"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        _child_time.append(0)
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            _calls[stage] += 1
+            _nanoseconds[stage] += elapsed - _child_time.pop()
+            if _child_time:
+                _child_time[-1] += elapsed
+    return wrapper
+
+
+def is_enabled() -> bool:
+    """計測が有効か"""
+    return bool(_originals)
+
+
+def _owner(owner: object) -> object:
+    return importlib.import_module(owner) if isinstance(owner, str) else owner
+
+
+def enable() -> None:
+    """計測を有効にする"""
+    if _originals:
+        return
+    for stage, (owner, name) in STAGES.items():
+        owner = _owner(owner)
+        _originals[stage] = getattr(owner, name)
+        setattr(owner, name, _instrument(stage, _originals[stage]))
+
+
+def disable() -> None:
+    """計測を無効にして元の関数に戻す（計測結果は残す）"""
+    for stage, (owner, name) in STAGES.items():
+        if stage in _originals:
+            setattr(_owner(owner), name, _originals.pop(stage))
+
+
+def reset() -> None:
+    """計測結果を消去"""
+    for stage in STAGES:
+        _calls[stage] = 0
+        _nanoseconds[stage] = 0
+
+
+def snapshot() -> Dict[str, StageStats]:
+    """現在の計測結果のコピー"""
+    return {stage: StageStats(_calls[stage], _nanoseconds[stage] / 1e9) for stage in STAGES}
+
+
+def merge(stats: Dict[str, StageStats]) -> None:
+    """別プロセスなどで取った計測結果を足し合わせる"""
+    for stage, stage_stats in stats.items():
+        _calls[stage] += stage_stats.calls
+        _nanoseconds[stage] += round(stage_stats.seconds * 1e9)
+
+
+def format_report(stats: Optional[Dict[str, StageStats]] = None) -> str:
+    """計測結果を表形式の文字列にする"""
+    stats = stats or snapshot()
+    total = sum(stage_stats.seconds for stage_stats in stats.values())
+    # 見出しは全角文字の表示幅を考慮して桁をそろえる
+    lines = [f"{'段階':<20}{'回数':>8}{'累計(ms)':>10}{'1回(µs)':>9}{'割合':>6}"]
+    for stage, stage_stats in stats.items():
+        per_call = stage_stats.seconds / stage_stats.calls * 1e6 if stage_stats.calls else 0.0
+        share = stage_stats.seconds / total if total else 0.0
+        lines.append(
+            f"{stage:<22}{stage_stats.calls:>10}{stage_stats.seconds * 1e3:>12.2f}{per_call:>10.2f}{share:>8.1%}"
+        )
+    lines.append(f"{'合計':<20}{'':>10}{total * 1e3:>12.2f}")
+    return '\n'.join(lines)
+
+
+def report_json(stats: Optional[Dict[str, StageStats]] = None) -> str:
+    """計測結果をJSON文字列にする"""
+    stats = stats or snapshot()
+    return json.dumps({stage: asdict(stage_stats) for stage, stage_stats in stats.items()})
+
+
+def install() -> bool:
+    """環境変数 FISH_WAR_INSTRUMENT が設定されていれば計測を有効にする（有効かどうかを返す）"""
+    if os.environ.get(ENV_VAR, '') not in ('', '0'):
+        enable()
+    return is_enabled()
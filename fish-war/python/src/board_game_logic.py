@@ -1,11 +1,19 @@
+import os
 import re
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Set, Union
 from collections import Counter
+from dataclasses import replace
+from types import MappingProxyType
 
 from board_game_types import (
-    PieceType, Player, Position, Piece, Board, GameState, Move,
-    PIECE_MOVES, FORWARD_DIRECTION
+    PieceType, Player, Position, Piece, Board, GameState, Move, MoveRecord,
+    PIECE_MOVES, FORWARD_DIRECTION, PIECES, SQUARE_POSITIONS, SQUARE_INDEX
 )
+from board_game_zobrist import piece_key, hand_key, compute_zobrist_key, SIDE_KEY
+from board_game_move_codec import (
+    MOVES, MOVE_TEXTS, TYPE_INDEX, encode_move, parse_move_code, board_move_code, placement_code
+)
+from board_game_persistent import PersistentGameState
 
 
 def initialize_game() -> GameState:
@@ -15,16 +23,16 @@ def initialize_game() -> GameState:
     
     # 初期配置（TypeScript版に合わせて修正）
     # 先手（下側）
-    board[3][0] = Piece(PieceType.TAKO, 'first')
-    board[3][1] = Piece(PieceType.MAGURO, 'first')
-    board[3][2] = Piece(PieceType.KAREI, 'first')
-    board[2][1] = Piece(PieceType.INADA, 'first')
+    board[3][0] = PIECES[(PieceType.TAKO, 'first')]
+    board[3][1] = PIECES[(PieceType.MAGURO, 'first')]
+    board[3][2] = PIECES[(PieceType.KAREI, 'first')]
+    board[2][1] = PIECES[(PieceType.INADA, 'first')]
     
     # 後手（上側）
-    board[0][0] = Piece(PieceType.KAREI, 'second')
-    board[0][1] = Piece(PieceType.MAGURO, 'second')
-    board[0][2] = Piece(PieceType.TAKO, 'second')
-    board[1][1] = Piece(PieceType.INADA, 'second')
+    board[0][0] = PIECES[(PieceType.KAREI, 'second')]
+    board[0][1] = PIECES[(PieceType.MAGURO, 'second')]
+    board[0][2] = PIECES[(PieceType.TAKO, 'second')]
+    board[1][1] = PIECES[(PieceType.INADA, 'second')]
     
     return GameState(
         board=board,
@@ -37,20 +45,58 @@ def initialize_game() -> GameState:
     )
 
 
+# マス番号（row * 3 + col）ごとの配列インデックスとPosition
+SQUARES: List[Tuple[int, int, Position]] = [
+    (square // 3, square % 3, position) for square, position in enumerate(SQUARE_POSITIONS)
+]
+_INDEX_OF_POSITION: Dict[Position, Tuple[int, int]] = {position: (row, col) for row, col, position in SQUARES}
+_COL_INDEX = {'A': 0, 'B': 1, 'C': 2}
+
+
 def position_to_index(position: Position) -> Tuple[int, int]:
     """Position型を配列インデックスに変換"""
-    col_map = {'A': 0, 'B': 1, 'C': 2}
-    return position.row - 1, col_map[position.col]
+    index = _INDEX_OF_POSITION.get(position)
+    if index is None:
+        # 盤外の Position は従来どおり計算する
+        return position.row - 1, _COL_INDEX[position.col]
+    return index
 
 
 def index_to_position(row: int, col: int) -> Optional[Position]:
     """配列インデックスをPosition型に変換"""
     if 0 <= row < 4 and 0 <= col < 3:
-        col_map = ['A', 'B', 'C']
-        return Position(col_map[col], row + 1)
+        return SQUARE_POSITIONS[row * 3 + col]
     return None
 
 
+def _build_move_table() -> Dict[Tuple[PieceType, Player], List[Tuple[Tuple[int, int, Position], ...]]]:
+    """(コマ種類, プレイヤー) ごとに各マスからの移動先一覧を作成"""
+    table = {}
+    for piece_type, deltas in PIECE_MOVES.items():
+        for player, forward in FORWARD_DIRECTION.items():
+            per_square = []
+            for row, col, _ in SQUARES:
+                destinations = []
+                for dc, dr in deltas:
+                    # プレイヤーによって前後を反転
+                    new_row = row + dr * forward
+                    new_col = col + dc
+                    if 0 <= new_row < 4 and 0 <= new_col < 3:
+                        destinations.append(SQUARES[new_row * 3 + new_col])
+                per_square.append(tuple(destinations))
+            table[(piece_type, player)] = per_square
+    return table
+
+
+# 移動先テーブル（インポート時に一度だけ作成）
+MOVE_TABLE = _build_move_table()
+# (コマ種類, プレイヤー) ごとに各マスから移動できるマス番号の集合
+DESTINATION_SQUARES: Dict[Tuple[PieceType, Player], List[frozenset]] = {
+    key: [frozenset(row * 3 + col for row, col, _ in destinations) for destinations in per_square]
+    for key, per_square in MOVE_TABLE.items()
+}
+
+
 def get_board_text(board: Board) -> str:
     """盤面をテキスト形式で出力"""
     result = []
@@ -81,24 +127,78 @@ def get_board_hash(board: Board) -> str:
     return board_str
 
 
+def get_zobrist_key(game_state: GameState) -> int:
+    """局面のZobristキーを取得（状態が持っていなければ計算する。計算した値は状態に保持しない）"""
+    if game_state.zobrist_key is None:
+        return compute_zobrist_key(game_state.board, game_state.hand_pieces, game_state.current_player)
+    return game_state.zobrist_key
+
+
+def _build_piece_locations(board: Board) -> Dict[Piece, Set[int]]:
+    """盤面からコマごとのマス番号の集合を作成（盤上にないコマは空集合）"""
+    locations: Dict[Piece, Set[int]] = {piece: set() for piece in PIECES.values()}
+    for square, (row, col, _) in enumerate(SQUARES):
+        piece = board[row][col]
+        if piece:
+            locations[piece].add(square)
+    return locations
+
+
+def get_piece_locations(game_state: GameState) -> Dict[Piece, Set[int]]:
+    """盤上のコマ（PIECES の共有Piece）ごとのマス番号の集合を取得
+
+    状態が索引を持っていればそれを返し（着手と取り消しで差分更新される）、なければ盤面から作成する。
+    索引は盤面と照合しないため、盤面を直接変更した状態では先に clear_caches() を呼ぶこと。
+    返した集合は変更しないこと。
+    """
+    locations = getattr(game_state, 'piece_locations', None)
+    if locations is None:
+        return _build_piece_locations(game_state.board)
+    return locations
+
+
+def find_maguro(game_state: GameState, player: Player) -> Optional[int]:
+    """プレイヤーのまぐろのマス番号（盤上になければNone）"""
+    for square in get_piece_locations(game_state)[PIECES[(PieceType.MAGURO, player)]]:
+        return square
+    return None
+
+
 def get_possible_moves(piece_type: PieceType, position: Position, player: Player) -> List[Position]:
     """コマの移動可能位置を計算"""
     row, col = position_to_index(position)
+    return [pos for _, _, pos in MOVE_TABLE[(piece_type, player)][row * 3 + col]]
+
+
+def generate_legal_moves(game_state: GameState) -> List[Move]:
+    """現在の手番で指せる手（移動と手ゴマの配置）をすべて列挙"""
+    if game_state.game_result:
+        return []
+    
+    player = game_state.current_player
+    board = game_state.board
     moves = []
+    empty_squares = []
     
-    for dc, dr in PIECE_MOVES[piece_type]:
-        # プレイヤーによって前後を反転
-        if player == 'first':
-            dr = dr * FORWARD_DIRECTION['first']
-        else:
-            dr = dr * FORWARD_DIRECTION['second']
-            
-        new_row = row + dr
-        new_col = col + dc
+    for from_sq, (row, col, _) in enumerate(SQUARES):
+        piece = board[row][col]
+        if piece is None:
+            empty_squares.append(from_sq)
+            continue
+        if piece.player != player:
+            continue
         
-        new_pos = index_to_position(new_row, new_col)
-        if new_pos:
-            moves.append(new_pos)
+        type_index = TYPE_INDEX[piece.type]
+        for to_row, to_col, _ in MOVE_TABLE[(piece.type, player)][from_sq]:
+            target_piece = board[to_row][to_col]
+            if target_piece is None or target_piece.player != player:
+                moves.append(MOVES[board_move_code(type_index, from_sq, to_row * 3 + to_col)])
+    
+    # 同じ種類の手ゴマは1回だけ列挙
+    for piece_type in dict.fromkeys(game_state.hand_pieces[player]):
+        type_index = TYPE_INDEX[piece_type]
+        for to_sq in empty_squares:
+            moves.append(MOVES[placement_code(type_index, to_sq)])
     
     return moves
 
@@ -135,90 +235,179 @@ def validate_move(game_state: GameState, move: Move) -> Optional[str]:
             return f"指定されたコマ（{move.piece_type.value}）と実際のコマ（{piece.type.value}）が一致しません"
         
         # 移動可能位置の確認
-        possible_moves = get_possible_moves(piece.type, move.from_position, piece.player)
-        if move.to_position not in possible_moves:
+        to_sq = SQUARE_INDEX.get(move.to_position)
+        if to_sq not in DESTINATION_SQUARES[(piece.type, piece.player)][from_row * 3 + from_col]:
             return "その位置には移動できません"
         
         # 移動先に自分のコマがないか確認
-        to_row, to_col = position_to_index(move.to_position)
-        target_piece = game_state.board[to_row][to_col]
+        target_piece = game_state.board[to_sq // 3][to_sq % 3]
         if target_piece and target_piece.player == game_state.current_player:
             return "自分のコマがある位置には移動できません"
     
     return None
 
 
+def _maguro_in_row(game_state: GameState, player: Player, row: int) -> bool:
+    """プレイヤーのまぐろが row 行目にいるか"""
+    locations = getattr(game_state, 'piece_locations', None)
+    if locations is None:
+        return PIECES[(PieceType.MAGURO, player)] in game_state.board[row]
+    # コマの位置の索引があれば、まぐろのマスだけを見る
+    return any(square // 3 == row for square in locations[PIECES[(PieceType.MAGURO, player)]])
+
+
 def update_maguro_status(game_state: GameState) -> None:
     """まぐろの相手陣地到達状態を更新"""
+    flags = game_state.maguro_in_enemy_territory
+    for player, enemy_row in (('first', 0), ('second', 3)):
+        if _maguro_in_row(game_state, player, enemy_row):
+            flags[player] = True
+
+
+def _update_maguro_flags(board: Board, flags: Dict[Player, bool]) -> None:
+    """盤面からまぐろの相手陣地到達フラグを更新"""
     # 先手のまぐろが後手陣地（1行目）にいるか
     for col in range(3):
-        piece = game_state.board[0][col]
+        piece = board[0][col]
         if piece and piece.type == PieceType.MAGURO and piece.player == 'first':
-            game_state.maguro_in_enemy_territory['first'] = True
+            flags['first'] = True
             break
     
     # 後手のまぐろが先手陣地（4行目）にいるか
     for col in range(3):
-        piece = game_state.board[3][col]
+        piece = board[3][col]
         if piece and piece.type == PieceType.MAGURO and piece.player == 'second':
-            game_state.maguro_in_enemy_territory['second'] = True
+            flags['second'] = True
             break
 
 
 def check_maguro_victory(game_state: GameState) -> Optional[Player]:
     """まぐろの相手陣地到達による勝利判定"""
-    # 各プレイヤーのまぐろが相手陣地にいるかチェック
-    for player in ['first', 'second']:
-        if game_state.maguro_in_enemy_territory[player]:
-            # プレイヤーのまぐろが相手陣地にいることを確認
-            enemy_row = 0 if player == 'first' else 3
-            for col in range(3):
-                piece = game_state.board[enemy_row][col]
-                if piece and piece.type == PieceType.MAGURO and piece.player == player:
-                    # まぐろが相手陣地にいて、相手が1手打った後（現在そのプレイヤーの番）なら勝利
-                    if game_state.current_player == player:
-                        return player
+    # まぐろが相手陣地にいて、相手が1手打った後（現在そのプレイヤーの番）なら勝利
+    player = game_state.current_player
+    if not game_state.maguro_in_enemy_territory[player]:
+        return None
     
+    # プレイヤーのまぐろが相手陣地にいることを確認
+    enemy_row = 0 if player == 'first' else 3
+    if _maguro_in_row(game_state, player, enemy_row):
+        return player
     return None
 
 
+def get_position_counts(game_state: GameState) -> Dict[str, int]:
+    """履歴の盤面ハッシュごとの出現回数を取得（状態が持っていなければ履歴から作成する。作成した値は状態に保持しない）"""
+    if game_state.position_counts is None:
+        return Counter(game_state.history)
+    return game_state.position_counts
+
+
+def _attach_caches(game_state: GameState) -> None:
+    """差分更新する派生値のうち、状態が持っていないものを作成して保持する（その場で適用する状態用）"""
+    if game_state.zobrist_key is None:
+        game_state.zobrist_key = compute_zobrist_key(
+            game_state.board, game_state.hand_pieces, game_state.current_player
+        )
+    if game_state.position_counts is None:
+        game_state.position_counts = Counter(game_state.history)
+    if game_state.piece_locations is None:
+        game_state.piece_locations = _build_piece_locations(game_state.board)
+
+
+def _carry_caches(game_state: GameState, new_state: GameState) -> None:
+    """game_state のコピー new_state に派生値を持たせる（game_state が持っていなければ作成し、game_state には保持しない）"""
+    new_state.zobrist_key = get_zobrist_key(game_state)
+    counts = game_state.position_counts
+    new_state.position_counts = Counter(new_state.history) if counts is None else counts.copy()
+    locations = game_state.piece_locations
+    new_state.piece_locations = _build_piece_locations(new_state.board) if locations is None else {
+        piece: set(squares) for piece, squares in locations.items()
+    }
+
+
 def check_for_draw(game_state: GameState) -> bool:
     """引き分け判定（同じ盤面が3回出現）"""
-    counter = Counter(game_state.history)
-    return any(count >= 3 for count in counter.values())
+    if not game_state.history:
+        return False
+    # 出現回数を着手ごとに更新していれば、増えるのは直前に追加した盤面だけなので、それだけを見ればよい
+    if isinstance(game_state, PersistentGameState):
+        return game_state.history.count(game_state.history[-1]) >= 3
+    counts = game_state.position_counts
+    if counts is None:
+        # 出現回数がなければ（直接作成した状態など）履歴全体を数える
+        return any(count >= 3 for count in Counter(game_state.history).values())
+    return counts[game_state.history[-1]] >= 3
 
 
-def make_move(game_state: GameState, move: Move) -> Tuple[GameState, Optional[str]]:
-    """移動を実行し、新しいゲーム状態を返す"""
-    # 移動の妥当性チェック
+def apply_move(game_state: GameState, move: Move) -> Tuple[Optional[MoveRecord], Optional[str]]:
+    """移動をその場で適用し、取り消し用の差分を返す
+
+    状態には差分更新する派生値を持たせ、以降の apply_move・undo_move で更新する。
+    """
     error = validate_move(game_state, move)
     if error:
-        return game_state, error
+        return None, error
     
-    # ゲーム状態のコピーを作成
-    new_state = game_state.copy()
+    return _apply_validated_move(game_state, move), None
+
+
+def _apply_validated_move(game_state: GameState, move: Move) -> MoveRecord:
+    """検証済みの移動をその場で適用"""
+    _attach_caches(game_state)
+    player = game_state.current_player
+    record = MoveRecord(
+        move=move,
+        moved_piece=None,
+        captured_piece=None,
+        promoted=False,
+        hand_index=None,
+        history_appended=False,
+        previous_maguro_flags=dict(game_state.maguro_in_enemy_territory),
+        previous_result=game_state.game_result,
+        previous_zobrist_key=game_state.zobrist_key
+    )
+    key = game_state.zobrist_key
+    locations = game_state.piece_locations
     
     if move.is_placement:
         # 手ゴマの配置
         to_row, to_col = position_to_index(move.to_position)
-        new_state.board[to_row][to_col] = Piece(move.piece_type, new_state.current_player)
-        new_state.hand_pieces[new_state.current_player].remove(move.piece_type)
+        hand = game_state.hand_pieces[player]
+        record.hand_index = hand.index(move.piece_type)
+        placed = PIECES[(move.piece_type, player)]
+        game_state.board[to_row][to_col] = placed
+        locations[placed].add(to_row * 3 + to_col)
+        key ^= piece_key(placed, to_row, to_col)
+        key ^= hand_key(move.piece_type, player, hand.count(move.piece_type) - 1)
+        del hand[record.hand_index]
     else:
         # 通常の移動
         from_row, from_col = position_to_index(move.from_position)
         to_row, to_col = position_to_index(move.to_position)
         
-        piece = new_state.board[from_row][from_col]
-        target_piece = new_state.board[to_row][to_col]
+        piece = game_state.board[from_row][from_col]
+        target_piece = game_state.board[to_row][to_col]
+        record.moved_piece = piece
+        record.captured_piece = target_piece
         
         # コマを移動
-        new_state.board[to_row][to_col] = piece
-        new_state.board[from_row][from_col] = None
+        game_state.board[to_row][to_col] = piece
+        game_state.board[from_row][from_col] = None
         
         # いなだの出世判定（まぐろ捕獲判定より先に実行）
         enemy_territory_row = 0 if piece.player == 'first' else 3
         if piece.type == PieceType.INADA and to_row == enemy_territory_row:
-            new_state.board[to_row][to_col] = Piece(PieceType.BURI, piece.player)
+            game_state.board[to_row][to_col] = PIECES[(PieceType.BURI, piece.player)]
+            record.promoted = True
+        
+        to_sq = to_row * 3 + to_col
+        locations[piece].discard(from_row * 3 + from_col)
+        if target_piece:
+            locations[target_piece].discard(to_sq)
+        locations[game_state.board[to_row][to_col]].add(to_sq)
+        
+        key ^= piece_key(piece, from_row, from_col)
+        key ^= piece_key(game_state.board[to_row][to_col], to_row, to_col)
         
         # 相手のコマを捕獲
         if target_piece:
@@ -227,62 +416,233 @@ def make_move(game_state: GameState, move: Move) -> Tuple[GameState, Optional[st
             if captured_type == PieceType.BURI:
                 captured_type = PieceType.INADA
             
-            new_state.hand_pieces[new_state.current_player].append(captured_type)
+            hand = game_state.hand_pieces[player]
+            record.hand_index = len(hand)
+            key ^= piece_key(target_piece, to_row, to_col)
+            key ^= hand_key(captured_type, player, hand.count(captured_type))
+            hand.append(captured_type)
             
             # まぐろを捕獲したら即勝利
             if target_piece.type == PieceType.MAGURO:
-                new_state.game_result = new_state.current_player
-                return new_state, None
+                game_state.zobrist_key = key
+                game_state.game_result = player
+                return record
     
     # 履歴に追加
-    new_state.history.append(get_board_hash(new_state.board))
+    board_hash = get_board_hash(game_state.board)
+    game_state.history.append(board_hash)
+    counts = game_state.position_counts
+    counts[board_hash] = counts.get(board_hash, 0) + 1
+    record.history_appended = True
     
     # 手番交代
-    new_state.current_player = 'second' if new_state.current_player == 'first' else 'first'
-    new_state.turn += 1
+    game_state.current_player = 'second' if player == 'first' else 'first'
+    game_state.turn += 1
+    game_state.zobrist_key = key ^ SIDE_KEY
     
     # まぐろ位置の更新
-    update_maguro_status(new_state)
+    update_maguro_status(game_state)
     
     # まぐろ勝利判定
-    winner = check_maguro_victory(new_state)
+    winner = check_maguro_victory(game_state)
     if winner:
-        new_state.game_result = winner
+        game_state.game_result = winner
     
     # 引き分け判定
-    elif check_for_draw(new_state):
-        new_state.game_result = 'draw'
+    elif check_for_draw(game_state):
+        game_state.game_result = 'draw'
+    
+    return record
+
+
+def undo_move(game_state: GameState, record: MoveRecord) -> None:
+    """apply_move で適用した移動を取り消す"""
+    move = record.move
+    
+    if record.history_appended:
+        board_hash = game_state.history.pop()
+        counts = game_state.position_counts
+        if counts is not None:
+            counts[board_hash] -= 1
+            if not counts[board_hash]:
+                del counts[board_hash]
+        game_state.current_player = 'second' if game_state.current_player == 'first' else 'first'
+        game_state.turn -= 1
+    
+    player = game_state.current_player
+    game_state.game_result = record.previous_result
+    game_state.maguro_in_enemy_territory.update(record.previous_maguro_flags)
+    if game_state.zobrist_key is not None:
+        game_state.zobrist_key = record.previous_zobrist_key
+    
+    to_row, to_col = position_to_index(move.to_position)
+    to_sq = to_row * 3 + to_col
+    locations = game_state.piece_locations
+    if locations is not None:
+        locations[game_state.board[to_row][to_col]].discard(to_sq)
+    if move.is_placement:
+        game_state.board[to_row][to_col] = None
+        game_state.hand_pieces[player].insert(record.hand_index, move.piece_type)
+    else:
+        from_row, from_col = position_to_index(move.from_position)
+        game_state.board[from_row][from_col] = record.moved_piece
+        game_state.board[to_row][to_col] = record.captured_piece
+        if locations is not None:
+            locations[record.moved_piece].add(from_row * 3 + from_col)
+            if record.captured_piece:
+                locations[record.captured_piece].add(to_sq)
+        if record.captured_piece:
+            del game_state.hand_pieces[player][record.hand_index]
+
+
+def _set_square(rows: List[tuple], row: int, col: int, piece: Optional[Piece]) -> None:
+    """行のタプルを1マスだけ差し替えたものに置き換える"""
+    cells = list(rows[row])
+    cells[col] = piece
+    rows[row] = tuple(cells)
+
+
+def _make_persistent_move(game_state: PersistentGameState, move: Move) -> PersistentGameState:
+    """検証済みの移動を適用した新しい永続状態を返す（変更のない行・手ゴマ・履歴は共有する）"""
+    player = game_state.current_player
+    rows = list(game_state.board)
+    hands = dict(game_state.hand_pieces)
+    key = game_state.zobrist_key
+    to_row, to_col = position_to_index(move.to_position)
+    
+    if move.is_placement:
+        # 手ゴマの配置
+        hand = hands[player]
+        placed = PIECES[(move.piece_type, player)]
+        _set_square(rows, to_row, to_col, placed)
+        key ^= piece_key(placed, to_row, to_col)
+        key ^= hand_key(move.piece_type, player, hand.count(move.piece_type) - 1)
+        index = hand.index(move.piece_type)
+        hands[player] = hand[:index] + hand[index + 1:]
+    else:
+        # 通常の移動（いなだの出世判定はまぐろ捕獲判定より先に実行）
+        from_row, from_col = position_to_index(move.from_position)
+        piece = rows[from_row][from_col]
+        target_piece = rows[to_row][to_col]
+        moved = piece
+        enemy_territory_row = 0 if piece.player == 'first' else 3
+        if piece.type == PieceType.INADA and to_row == enemy_territory_row:
+            moved = PIECES[(PieceType.BURI, piece.player)]
+        _set_square(rows, from_row, from_col, None)
+        _set_square(rows, to_row, to_col, moved)
+        key ^= piece_key(piece, from_row, from_col)
+        key ^= piece_key(moved, to_row, to_col)
+        
+        # 相手のコマを捕獲（ぶりは捕獲時にいなだに降格）
+        if target_piece:
+            captured_type = target_piece.type
+            if captured_type == PieceType.BURI:
+                captured_type = PieceType.INADA
+            hand = hands[player]
+            key ^= piece_key(target_piece, to_row, to_col)
+            key ^= hand_key(captured_type, player, hand.count(captured_type))
+            hands[player] = hand + (captured_type,)
+            
+            # まぐろを捕獲したら即勝利
+            if target_piece.type == PieceType.MAGURO:
+                return replace(
+                    game_state, board=tuple(rows), hand_pieces=MappingProxyType(hands),
+                    game_result=player, zobrist_key=key
+                )
+    
+    board = tuple(rows)
+    flags = dict(game_state.maguro_in_enemy_territory)
+    _update_maguro_flags(board, flags)
+    new_state = PersistentGameState(
+        board=board,
+        hand_pieces=MappingProxyType(hands),
+        current_player='second' if player == 'first' else 'first',
+        turn=game_state.turn + 1,
+        game_result=None,
+        history=game_state.history.append(get_board_hash(board)),
+        maguro_in_enemy_territory=MappingProxyType(flags),
+        zobrist_key=key ^ SIDE_KEY
+    )
+    
+    # まぐろ勝利判定・引き分け判定
+    winner = check_maguro_victory(new_state)
+    if winner:
+        return replace(new_state, game_result=winner)
+    if check_for_draw(new_state):
+        return replace(new_state, game_result='draw')
+    return new_state
+
+
+def make_move(game_state: Union[GameState, PersistentGameState],
+              move: Move) -> Tuple[Union[GameState, PersistentGameState], Optional[str]]:
+    """移動を実行し、新しいゲーム状態を返す（PersistentGameState なら変更のない部分を共有した状態を返す）"""
+    # 移動の妥当性チェック
+    error = validate_move(game_state, move)
+    if error:
+        return game_state, error
+    
+    if isinstance(game_state, PersistentGameState):
+        return _make_persistent_move(game_state, move), None
+    
+    # ゲーム状態のコピーを作成（差分更新する派生値は呼び出し元の状態には保持させず、新しい状態にだけ持たせる）
+    new_state = game_state.copy()
+    _carry_caches(game_state, new_state)
+    _apply_validated_move(new_state, move)
     
     return new_state, None
 
 
 def parse_move(move_str: str) -> Optional[Move]:
-    """文字列形式の手を解析してMove型に変換"""
-    # 手ゴマ配置: "い*B2"
-    placement_match = re.match(r'^([まいぶたか])\*([ABC])([1-4])$', move_str)
-    if placement_match:
-        piece_char, col, row = placement_match.groups()
-        piece_type = next(p for p in PieceType if p.value == piece_char)
-        return Move(
-            piece_type=piece_type,
-            from_position=None,
-            to_position=Position(col, int(row)),
-            is_placement=True
-        )
+    """文字列形式の手を解析してMove型に変換（"い↑B3B2"・"い*B2" 形式。方向記号は問わない）"""
+    code = parse_move_code(move_str)
+    return MOVES[code] if code is not None else None
+
+
+def format_move(move: Move) -> str:
+    """Move型を文字列形式の手に変換（parse_move の逆変換。方向記号は移動の向きから決める）"""
+    return MOVE_TEXTS[encode_move(move)]
+
+
+def get_position_text(game_state: GameState) -> str:
+    """局面（盤面・手番・手ゴマ・ターン）を1行の文字列で出力"""
+    first_hand = ''.join(p.value for p in game_state.hand_pieces['first'])
+    second_hand = ''.join(p.value for p in game_state.hand_pieces['second'])
+    return (
+        f"{get_board_hash(game_state.board)} {game_state.current_player} "
+        f"{first_hand or '-'} {second_hand or '-'} {game_state.turn}"
+    )
+
+
+def parse_position_text(text: str) -> Optional[GameState]:
+    """get_position_text の文字列を解析してGameStateに変換（履歴はこの局面のみ）"""
+    match = re.match(r'^((?:[まいぶたか][fs]|00){12}) (first|second) ([まいぶたか]+|-) ([まいぶたか]+|-) (\d+)$', text.strip())
+    if not match:
+        return None
+    board_hash, current_player, first_hand, second_hand, turn = match.groups()
     
-    # 通常移動: "い↑B3B2" または "い→B3C3"
-    move_match = re.match(r'^([まいぶたか])[↑↓→←]([ABC])([1-4])([ABC])([1-4])$', move_str)
-    if move_match:
-        piece_char, from_col, from_row, to_col, to_row = move_match.groups()
-        piece_type = next(p for p in PieceType if p.value == piece_char)
-        return Move(
-            piece_type=piece_type,
-            from_position=Position(from_col, int(from_row)),
-            to_position=Position(to_col, int(to_row)),
-            is_placement=False
-        )
+    piece_types = {p.value: p for p in PieceType}
+    players = {'f': 'first', 's': 'second'}
+    board: Board = [[None for _ in range(3)] for _ in range(4)]
+    for index in range(12):
+        cell = board_hash[2 * index:2 * index + 2]
+        if cell != '00':
+            board[index // 3][index % 3] = PIECES[(piece_types[cell[0]], players[cell[1]])]
     
-    return None
+    game_state = GameState(
+        board=board,
+        hand_pieces={
+            'first': [piece_types[c] for c in first_hand if c != '-'],
+            'second': [piece_types[c] for c in second_hand if c != '-']
+        },
+        current_player=current_player,
+        turn=int(turn),
+        game_result=None,
+        history=[board_hash],
+        maguro_in_enemy_territory={'first': False, 'second': False}
+    )
+    # 相手陣地にいるまぐろは到達済みとして扱う
+    update_maguro_status(game_state)
+    return game_state
 
 
 def get_game_info_text(game_state: GameState) -> str:
@@ -305,4 +665,10 @@ def get_game_info_text(game_state: GameState) -> str:
             winner = '先手' if game_state.game_result == 'first' else '後手'
             result.append(f"結果: {winner}の勝ち")
     
-    return '\n'.join(result)
\ No newline at end of file
+    return '\n'.join(result)
+
+
+# 環境変数で計測が指定されていれば、インポート時に計測を有効にする
+if os.environ.get('FISH_WAR_INSTRUMENT', '') not in ('', '0'):
+    import board_game_instrumentation
+    board_game_instrumentation.install()
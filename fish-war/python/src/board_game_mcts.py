@@ -0,0 +1,207 @@
+"""
+おさかな対戦 - モンテカルロ木探索
+UCTで木を伸ばし、ビットボード上のランダムプレイアウトで局面を評価する
+
+並列化はルート並列（各ワーカーが独立した木を作り、ルートの訪問回数を合算する）で行う。
+ワーカーごとの乱数の種はシードとワーカー番号から決まるため、
+同じシード・ワーカー数・反復回数なら結果は再現する。
+"""
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from board_game_types import GameState, Move
+from board_game_bitboard import (
+    BitboardState, BitboardMove, from_game_state, bitboard_to_move,
+    NUM_TYPES, MAGURO, PLAYERS
+)
+
+
+DEFAULT_EXPLORATION = math.sqrt(2)
+DEFAULT_MAX_PLAYOUT_PLIES = 200
+
+
+@dataclass
+class MCTSResult:
+    """探索結果（ルートの各手の訪問回数と勝率）"""
+    best_move: Optional[Move]
+    iterations: int
+    elapsed: float
+    move_stats: List[Tuple[Move, int, float]] = field(default_factory=list)
+
+    @property
+    def playouts_per_second(self) -> int:
+        return int(self.iterations / self.elapsed) if self.elapsed > 0 else 0
+
+
+class _Node:
+    """探索木のノード（value は直前に指したプレイヤーから見た勝ち点の合計）"""
+
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'value')
+
+    def __init__(self, move: Optional[BitboardMove], parent: Optional['_Node'], untried: List[BitboardMove]):
+        self.move = move
+        self.parent = parent
+        self.children: List['_Node'] = []
+        self.untried = untried
+        self.visits = 0
+        self.value = 0.0
+
+    def select_child(self, exploration: float) -> '_Node':
+        """UCT値が最大の子を選ぶ"""
+        log_visits = math.log(self.visits)
+        best, best_score = None, -1.0
+        for child in self.children:
+            score = child.value / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+def _winning_capture(state: BitboardState, moves: List[BitboardMove]) -> Optional[BitboardMove]:
+    """相手のまぐろを捕獲する手があれば返す"""
+    enemy_maguro = state.pieces[(state.side ^ 1) * NUM_TYPES + MAGURO]
+    for move in moves:
+        if move[1] >= 0 and enemy_maguro >> move[2] & 1:
+            return move
+    return None
+
+
+def random_playout(state: BitboardState, rng: random.Random, max_plies: int = DEFAULT_MAX_PLAYOUT_PLIES,
+                   guided: bool = True) -> Optional[str]:
+    """局面をその場で最後まで進め、結果を返す（打ち切りや合法手なしはNone）
+
+    guided なら相手のまぐろを捕獲できるときは必ず捕獲する。
+    """
+    for _ in range(max_plies):
+        if state.result is not None:
+            return state.result
+        moves = state.generate_moves()
+        if not moves:
+            return None
+        move = _winning_capture(state, moves) if guided else None
+        state.advance(move or moves[rng.randrange(len(moves))])
+    return state.result
+
+
+def _reward(result: Optional[str], player: int) -> float:
+    """指定プレイヤーから見た勝ち点（勝ち1・負け0・引き分けや打ち切り0.5）"""
+    if result == PLAYERS[player]:
+        return 1.0
+    if result is None or result == 'draw':
+        return 0.5
+    return 0.0
+
+
+def run_tree(root_state: BitboardState, iterations: int, seed: int, exploration: float = DEFAULT_EXPLORATION,
+             max_playout_plies: int = DEFAULT_MAX_PLAYOUT_PLIES, guided: bool = True) -> Dict[BitboardMove, Tuple[int, float]]:
+    """1本の木で探索し、ルートの各手の (訪問回数, 勝ち点合計) を返す"""
+    rng = random.Random(seed)
+    root = _Node(None, None, root_state.generate_moves())
+
+    for _ in range(iterations):
+        node = root
+        state = root_state.copy()
+        movers = []
+
+        # 選択
+        while not node.untried and node.children:
+            node = node.select_child(exploration)
+            movers.append(state.side)
+            state.advance(node.move)
+
+        # 展開
+        if node.untried and state.result is None:
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            movers.append(state.side)
+            state.advance(move)
+            child = _Node(move, node, state.generate_moves())
+            node.children.append(child)
+            node = child
+
+        # プレイアウト
+        result = random_playout(state, rng, max_playout_plies, guided)
+
+        # 逆伝播
+        while node.parent is not None:
+            node.visits += 1
+            node.value += _reward(result, movers.pop())
+            node = node.parent
+        root.visits += 1
+
+    return {child.move: (child.visits, child.value) for child in root.children}
+
+
+def _run_tree_task(args) -> Dict[BitboardMove, Tuple[int, float]]:
+    return run_tree(*args)
+
+
+class MCTSPlayer:
+    """UCTによるモンテカルロ木探索プレイヤー"""
+
+    def __init__(self, iterations: int = 1000, exploration: float = DEFAULT_EXPLORATION, workers: int = 1,
+                 seed: int = 0, max_playout_plies: int = DEFAULT_MAX_PLAYOUT_PLIES, guided: bool = True):
+        self.iterations = iterations
+        self.exploration = exploration
+        self.workers = workers
+        self.seed = seed
+        self.max_playout_plies = max_playout_plies
+        self.guided = guided
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """ワーカープロセスを終了"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def search(self, game_state: GameState) -> MCTSResult:
+        """局面から探索して最も訪問回数の多い手を選ぶ"""
+        start = time.perf_counter()
+        state = from_game_state(game_state)
+        if state.result is not None or not state.generate_moves():
+            return MCTSResult(None, 0, 0.0)
+
+        # 反復回数をワーカーに割り振り、各ワーカーの種はシードとワーカー番号から決める
+        workers = max(1, min(self.workers, self.iterations))
+        tasks = []
+        for index in range(workers):
+            share = self.iterations // workers + (1 if index < self.iterations % workers else 0)
+            tasks.append((state, share, self.seed * 1_000_003 + index, self.exploration,
+                          self.max_playout_plies, self.guided))
+
+        if workers == 1:
+            trees = [_run_tree_task(tasks[0])]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            trees = list(self._executor.map(_run_tree_task, tasks))
+
+        totals: Dict[BitboardMove, List[float]] = {}
+        for tree in trees:
+            for move, (visits, value) in tree.items():
+                total = totals.setdefault(move, [0, 0.0])
+                total[0] += visits
+                total[1] += value
+
+        ranked = sorted(totals.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+        move_stats = [
+            (bitboard_to_move(move), int(visits), value / visits if visits else 0.0)
+            for move, (visits, value) in ranked
+        ]
+        return MCTSResult(
+            best_move=move_stats[0][0],
+            iterations=self.iterations,
+            elapsed=time.perf_counter() - start,
+            move_stats=move_stats
+        )
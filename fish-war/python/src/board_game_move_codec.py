@@ -0,0 +1,108 @@
+"""
+おさかな対戦 - 手の符号化
+盤上の移動（コマ種類×移動元×移動先）と手ゴマの配置（コマ種類×配置先）のすべてに
+0〜779 の整数コードを割り当て、文字列との相互変換を表引きで行う
+
+Move は値ごとに1つだけ作成される共有インスタンスで、コードとの変換は同一性による表引きで行う。
+コードのマス番号は row * 3 + col で、ビットボード用の手と同じ並び。
+"""
+
+from typing import Dict, List, Optional
+
+from board_game_types import PieceType, Position, Move, SQUARE_POSITIONS, SQUARE_INDEX
+
+
+NUM_ROWS = 4
+NUM_COLS = 3
+NUM_SQUARES = NUM_ROWS * NUM_COLS
+PIECE_TYPES: List[PieceType] = list(PieceType)
+TYPE_INDEX: Dict[PieceType, int] = {piece_type: index for index, piece_type in enumerate(PIECE_TYPES)}
+ARROWS = '↑↓→←'
+
+# 盤上の移動のコード数（この後ろに配置のコードが続く）
+NUM_BOARD_MOVE_CODES = len(PIECE_TYPES) * NUM_SQUARES * NUM_SQUARES
+NUM_MOVE_CODES = NUM_BOARD_MOVE_CODES + len(PIECE_TYPES) * NUM_SQUARES
+
+
+def board_move_code(type_index: int, from_sq: int, to_sq: int) -> int:
+    """盤上の移動のコード"""
+    return (type_index * NUM_SQUARES + from_sq) * NUM_SQUARES + to_sq
+
+
+def placement_code(type_index: int, to_sq: int) -> int:
+    """手ゴマの配置のコード"""
+    return NUM_BOARD_MOVE_CODES + type_index * NUM_SQUARES + to_sq
+
+
+def _arrow(from_sq: int, to_sq: int) -> str:
+    """移動の向きに合う方向記号（縦方向の移動を優先）"""
+    from_row, from_col = divmod(from_sq, NUM_COLS)
+    to_row, to_col = divmod(to_sq, NUM_COLS)
+    if to_row < from_row:
+        return '↑'
+    if to_row > from_row:
+        return '↓'
+    return '→' if to_col > from_col else '←'
+
+
+def _build_tables():
+    """コード → Move・文字列と、受理する全文字列 → コードの表を作成"""
+    moves: List[Move] = []
+    texts: List[str] = []
+    codes: Dict[str, int] = {}
+    for piece_type in PIECE_TYPES:
+        for from_sq in range(NUM_SQUARES):
+            for to_sq in range(NUM_SQUARES):
+                code = len(moves)
+                moves.append(Move(piece_type, SQUARE_POSITIONS[from_sq], SQUARE_POSITIONS[to_sq], False))
+                texts.append(f"{piece_type.value}{_arrow(from_sq, to_sq)}{SQUARE_POSITIONS[from_sq]}{SQUARE_POSITIONS[to_sq]}")
+                # 方向記号は入力の一部として必要なだけなので、どの記号でも受理する
+                for arrow in ARROWS:
+                    codes[f"{piece_type.value}{arrow}{SQUARE_POSITIONS[from_sq]}{SQUARE_POSITIONS[to_sq]}"] = code
+    for piece_type in PIECE_TYPES:
+        for to_sq in range(NUM_SQUARES):
+            code = len(moves)
+            moves.append(Move(piece_type, None, SQUARE_POSITIONS[to_sq], True))
+            texts.append(f"{piece_type.value}*{SQUARE_POSITIONS[to_sq]}")
+            codes[texts[-1]] = code
+    return moves, texts, codes
+
+
+# コード順の共有Move・表記と、文字列からコードへの表（インポート時に一度だけ作成）
+MOVES, MOVE_TEXTS, _CODE_OF_TEXT = _build_tables()
+_CODE_OF_MOVE: Dict[Move, int] = {move: code for code, move in enumerate(MOVES)}
+
+
+def square_of_position(position: Position) -> int:
+    """Position をマス番号に変換"""
+    return SQUARE_INDEX[position]
+
+
+def encode_move(move: Move) -> int:
+    """Move をコードに変換"""
+    code = _CODE_OF_MOVE.get(move)
+    if code is not None:
+        return code
+    to_sq = square_of_position(move.to_position)
+    if move.is_placement:
+        return placement_code(TYPE_INDEX[move.piece_type], to_sq)
+    return board_move_code(TYPE_INDEX[move.piece_type], square_of_position(move.from_position), to_sq)
+
+
+def decode_move(code: int) -> Move:
+    """コードを共有の Move に変換"""
+    return MOVES[code]
+
+
+def parse_move_code(move_str: str) -> Optional[int]:
+    """文字列形式の手をコードに変換（解析できなければNone）"""
+    code = _CODE_OF_TEXT.get(move_str)
+    if code is None and move_str[-1:] == '\n':
+        # 正規表現の $ と同様に末尾の改行1つは許容する
+        code = _CODE_OF_TEXT.get(move_str[:-1])
+    return code
+
+
+def format_move_code(code: int) -> str:
+    """コードを文字列形式の手に変換"""
+    return MOVE_TEXTS[code]
@@ -0,0 +1,170 @@
+"""
+おさかな対戦 - 永続（不変）ゲーム状態
+盤面の行・手ゴマ・履歴を親の状態と共有する不変の GameState
+
+make_move に PersistentGameState を渡すと、変更のない行・相手の手ゴマ・履歴の先頭部分を共有した
+新しい状態を返すため、コピーは O(1) で、n 手の再生で確保する履歴は O(n) で済む。
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from board_game_types import PieceType, Player, Piece, GameState
+from board_game_zobrist import compute_zobrist_key
+
+
+# 盤面ハッシュの出現回数を持つ永続ハッシュトライ（32分岐×3段、葉は (ハッシュ, 回数) の組のタプル）
+_TRIE_BITS = 5
+_TRIE_WIDTH = 1 << _TRIE_BITS
+_TRIE_MASK = _TRIE_WIDTH - 1
+_TRIE_DEPTH = 3
+_EMPTY_NODE = (None,) * _TRIE_WIDTH
+
+
+def _trie_count(node, hashed: int, board_hash: str) -> int:
+    """トライから出現回数を引く"""
+    for level in range(_TRIE_DEPTH):
+        if node is None:
+            return 0
+        node = node[hashed >> (level * _TRIE_BITS) & _TRIE_MASK]
+    for key, count in node or ():
+        if key == board_hash:
+            return count
+    return 0
+
+
+def _trie_increment(node, hashed: int, board_hash: str, level: int = 0):
+    """出現回数を1増やしたトライを返す（経路上のノードだけを作り直す）"""
+    if level == _TRIE_DEPTH:
+        bucket = node or ()
+        for index, (key, count) in enumerate(bucket):
+            if key == board_hash:
+                return bucket[:index] + ((key, count + 1),) + bucket[index + 1:]
+        return bucket + ((board_hash, 1),)
+    node = node or _EMPTY_NODE
+    index = hashed >> (level * _TRIE_BITS) & _TRIE_MASK
+    return node[:index] + (_trie_increment(node[index], hashed, board_hash, level + 1),) + node[index + 1:]
+
+
+class PersistentHistory:
+    """盤面ハッシュの履歴（親の履歴を共有する連結リスト）
+
+    各ノードはその時点までの出現回数のトライを持つため、count は履歴の長さによらず定数時間。
+    """
+
+    __slots__ = ('_last', '_parent', '_length', '_counts')
+
+    def __init__(self, last: Optional[str] = None, parent: Optional['PersistentHistory'] = None,
+                 length: int = 0, counts=None):
+        self._last = last
+        self._parent = parent
+        self._length = length
+        self._counts = counts
+
+    @classmethod
+    def from_iterable(cls, board_hashes: Iterable[str]) -> 'PersistentHistory':
+        history = EMPTY_HISTORY
+        for board_hash in board_hashes:
+            history = history.append(board_hash)
+        return history
+
+    def append(self, board_hash: str) -> 'PersistentHistory':
+        """末尾に盤面ハッシュを追加した新しい履歴を返す"""
+        counts = _trie_increment(self._counts, hash(board_hash), board_hash)
+        return PersistentHistory(board_hash, self, self._length + 1, counts)
+
+    def count(self, board_hash: str) -> int:
+        """盤面ハッシュの出現回数"""
+        return _trie_count(self._counts, hash(board_hash), board_hash)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._to_list())
+
+    def _to_list(self) -> List[str]:
+        values = []
+        node = self
+        while node._length:
+            values.append(node._last)
+            node = node._parent
+        values.reverse()
+        return values
+
+    def __getitem__(self, index):
+        if index == -1 or index == self._length - 1:
+            if not self._length:
+                raise IndexError("履歴が空です")
+            return self._last
+        return self._to_list()[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PersistentHistory, list, tuple)):
+            return len(self) == len(other) and self._to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PersistentHistory({self._to_list()!r})"
+
+    def __reduce__(self):
+        # トライは hash() に依存するため、別プロセスでは履歴から作り直す
+        return PersistentHistory.from_iterable, (self._to_list(),)
+
+
+EMPTY_HISTORY = PersistentHistory()
+
+
+@dataclass(frozen=True)
+class PersistentGameState:
+    """不変のゲーム状態（GameState と同じ属性を読み出せる）"""
+    board: Tuple[Tuple[Optional[Piece], ...], ...]
+    hand_pieces: Mapping[Player, Tuple[PieceType, ...]]
+    current_player: Player
+    turn: int
+    game_result: Optional[str]
+    history: PersistentHistory
+    maguro_in_enemy_territory: Mapping[Player, bool]
+    # 盤面・手ゴマ・手番の64ビットZobristキー（常に計算済み）
+    zobrist_key: int = field(compare=False, repr=False, default=0)
+
+    def copy(self) -> 'PersistentGameState':
+        """不変なのでコピーせずにそのまま返す"""
+        return self
+
+    def __reduce__(self):
+        # MappingProxyType は pickle できないため、変更可能な状態を経由する
+        return freeze_game_state, (thaw_game_state(self),)
+
+
+def freeze_game_state(game_state: GameState) -> PersistentGameState:
+    """GameState を不変の状態に変換"""
+    hand_pieces = {player: tuple(pieces) for player, pieces in game_state.hand_pieces.items()}
+    zobrist_key = game_state.zobrist_key
+    if zobrist_key is None:
+        zobrist_key = compute_zobrist_key(game_state.board, game_state.hand_pieces, game_state.current_player)
+    return PersistentGameState(
+        board=tuple(tuple(row) for row in game_state.board),
+        hand_pieces=MappingProxyType(hand_pieces),
+        current_player=game_state.current_player,
+        turn=game_state.turn,
+        game_result=game_state.game_result,
+        history=PersistentHistory.from_iterable(game_state.history),
+        maguro_in_enemy_territory=MappingProxyType(dict(game_state.maguro_in_enemy_territory)),
+        zobrist_key=zobrist_key
+    )
+
+
+def thaw_game_state(state: PersistentGameState) -> GameState:
+    """不変の状態を（変更可能な）GameState に変換"""
+    return GameState(
+        board=[list(row) for row in state.board],
+        hand_pieces={player: list(pieces) for player, pieces in state.hand_pieces.items()},
+        current_player=state.current_player,
+        turn=state.turn,
+        game_result=state.game_result,
+        history=list(state.history),
+        maguro_in_enemy_territory=dict(state.maguro_in_enemy_territory),
+        zobrist_key=state.zobrist_key
+    )
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 局面索引
+棋譜コーパスを一度再生して、局面キー（Zobristキー）→ (対局番号, 手数) の索引と
+局面ごとの勝敗集計をキー順のファイルに書き出し、mmap上の二分探索で引く
+
+索引はディレクトリ単位で、追加のたびにキー順に並べたセグメントを1つ作る。
+index.json に登録済みの対局数とセグメント一覧を記録し、一時ファイルからの置き換えで更新する。
+セグメントが増えたら compact でまとめられる。
+
+セグメントのファイル形式（リトルエンディアン）:
+    seg-NNNNN.pos    (キー uint64, 対局番号 uint32, 手数 uint32) をキー順に並べたもの
+    seg-NNNNN.stats  (キー uint64, 先手勝ち・後手勝ち・引き分け・未決着の対局数 uint32×4) をキー順に並べたもの
+"""
+
+import argparse
+import heapq
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from board_game_types import GameState, Move
+from board_game_logic import initialize_game, apply_move, get_zobrist_key, parse_position_text
+from board_game_record import GameRecordFile
+
+
+MANIFEST_FILE = 'index.json'
+INDEX_VERSION = 1
+ENTRY = struct.Struct('<QII')
+STATS = struct.Struct('<QIIII')
+DEFAULT_RUN_SIZE = 1_000_000
+
+# 集計の並び（先手勝ち・後手勝ち・引き分け・未決着）
+OUTCOME_SLOTS = {'first': 0, 'second': 1, 'draw': 2, None: 3}
+
+
+@dataclass
+class PositionStats:
+    """局面に到達した対局の結果の集計（同じ対局での再到達は1回と数える）"""
+    first_wins: int = 0
+    second_wins: int = 0
+    draws: int = 0
+    unfinished: int = 0
+
+    @property
+    def games(self) -> int:
+        return self.first_wins + self.second_wins + self.draws + self.unfinished
+
+
+def game_positions(moves: Sequence[Move]) -> Tuple[List[int], Optional[str]]:
+    """棋譜を再生し、各手数の局面キー（初期局面を含む）と結果を返す（不正な手があればそこで打ち切る）"""
+    game_state = initialize_game()
+    keys = [get_zobrist_key(game_state)]
+    for move in moves:
+        _, error = apply_move(game_state, move)
+        if error:
+            return keys, None
+        keys.append(get_zobrist_key(game_state))
+    return keys, game_state.game_result
+
+
+class _KeyView:
+    """固定長レコードの先頭キーを並びとして見せる（bisect 用）"""
+
+    def __init__(self, buffer, record: struct.Struct):
+        self._buffer = buffer
+        self._size = record.size
+        self._length = len(buffer) // record.size
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        return int.from_bytes(self._buffer[index * self._size:index * self._size + 8], 'little')
+
+
+class _Segment:
+    """キー順に並んだ1つのセグメント"""
+
+    def __init__(self, directory: str, name: str):
+        self.name = name
+        self._files = []
+        self.entries = self._map(os.path.join(directory, name + '.pos'))
+        self.stats = self._map(os.path.join(directory, name + '.stats'))
+        self.entry_keys = _KeyView(self.entries, ENTRY)
+        self.stats_keys = _KeyView(self.stats, STATS)
+
+    def _map(self, path: str):
+        f = open(path, 'rb')
+        self._files.append(f)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def lookup_stats(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        index = bisect_left(self.stats_keys, key)
+        if index < len(self.stats_keys) and self.stats_keys[index] == key:
+            return STATS.unpack_from(self.stats, index * STATS.size)[1:]
+        return None
+
+    def occurrences(self, key: int) -> Iterator[Tuple[int, int]]:
+        start = bisect_left(self.entry_keys, key)
+        end = bisect_right(self.entry_keys, key, lo=start)
+        for index in range(start, end):
+            yield ENTRY.unpack_from(self.entries, index * ENTRY.size)[1:]
+
+    def iter_entries(self) -> Iterator[Tuple[int, int, int]]:
+        return ENTRY.iter_unpack(self.entries)
+
+    def iter_stats(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        return STATS.iter_unpack(self.stats)
+
+    def close(self) -> None:
+        self.entries.close()
+        self.stats.close()
+        for f in self._files:
+            f.close()
+
+
+def _write_records(path: str, record: struct.Struct, rows: Iterable[tuple]) -> None:
+    """固定長レコードを書き出す"""
+    with open(path, 'wb') as f:
+        buffer = bytearray()
+        for row in rows:
+            buffer += record.pack(*row)
+            if len(buffer) >= 1 << 20:
+                f.write(buffer)
+                buffer.clear()
+        f.write(buffer)
+
+
+def _merge_stats(rows: Iterable[Tuple[int, int, int, int, int]]) -> Iterator[Tuple[int, int, int, int, int]]:
+    """キー順の集計行のうち同じキーのものを足し合わせる"""
+    current = None
+    for row in rows:
+        if current is not None and current[0] == row[0]:
+            for slot in range(1, 5):
+                current[slot] += row[slot]
+        else:
+            if current is not None:
+                yield tuple(current)
+            current = list(row)
+    if current is not None:
+        yield tuple(current)
+
+
+class PositionIndex:
+    """局面キーから対局と勝敗集計を引く索引"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != INDEX_VERSION:
+                raise ValueError(f"索引の形式が異なります: {directory}")
+        else:
+            manifest = {'version': INDEX_VERSION, 'games': 0, 'next_segment': 0, 'segments': []}
+        self.games = manifest['games']
+        self._next_segment = manifest['next_segment']
+        self._segments = [_Segment(directory, name) for name in manifest['segments']]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def _save_manifest(self) -> None:
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        manifest = {
+            'version': INDEX_VERSION,
+            'games': self.games,
+            'next_segment': self._next_segment,
+            'segments': [segment.name for segment in self._segments],
+        }
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+    def _new_segment_name(self) -> str:
+        name = f"seg-{self._next_segment:05d}"
+        self._next_segment += 1
+        return name
+
+    def _write_segment(self, entries: List[Tuple[int, int, int]], outcomes: dict) -> None:
+        """1局以上の局面を1つのセグメントとして書き出す"""
+        entries.sort()
+        stats = []
+        previous = None
+        for key, game_id, _ in entries:
+            # 同じ対局での再到達は1回と数える
+            if (key, game_id) == previous:
+                continue
+            previous = (key, game_id)
+            if not stats or stats[-1][0] != key:
+                stats.append([key, 0, 0, 0, 0])
+            stats[-1][1 + OUTCOME_SLOTS[outcomes[game_id]]] += 1
+
+        name = self._new_segment_name()
+        _write_records(os.path.join(self.directory, name + '.pos'), ENTRY, entries)
+        _write_records(os.path.join(self.directory, name + '.stats'), STATS, stats)
+        self._segments.append(_Segment(self.directory, name))
+
+    def add_games(self, games: Iterable[Sequence[Move]], run_size: int = DEFAULT_RUN_SIZE) -> int:
+        """対局を続きの対局番号で追加し、追加した対局数を返す
+
+        局面が run_size 件たまるごとにセグメントを書き出すため、メモリ使用量は run_size に比例する。
+        """
+        entries: List[Tuple[int, int, int]] = []
+        outcomes = {}
+        added = 0
+        for moves in games:
+            game_id = self.games + added
+            keys, outcomes[game_id] = game_positions(moves)
+            entries.extend((key, game_id, ply) for ply, key in enumerate(keys))
+            added += 1
+            if len(entries) >= run_size:
+                self._write_segment(entries, outcomes)
+                entries, outcomes = [], {}
+        if entries:
+            self._write_segment(entries, outcomes)
+
+        self.games += added
+        self._save_manifest()
+        return added
+
+    def compact(self) -> None:
+        """全セグメントを1つにまとめる"""
+        if len(self._segments) <= 1:
+            return
+        old_segments = self._segments
+        name = self._new_segment_name()
+        _write_records(
+            os.path.join(self.directory, name + '.pos'), ENTRY,
+            heapq.merge(*(segment.iter_entries() for segment in old_segments))
+        )
+        _write_records(
+            os.path.join(self.directory, name + '.stats'), STATS,
+            _merge_stats(heapq.merge(*(segment.iter_stats() for segment in old_segments)))
+        )
+        self._segments = [_Segment(self.directory, name)]
+        self._save_manifest()
+
+        for segment in old_segments:
+            segment.close()
+            os.remove(os.path.join(self.directory, segment.name + '.pos'))
+            os.remove(os.path.join(self.directory, segment.name + '.stats'))
+
+    def lookup(self, position: Union[GameState, int]) -> PositionStats:
+        """局面（GameState または局面キー）に到達した対局の結果の集計"""
+        key = position if isinstance(position, int) else get_zobrist_key(position)
+        totals = [0, 0, 0, 0]
+        for segment in self._segments:
+            counts = segment.lookup_stats(key)
+            if counts:
+                for slot, count in enumerate(counts):
+                    totals[slot] += count
+        return PositionStats(*totals)
+
+    def occurrences(self, position: Union[GameState, int], limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """局面に到達した (対局番号, 手数) の一覧（対局番号順）"""
+        key = position if isinstance(position, int) else get_zobrist_key(position)
+        result = []
+        for game_id, ply in heapq.merge(*(segment.occurrences(key) for segment in self._segments)):
+            if limit is not None and len(result) >= limit:
+                break
+            result.append((game_id, ply))
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の局面索引")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    update = subparsers.add_parser('update', help="バイナリ棋譜のうち未登録の対局を索引に追加")
+    update.add_argument('index_dir')
+    update.add_argument('records', help="board_game_record.py 形式の棋譜ファイル")
+    update.add_argument('--compact', action='store_true', help="追加後にセグメントをまとめる")
+    query = subparsers.add_parser('query', help="局面（get_position_text 形式）を検索")
+    query.add_argument('index_dir')
+    query.add_argument('position')
+    query.add_argument('--limit', type=int, default=20, help="表示する対局数の上限")
+    args = parser.parse_args()
+
+    with PositionIndex(args.index_dir) as index:
+        if args.command == 'update':
+            with GameRecordFile(args.records) as records:
+                added = index.add_games(records[game_id].moves for game_id in range(index.games, len(records)))
+            if args.compact:
+                index.compact()
+            print(f"{added} 局を追加しました（登録済み {index.games} 局）")
+        else:
+            game_state = parse_position_text(args.position)
+            if game_state is None:
+                parser.error(f"局面を解析できません: {args.position}")
+            stats = index.lookup(game_state)
+            print(f"{stats.games} 局: 先手勝ち {stats.first_wins}, 後手勝ち {stats.second_wins}, "
+                  f"引き分け {stats.draws}, 未決着 {stats.unfinished}")
+            for game_id, ply in index.occurrences(game_state, args.limit):
+                print(f"  対局 {game_id} の {ply} 手目")
+
+
+if __name__ == "__main__":
+    main()
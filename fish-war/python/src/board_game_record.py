@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - バイナリ棋譜形式
+1手をおおむね1バイトで表す棋譜ファイルと、任意の対局を番号で読むためのオフセット索引
+
+ファイル形式（リトルエンディアン）:
+    ファイルヘッダ  magic b'FWGR', version(uint16), 予約(uint16)
+    対局ごと        結果(uint8), メタデータ長(uint16), 手のバイト列長(uint32), メタデータ(UTF-8), 手のバイト列
+索引ファイル（<棋譜ファイル>.idx）:
+    magic b'FWGI', version(uint16), 予約(uint16), 各対局の先頭オフセット(uint64 の配列)
+
+手のバイト列は、実際に指しうる移動と手ゴマの配置（236種類）を1バイトで、
+それ以外（形式上は正しいが指せない手）は 0xFF に続く2バイトの手のコードで表す。
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from typing import IO, Dict, Iterable, Iterator, List, Optional
+
+from board_game_types import PieceType, Move
+from board_game_logic import (
+    MOVE_TABLE, initialize_game, apply_move, parse_move, format_move
+)
+from board_game_move_codec import (
+    MOVES, TYPE_INDEX, NUM_SQUARES,
+    encode_move, board_move_code, placement_code
+)
+
+
+FILE_MAGIC = b'FWGR'
+INDEX_MAGIC = b'FWGI'
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct('<4sHH')
+GAME_HEADER = struct.Struct('<BHI')
+OFFSET_SIZE = 8
+
+ESCAPE = 0xFF
+
+# 結果の符号（0 は未決着）
+RESULT_CODES = {None: 0, 'first': 1, 'second': 2, 'draw': 3}
+RESULTS = {code: result for result, code in RESULT_CODES.items()}
+
+# 捕獲されて手ゴマになりうるコマ（まぐろは捕獲で終局、ぶりはいなだに戻る）
+DROPPABLE_TYPES = (PieceType.INADA, PieceType.TAKO, PieceType.KAREI)
+
+
+def _build_byte_codes() -> List[int]:
+    """1バイトで表す手のコード一覧（どちらかのプレイヤーが指しうる移動と配置）"""
+    codes = set()
+    for (piece_type, _), per_square in MOVE_TABLE.items():
+        for from_sq, destinations in enumerate(per_square):
+            for to_row, to_col, _ in destinations:
+                codes.add(board_move_code(TYPE_INDEX[piece_type], from_sq, to_row * 3 + to_col))
+    for piece_type in DROPPABLE_TYPES:
+        for to_sq in range(NUM_SQUARES):
+            codes.add(placement_code(TYPE_INDEX[piece_type], to_sq))
+    return sorted(codes)
+
+
+# バイト値 → 手のコード、手のコード → バイト値（1バイトで表せない手は含まない）
+BYTE_CODES = _build_byte_codes()
+assert len(BYTE_CODES) < ESCAPE
+_BYTE_OF_CODE: Dict[int, int] = {code: byte for byte, code in enumerate(BYTE_CODES)}
+
+
+@dataclass
+class GameRecord:
+    """1局分の棋譜"""
+    moves: List[Move]
+    result: Optional[str] = None
+    metadata: str = ''
+
+
+def encode_moves(moves: Iterable[Move]) -> bytes:
+    """手の列をバイト列に変換"""
+    data = bytearray()
+    for move in moves:
+        code = encode_move(move)
+        byte = _BYTE_OF_CODE.get(code)
+        if byte is None:
+            data.append(ESCAPE)
+            data += code.to_bytes(2, 'big')
+        else:
+            data.append(byte)
+    return bytes(data)
+
+
+def decode_moves(data: bytes) -> List[Move]:
+    """バイト列を手の列に変換"""
+    moves = []
+    index = 0
+    end = len(data)
+    while index < end:
+        byte = data[index]
+        if byte == ESCAPE:
+            moves.append(MOVES[int.from_bytes(data[index + 1:index + 3], 'big')])
+            index += 3
+        else:
+            moves.append(MOVES[BYTE_CODES[byte]])
+            index += 1
+    return moves
+
+
+def encode_game(record: GameRecord) -> bytes:
+    """1局分の棋譜をヘッダ付きのバイト列に変換"""
+    metadata = record.metadata.encode('utf-8')
+    data = encode_moves(record.moves)
+    return GAME_HEADER.pack(RESULT_CODES[record.result], len(metadata), len(data)) + metadata + data
+
+
+def _decode_game(buffer, offset: int) -> GameRecord:
+    result, metadata_length, data_length = GAME_HEADER.unpack_from(buffer, offset)
+    start = offset + GAME_HEADER.size
+    metadata = bytes(buffer[start:start + metadata_length]).decode('utf-8')
+    start += metadata_length
+    return GameRecord(decode_moves(buffer[start:start + data_length]), RESULTS[result], metadata)
+
+
+def index_path(path: str) -> str:
+    """棋譜ファイルに対応する索引ファイルのパス"""
+    return path + '.idx'
+
+
+class GameRecordWriter:
+    """バイナリ棋譜ファイルと索引ファイルへの書き出し"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'wb')
+        self._index = open(index_path(path), 'wb')
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION, 0))
+        self._index.write(FILE_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, 0))
+        self._offset = FILE_HEADER.size
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record: GameRecord) -> int:
+        """1局を追加し、対局番号を返す"""
+        data = encode_game(record)
+        self._file.write(data)
+        self._index.write(self._offset.to_bytes(OFFSET_SIZE, 'little'))
+        self._offset += len(data)
+        self.count += 1
+        return self.count - 1
+
+    def close(self) -> None:
+        self._file.close()
+        self._index.close()
+
+
+def _check_header(buffer, magic: bytes, path: str) -> None:
+    if len(buffer) < FILE_HEADER.size:
+        raise ValueError(f"ヘッダがありません: {path}")
+    file_magic, version, _ = FILE_HEADER.unpack_from(buffer, 0)
+    if file_magic != magic or version != FORMAT_VERSION:
+        raise ValueError(f"形式が異なります: {path}")
+
+
+def iter_records(path: str) -> Iterator[GameRecord]:
+    """棋譜ファイルを先頭から順に読む（全体を読み込まない）"""
+    with open(path, 'rb') as f:
+        _check_header(f.read(FILE_HEADER.size), FILE_MAGIC, path)
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < GAME_HEADER.size:
+                raise ValueError(f"対局データが途中で切れています: {path}")
+            result, metadata_length, data_length = GAME_HEADER.unpack(header)
+            body = f.read(metadata_length + data_length)
+            if len(body) < metadata_length + data_length:
+                raise ValueError(f"対局データが途中で切れています: {path}")
+            yield GameRecord(
+                decode_moves(body[metadata_length:]), RESULTS[result], body[:metadata_length].decode('utf-8')
+            )
+
+
+def build_index(path: str) -> int:
+    """棋譜ファイルを走査して索引ファイルを作り直し、対局数を返す"""
+    count = 0
+    with open(path, 'rb') as f, open(index_path(path), 'wb') as index:
+        _check_header(f.read(FILE_HEADER.size), FILE_MAGIC, path)
+        index.write(FILE_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, 0))
+        offset = FILE_HEADER.size
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if len(header) < GAME_HEADER.size:
+                break
+            _, metadata_length, data_length = GAME_HEADER.unpack(header)
+            index.write(offset.to_bytes(OFFSET_SIZE, 'little'))
+            f.seek(metadata_length + data_length, os.SEEK_CUR)
+            offset += GAME_HEADER.size + metadata_length + data_length
+            count += 1
+    return count
+
+
+class GameRecordFile:
+    """索引を使って任意の対局を番号で読む（mmapで必要な部分だけ読み込む）"""
+
+    def __init__(self, path: str):
+        if not os.path.exists(index_path(path)):
+            build_index(path)
+        self.path = path
+        self._file = open(path, 'rb')
+        self._index_file = open(index_path(path), 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self._data, FILE_MAGIC, path)
+        _check_header(self._index, INDEX_MAGIC, index_path(path))
+        self._count = (len(self._index) - FILE_HEADER.size) // OFFSET_SIZE
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, game_id: int) -> GameRecord:
+        """対局番号で棋譜を読む"""
+        if not 0 <= game_id < self._count:
+            raise IndexError(f"対局番号が範囲外です: {game_id}")
+        position = FILE_HEADER.size + game_id * OFFSET_SIZE
+        offset = int.from_bytes(self._index[position:position + OFFSET_SIZE], 'little')
+        return _decode_game(self._data, offset)
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for game_id in range(self._count):
+            yield self[game_id]
+
+    def close(self) -> None:
+        self._data.close()
+        self._index.close()
+        self._file.close()
+        self._index_file.close()
+
+
+def replay_result(moves: List[Move]) -> Optional[str]:
+    """手の列を再生した結果（途中で不正な手があれば None）"""
+    game_state = initialize_game()
+    for move in moves:
+        _, error = apply_move(game_state, move)
+        if error:
+            return None
+    return game_state.game_result
+
+
+def text_to_records(lines: Iterable[str], path: str) -> int:
+    """1行1局（空白区切り）の棋譜をバイナリ棋譜ファイルに変換し、対局数を返す"""
+    with GameRecordWriter(path) as writer:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            moves = []
+            for move_str in line.split():
+                move = parse_move(move_str)
+                if move is None:
+                    raise ValueError(f"{line_number}行目: 無効な手 '{move_str}'")
+                moves.append(move)
+            writer.write(GameRecord(moves, replay_result(moves)))
+        return writer.count
+
+
+def records_to_text(path: str, output: IO[str]) -> int:
+    """バイナリ棋譜ファイルを1行1局の棋譜に変換し、対局数を返す"""
+    count = 0
+    for record in iter_records(path):
+        output.write(' '.join(format_move(move) for move in record.moves) + '\n')
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦のバイナリ棋譜を変換")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    to_binary = subparsers.add_parser('to-binary', help="1行1局の棋譜（- なら標準入力）をバイナリ棋譜に変換")
+    to_binary.add_argument('text')
+    to_binary.add_argument('binary')
+    to_text = subparsers.add_parser('to-text', help="バイナリ棋譜を1行1局の棋譜（標準出力）に変換")
+    to_text.add_argument('binary')
+    args = parser.parse_args()
+
+    if args.command == 'to-binary':
+        if args.text == '-':
+            count = text_to_records(sys.stdin, args.binary)
+        else:
+            with open(args.text, encoding='utf-8') as f:
+                count = text_to_records(f, args.binary)
+    else:
+        count = records_to_text(args.binary, sys.stdout)
+    print(f"{count} 局を変換しました", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+おさかな対戦 - 棋譜の再生カーソル
+棋譜の任意の手数への移動・1手ずつの前後移動・取り消しとやり直しを、棋譜の長さによらず
+一定の手数以内の再生で行う
+
+checkpoint_interval 手ごとに永続ゲーム状態（PersistentGameState）をチェックポイントとして保持し、
+チェックポイントの間は手（差分）だけを持つ。移動先に最も近い手前のチェックポイントから
+最大 checkpoint_interval - 1 手を再生し、再生した区間の状態は次の移動のために保持する。
+永続状態は履歴を共有するため、チェックポイントのコピーは O(1)。
+間隔を広げるほどチェックポイントのメモリは減り、区間外への移動の再生手数は増える。
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from board_game_types import GameState, Move
+from board_game_logic import initialize_game, make_move
+from board_game_persistent import PersistentGameState, freeze_game_state
+
+
+DEFAULT_CHECKPOINT_INTERVAL = 32
+
+
+class ReplayCursor:
+    """棋譜上の現在の手数を指すカーソル"""
+
+    def __init__(self, moves: Sequence[Move], checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                 initial_state: Optional[GameState] = None):
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval は1以上にしてください")
+        self.checkpoint_interval = checkpoint_interval
+        self._moves: List[Move] = []
+        self._checkpoints: List[PersistentGameState] = [
+            freeze_game_state(initial_state if initial_state is not None else initialize_game())
+        ]
+        # 最後に再生した区間（チェックポイントから連続する状態）
+        self._segment_start = 0
+        self._segment: List[PersistentGameState] = [self._checkpoints[0]]
+        self._ply = 0
+        # 棋譜の途中に不正な手があれば (手数, エラーメッセージ)。カーソルはその手の前までを扱う
+        self.error: Optional[Tuple[int, str]] = None
+
+        for move in moves:
+            error = self._append(move)
+            if error:
+                self.error = (len(self._moves) + 1, error)
+                break
+        self.seek(0)
+
+    def __len__(self) -> int:
+        """棋譜の手数"""
+        return len(self._moves)
+
+    @property
+    def ply(self) -> int:
+        """現在の手数（0 は開始局面）"""
+        return self._ply
+
+    @property
+    def moves(self) -> List[Move]:
+        return list(self._moves)
+
+    @property
+    def state(self) -> PersistentGameState:
+        """現在の局面（不変。変更可能な状態は thaw_game_state で作る）"""
+        return self._segment[self._ply - self._segment_start]
+
+    @property
+    def checkpoint_count(self) -> int:
+        return len(self._checkpoints)
+
+    def _append(self, move: Move) -> Optional[str]:
+        """末尾の局面に手を追加（区間とチェックポイントを伸ばす）"""
+        end = len(self._moves)
+        if self._segment_start + len(self._segment) - 1 != end:
+            self._load_segment(end)
+        new_state, error = make_move(self._segment[-1], move)
+        if error:
+            return error
+        self._moves.append(move)
+        self._extend_segment(new_state)
+        return None
+
+    def _extend_segment(self, new_state: PersistentGameState) -> None:
+        """区間の末尾に次の手数の状態を追加（チェックポイントの手数なら新しい区間を始める）"""
+        ply = self._segment_start + len(self._segment)
+        if ply % self.checkpoint_interval == 0:
+            index = ply // self.checkpoint_interval
+            if index == len(self._checkpoints):
+                self._checkpoints.append(new_state)
+            self._segment_start = ply
+            self._segment = [new_state]
+        else:
+            self._segment.append(new_state)
+
+    def _load_segment(self, ply: int) -> None:
+        """ply を含む区間を、手前のチェックポイントから ply まで再生して作る"""
+        start = ply - ply % self.checkpoint_interval
+        if self._segment_start != start:
+            self._segment_start = start
+            self._segment = [self._checkpoints[start // self.checkpoint_interval]]
+        while self._segment_start + len(self._segment) <= ply:
+            state, _ = make_move(self._segment[-1], self._moves[self._segment_start + len(self._segment) - 1])
+            self._segment.append(state)
+
+    def seek(self, ply: int) -> PersistentGameState:
+        """指定の手数の局面に移動"""
+        if not 0 <= ply <= len(self._moves):
+            raise IndexError(f"手数は 0〜{len(self._moves)} の範囲で指定してください: {ply}")
+        if not self._segment_start <= ply < self._segment_start + len(self._segment):
+            self._load_segment(ply)
+        self._ply = ply
+        return self.state
+
+    def forward(self) -> Optional[PersistentGameState]:
+        """1手進める（最後の手数ならNone）"""
+        if self._ply >= len(self._moves):
+            return None
+        return self.seek(self._ply + 1)
+
+    def back(self) -> Optional[PersistentGameState]:
+        """1手戻す（開始局面ならNone）"""
+        if self._ply == 0:
+            return None
+        return self.seek(self._ply - 1)
+
+    def undo(self) -> Optional[Move]:
+        """直前の手を取り消し、その手を返す（やり直せるよう棋譜には残す）"""
+        if self.back() is None:
+            return None
+        return self._moves[self._ply]
+
+    def redo(self) -> Optional[Move]:
+        """取り消した手をやり直し、その手を返す"""
+        if self.forward() is None:
+            return None
+        return self._moves[self._ply - 1]
+
+    def play(self, move: Move) -> Optional[str]:
+        """現在の局面で手を指す（棋譜の次の手と異なれば、それ以降の手を捨てて置き換える）"""
+        if self._ply < len(self._moves) and self._moves[self._ply] == move:
+            self.forward()
+            return None
+        new_state, error = make_move(self.state, move)
+        if error:
+            return error
+
+        del self._moves[self._ply:]
+        del self._checkpoints[self._ply // self.checkpoint_interval + 1:]
+        del self._segment[self._ply - self._segment_start + 1:]
+        self._moves.append(move)
+        self._extend_segment(new_state)
+        self._ply += 1
+        self.error = None
+        return None
@@ -0,0 +1,282 @@
+"""
+おさかな対戦 - 探索エンジン
+ビットボード上のネガマックス（アルファベータ法）に反復深化・置換表・手の並べ替えを組み合わせる
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from board_game_types import GameState, Move
+from board_game_bitboard import (
+    BitboardState, BitboardMove, from_game_state, bitboard_to_move,
+    NUM_TYPES, MAGURO, INADA, ENEMY_ROW_MASK, PLAYERS, iter_bits
+)
+
+
+# 評価値（手番側から見た値）
+WIN_SCORE = 10000
+MATE_THRESHOLD = WIN_SCORE - 1000
+
+# コマの価値（まぐろは捕獲で即決着するため評価に含めない）
+PIECE_VALUES = [0, 10, 30, 20, 20]
+HAND_VALUES = [0, 10, 10, 20, 20]
+
+# 置換表の値の種類
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+DEFAULT_TT_SIZE = 1 << 18
+TIME_CHECK_INTERVAL = 1024
+
+
+class _SearchTimeout(Exception):
+    """探索の制限時間切れ"""
+
+
+@dataclass
+class SearchResult:
+    """探索結果"""
+    best_move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+    pv: List[Move] = field(default_factory=list)
+
+    @property
+    def nps(self) -> int:
+        """1秒あたりの探索ノード数"""
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+
+class TranspositionTable:
+    """サイズ上限付きの置換表
+
+    同じスロットには、空き・同一局面・前回以前の探索の情報・より深い探索結果のいずれかなら上書きする。
+    """
+
+    def __init__(self, size: int = DEFAULT_TT_SIZE):
+        self.size = size
+        self.slots: List[Optional[tuple]] = [None] * size
+        self.generation = 0
+
+    def new_search(self) -> None:
+        """探索ごとに世代を進め、古い情報を優先的に置き換えさせる"""
+        self.generation += 1
+
+    def clear(self) -> None:
+        self.slots = [None] * self.size
+
+    def _index(self, key: int) -> int:
+        """局面キーの下位ビットは盤面の一部しか表さないため、混ぜてからスロットを決める"""
+        key = ((key ^ (key >> 29) ^ (key >> 58)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        return (key >> 32) % self.size
+
+    def probe(self, key: int) -> Optional[tuple]:
+        """(key, depth, score, flag, move, generation) を返す"""
+        entry = self.slots[self._index(key)]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, move: Optional[BitboardMove]) -> None:
+        index = self._index(key)
+        entry = self.slots[index]
+        if (entry is None or entry[0] == key or entry[5] != self.generation
+                or depth >= entry[1]):
+            if move is None and entry is not None and entry[0] == key:
+                move = entry[4]
+            self.slots[index] = (key, depth, score, flag, move, self.generation)
+
+
+def evaluate(state: BitboardState) -> int:
+    """手番側から見た静的評価値"""
+    score = 0
+    for player in range(2):
+        sign = 1 if player == state.side else -1
+        base = player * NUM_TYPES
+        for piece_type in range(1, NUM_TYPES):
+            score += sign * PIECE_VALUES[piece_type] * bin(state.pieces[base + piece_type]).count('1')
+            score += sign * HAND_VALUES[piece_type] * state.hand_count(player, piece_type)
+        # まぐろが相手陣地に近いほど有利
+        for sq in iter_bits(state.pieces[base + MAGURO]):
+            row = sq // 3
+            advance = (3 - row) if player == 0 else row
+            score += sign * 3 * advance
+    return score
+
+
+def _score_terminal(state: BitboardState, mover: int, ply: int) -> int:
+    """着手で決着した局面の、着手側から見た評価値"""
+    if state.result == 'draw':
+        return 0
+    if state.result == PLAYERS[mover]:
+        return WIN_SCORE - ply
+    return -(WIN_SCORE - ply)
+
+
+def _order_key(state: BitboardState, move: BitboardMove, tt_move: Optional[BitboardMove]) -> int:
+    """手の並べ替え用の優先度（大きいほど先に探索）"""
+    if move == tt_move:
+        return 1000
+    piece_type, from_sq, to_sq = move
+    side = state.side
+    to_bit = 1 << to_sq
+    priority = 0
+    target = state.piece_at(to_sq) if from_sq >= 0 else None
+    if target is not None:
+        if target[1] == MAGURO:
+            return 900
+        priority += 100 + PIECE_VALUES[target[1]]
+    if piece_type == MAGURO and to_bit & ENEMY_ROW_MASK[side]:
+        priority += 80
+    if piece_type == INADA and from_sq >= 0 and to_bit & ENEMY_ROW_MASK[side]:
+        priority += 50
+    return priority
+
+
+class Searcher:
+    """反復深化アルファベータ探索"""
+
+    def __init__(self, tt_size: int = DEFAULT_TT_SIZE):
+        self.tt = TranspositionTable(tt_size)
+        self.nodes = 0
+        self._deadline = 0.0
+
+    def search(self, game_state: GameState, time_limit: float = 1.0, max_depth: int = 64,
+               info: Optional[Callable[[SearchResult], None]] = None) -> SearchResult:
+        """制限時間内で最善手を探索（各深さの完了ごとに info を呼ぶ）"""
+        start = time.perf_counter()
+        self._deadline = start + time_limit
+        self.nodes = 0
+        self.tt.new_search()
+
+        state = from_game_state(game_state)
+        root_moves = state.generate_moves()
+        if not root_moves:
+            return SearchResult(None, 0, 0, 0, 0.0)
+
+        best = SearchResult(bitboard_to_move(root_moves[0]), 0, 0, 0, 0.0, [bitboard_to_move(root_moves[0])])
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self._search_root(state, root_moves, depth)
+            except _SearchTimeout:
+                break
+            elapsed = time.perf_counter() - start
+            best = SearchResult(
+                bitboard_to_move(move), score, depth, self.nodes, elapsed,
+                [bitboard_to_move(m) for m in self._principal_variation(state, depth)]
+            )
+            if info:
+                info(best)
+            if abs(score) >= MATE_THRESHOLD:
+                break
+
+        best.nodes = self.nodes
+        best.elapsed = time.perf_counter() - start
+        return best
+
+    def _search_root(self, state: BitboardState, moves: List[BitboardMove], depth: int) -> Tuple[int, BitboardMove]:
+        entry = self.tt.probe(state.position_key())
+        tt_move = entry[4] if entry else None
+        moves = sorted(moves, key=lambda m: _order_key(state, m, tt_move), reverse=True)
+
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = moves[0]
+        mover = state.side
+        for move in moves:
+            undo = state.play(move)
+            try:
+                if state.result is not None:
+                    score = _score_terminal(state, mover, 1)
+                else:
+                    score = -self._negamax(state, depth - 1, -beta, -alpha, 1)
+            finally:
+                state.unplay(undo)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self.tt.store(state.position_key(), depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(self, state: BitboardState, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() >= self._deadline:
+            raise _SearchTimeout()
+
+        if depth <= 0:
+            return evaluate(state)
+
+        key = state.position_key()
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_move = entry[4]
+            if entry[1] >= depth:
+                score, flag = entry[2], entry[3]
+                if flag == EXACT:
+                    return score
+                if flag == LOWER_BOUND and score >= beta:
+                    return score
+                if flag == UPPER_BOUND and score <= alpha:
+                    return score
+
+        moves = state.generate_moves()
+        if not moves:
+            return 0
+        moves.sort(key=lambda m: _order_key(state, m, tt_move), reverse=True)
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        mover = state.side
+        for move in moves:
+            undo = state.play(move)
+            try:
+                if state.result is not None:
+                    score = _score_terminal(state, mover, ply + 1)
+                else:
+                    score = -self._negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                state.unplay(undo)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        # 勝敗の手数は局面からの相対値ではないため、詰みの評価値は置換表に保存しない
+        if abs(best_score) < MATE_THRESHOLD:
+            self.tt.store(key, depth, best_score, flag, best_move)
+        else:
+            self.tt.store(key, -1, 0, UPPER_BOUND, best_move)
+        return best_score
+
+    def _principal_variation(self, state: BitboardState, depth: int) -> List[BitboardMove]:
+        """置換表の最善手をたどって読み筋を作る"""
+        pv = []
+        undos = []
+        for _ in range(depth):
+            entry = self.tt.probe(state.position_key())
+            if entry is None or entry[4] is None or entry[4] not in state.generate_moves():
+                break
+            pv.append(entry[4])
+            undos.append(state.play(entry[4]))
+            if state.result is not None:
+                break
+        for undo in reversed(undos):
+            state.unplay(undo)
+        return pv
+
+
+def find_best_move(game_state: GameState, time_limit: float = 1.0, max_depth: int = 64) -> SearchResult:
+    """一度きりの探索で最善手を求める"""
+    return Searcher().search(game_state, time_limit=time_limit, max_depth=max_depth)
@@ -0,0 +1,44 @@
+"""
+おさかな対戦 - 取り消し可能なゲームセッション
+ゲーム状態をその場で更新し、差分のみをスタックに積んで取り消す
+"""
+
+from typing import List, Optional
+
+from board_game_types import GameState, Move, MoveRecord
+from board_game_logic import initialize_game, apply_move, undo_move
+
+
+class GameSession:
+    """apply/undo でゲーム状態をコピーせずに進めたり戻したりする"""
+
+    def __init__(self, game_state: Optional[GameState] = None):
+        self.state = game_state if game_state is not None else initialize_game()
+        self.undo_stack: List[MoveRecord] = []
+
+    def apply(self, move: Move) -> Optional[str]:
+        """移動をその場で適用（不正な手ならエラーメッセージを返し、状態は変えない）"""
+        record, error = apply_move(self.state, move)
+        if error:
+            return error
+
+        self.undo_stack.append(record)
+        return None
+
+    def undo(self) -> Optional[Move]:
+        """直前の移動を取り消し、その手を返す（取り消す手がなければNone）"""
+        if not self.undo_stack:
+            return None
+
+        record = self.undo_stack.pop()
+        undo_move(self.state, record)
+        return record.move
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    @property
+    def moves(self) -> List[Move]:
+        """適用済みの手の一覧"""
+        return [record.move for record in self.undo_stack]
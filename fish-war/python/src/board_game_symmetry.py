@@ -0,0 +1,177 @@
+"""
+おさかな対戦 - 局面の対称性
+すべてのコマの動きは左右対称で、盤を180度回転して先手と後手を入れ替えてもルールは変わらない。
+この2つの組み合わせによる4通りの変換で移り合う局面は同じ評価・同じ合法手（を変換したもの）になるため、
+局面をキーにする記憶領域は代表の局面（正規形）1つだけを保持すればよい。
+
+正規形は4通りの変換のうち canonical_key が最小になるもの。どの変換も2回行うと元に戻るため、
+正規形の局面での手を元の局面に戻すには同じ変換をもう一度行えばよい（inverse_transform_move）。
+"""
+
+from enum import Enum
+from typing import Dict, List, Tuple, Union
+
+from board_game_types import PieceType, Player, Position, GameState, Move, PIECES, SQUARE_POSITIONS, SQUARE_INDEX
+from board_game_move_codec import MOVES
+from board_game_logic import get_board_hash
+from board_game_persistent import PersistentGameState, freeze_game_state
+
+
+AnyGameState = Union[GameState, PersistentGameState]
+
+
+class Symmetry(Enum):
+    IDENTITY = 'identity'        # 変換なし
+    MIRROR = 'mirror'            # 左右反転
+    FLIP = 'flip'                # 180度回転して先手と後手を入れ替え
+    FLIP_MIRROR = 'flip_mirror'  # 上下反転して先手と後手を入れ替え
+
+
+# 先手と後手を入れ替える変換
+SWAPS_PLAYERS: Dict[Symmetry, bool] = {
+    Symmetry.IDENTITY: False,
+    Symmetry.MIRROR: False,
+    Symmetry.FLIP: True,
+    Symmetry.FLIP_MIRROR: True,
+}
+
+_OPPONENT: Dict[str, str] = {'first': 'second', 'second': 'first'}
+
+
+def _map_square(square: int, symmetry: Symmetry) -> int:
+    row, col = divmod(square, 3)
+    if symmetry in (Symmetry.MIRROR, Symmetry.FLIP):
+        col = 2 - col
+    if SWAPS_PLAYERS[symmetry]:
+        row = 3 - row
+    return row * 3 + col
+
+
+# 変換ごとに、各マス番号の移り先
+SQUARE_MAPS: Dict[Symmetry, Tuple[int, ...]] = {
+    symmetry: tuple(_map_square(square, symmetry) for square in range(12)) for symmetry in Symmetry
+}
+
+# 変換ごとに、各Moveの移り先（Move は共有インスタンスなので同一性で引ける）
+_MOVE_MAPS: Dict[Symmetry, Dict[Move, Move]] = {
+    symmetry: {
+        move: Move(
+            move.piece_type,
+            None if move.is_placement else SQUARE_POSITIONS[SQUARE_MAPS[symmetry][SQUARE_INDEX[move.from_position]]],
+            SQUARE_POSITIONS[SQUARE_MAPS[symmetry][SQUARE_INDEX[move.to_position]]],
+            move.is_placement
+        )
+        for move in MOVES
+    }
+    for symmetry in Symmetry
+}
+
+# 盤面ハッシュの1マス分（'00' またはコマ種類と先後の頭文字）の先後入れ替え
+_SWAPPED_CELL: Dict[str, str] = {'00': '00'}
+for _piece_type in PieceType:
+    _SWAPPED_CELL[f"{_piece_type.value}f"] = f"{_piece_type.value}s"
+    _SWAPPED_CELL[f"{_piece_type.value}s"] = f"{_piece_type.value}f"
+
+# 手ゴマを並び順によらず比べるための順序
+_TYPE_ORDER: Dict[PieceType, int] = {piece_type: index for index, piece_type in enumerate(PieceType)}
+
+
+def transform_position(position: Position, symmetry: Symmetry) -> Position:
+    """マスを変換"""
+    return SQUARE_POSITIONS[SQUARE_MAPS[symmetry][SQUARE_INDEX[position]]]
+
+
+def transform_move(move: Move, symmetry: Symmetry) -> Move:
+    """元の局面での手を、変換した局面での手に変換"""
+    mapped = _MOVE_MAPS[symmetry].get(move)
+    if mapped is None:
+        raise ValueError(f"盤外のマスを含む手は変換できません: {move}")
+    return mapped
+
+
+def inverse_transform_move(move: Move, symmetry: Symmetry) -> Move:
+    """変換した局面（正規形など）での手を、元の局面での手に戻す"""
+    # どの変換も2回行うと元に戻る
+    return transform_move(move, symmetry)
+
+
+def transform_board_hash(board_hash: str, symmetry: Symmetry) -> str:
+    """get_board_hash の文字列を変換（履歴の変換用）"""
+    cells = [board_hash[2 * square:2 * square + 2] for square in range(12)]
+    mapped = [''] * 12
+    swap = SWAPS_PLAYERS[symmetry]
+    for square, target in enumerate(SQUARE_MAPS[symmetry]):
+        mapped[target] = _SWAPPED_CELL[cells[square]] if swap else cells[square]
+    return ''.join(mapped)
+
+
+def transform_state(game_state: AnyGameState, symmetry: Symmetry) -> AnyGameState:
+    """局面を変換（履歴・まぐろの到達フラグ・勝敗も合わせて変換し、入力と同じ種類の状態を返す）"""
+    square_map = SQUARE_MAPS[symmetry]
+    swap = SWAPS_PLAYERS[symmetry]
+    board: List[list] = [[None] * 3 for _ in range(4)]
+    for row, cells in enumerate(game_state.board):
+        for col, piece in enumerate(cells):
+            if piece:
+                target = square_map[row * 3 + col]
+                board[target // 3][target % 3] = PIECES[(piece.type, _OPPONENT[piece.player])] if swap else piece
+
+    def player_of(player: Player) -> Player:
+        return _OPPONENT[player] if swap else player
+
+    flags = game_state.maguro_in_enemy_territory
+    result = game_state.game_result
+    transformed = GameState(
+        board=board,
+        hand_pieces={player: list(game_state.hand_pieces[player_of(player)]) for player in ('first', 'second')},
+        current_player=player_of(game_state.current_player),
+        turn=game_state.turn,
+        game_result=player_of(result) if result in _OPPONENT else result,
+        history=[transform_board_hash(board_hash, symmetry) for board_hash in game_state.history],
+        maguro_in_enemy_territory={player: flags[player_of(player)] for player in ('first', 'second')}
+    )
+    if isinstance(game_state, PersistentGameState):
+        return freeze_game_state(transformed)
+    return transformed
+
+
+def _hand_text(pieces) -> str:
+    return ''.join(piece_type.value for piece_type in sorted(pieces, key=_TYPE_ORDER.__getitem__))
+
+
+def _keys(game_state: AnyGameState) -> List[Tuple[str, Symmetry]]:
+    """4通りの変換それぞれについて、変換した局面のキーと変換の組"""
+    board_hash = get_board_hash(game_state.board)
+    hands = (_hand_text(game_state.hand_pieces['first']) or '-', _hand_text(game_state.hand_pieces['second']) or '-')
+    keys = []
+    for symmetry in Symmetry:
+        if SWAPS_PLAYERS[symmetry]:
+            player, first_hand, second_hand = _OPPONENT[game_state.current_player], hands[1], hands[0]
+        else:
+            player, first_hand, second_hand = game_state.current_player, hands[0], hands[1]
+        keys.append((f"{transform_board_hash(board_hash, symmetry)} {player} {first_hand} {second_hand}", symmetry))
+    return keys
+
+
+def canonical_key(game_state: AnyGameState) -> str:
+    """局面（盤面・手ゴマ・手番）の同値類を表す文字列（4通りの変換で移り合う局面で同じ値）
+
+    手ゴマは並び順によらず比べる。履歴・ターン数は含まない。
+    """
+    return min(key for key, _ in _keys(game_state))
+
+
+def canonical_symmetry(game_state: AnyGameState) -> Symmetry:
+    """局面を正規形に移す変換（同じキーになる変換が複数あれば Symmetry の定義順で最初のもの）"""
+    return min(_keys(game_state), key=lambda item: item[0])[1]
+
+
+def canonicalize(game_state: AnyGameState) -> Tuple[AnyGameState, Symmetry]:
+    """正規形の局面と、元の局面からそこへ移す変換（変換なしなら元の状態をそのまま返す）
+
+    正規形で求めた手は inverse_transform_move(move, symmetry) で元の局面の手に戻す。
+    """
+    symmetry = canonical_symmetry(game_state)
+    if symmetry is Symmetry.IDENTITY:
+        return game_state, symmetry
+    return transform_state(game_state, symmetry), symmetry
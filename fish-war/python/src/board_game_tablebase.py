@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 後退解析による完全解析テーブル
+到達可能な全局面を列挙し、手番側から見た勝ち・負け・引き分けと決着までの手数を求める
+
+局面は盤面・手ゴマ・手番のみで識別する（履歴は含まない）。
+千日手は「どちらも勝ちを強制できない局面」として引き分けに含まれる。
+"""
+
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from board_game_types import GameState, PieceType
+from board_game_logic import initialize_game
+from board_game_bitboard import (
+    BitboardState, from_game_state, NUM_SQUARES, NUM_TYPES, HAND_BITS,
+    MAGURO, ENEMY_ROW_MASK, PLAYERS, PLAYER_INDEX, TYPE_INDEX
+)
+
+
+# ファイル形式: ヘッダ（マジック, バージョン, 予約, 局面数）+ キー(uint64) × N + 値(int16) × N
+MAGIC = b'FWTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+
+# 手ゴマになりうるコマ（まぐろは捕獲で終局、ぶりは降格するため手ゴマにならない）
+HAND_TYPES = [TYPE_INDEX[PieceType.INADA], TYPE_INDEX[PieceType.TAKO], TYPE_INDEX[PieceType.KAREI]]
+HAND_COUNT_BITS = 2
+BOARD_BITS = 4 * NUM_SQUARES
+SIDE_SHIFT = BOARD_BITS + 2 * len(HAND_TYPES) * HAND_COUNT_BITS
+
+DEFAULT_CHUNK_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class TablebaseResult:
+    """手番側から見た解析結果"""
+    outcome: str              # 'win' / 'loss' / 'draw'
+    distance: Optional[int]   # 決着までの手数（引き分けはNone）
+
+
+def encode_position(state: BitboardState) -> int:
+    """盤面・手ゴマ・手番を64ビット未満の整数に詰める"""
+    key = state.board_key
+    shift = BOARD_BITS
+    for player in range(2):
+        for piece_type in range(NUM_TYPES):
+            count = state.hand_count(player, piece_type)
+            if piece_type in HAND_TYPES:
+                if count >= 1 << HAND_COUNT_BITS:
+                    raise ValueError("手ゴマが多すぎる局面は解析対象外です")
+                key |= count << shift
+                shift += HAND_COUNT_BITS
+            elif count:
+                raise ValueError("まぐろ・ぶりを手ゴマに持つ局面は解析対象外です")
+    return key | (state.side << SIDE_SHIFT)
+
+
+def decode_position(key: int) -> BitboardState:
+    """encode_position の逆変換（履歴は空になる）"""
+    state = BitboardState()
+    board_key = key & ((1 << BOARD_BITS) - 1)
+    state.board_key = board_key
+    for sq in range(NUM_SQUARES):
+        code = (board_key >> (4 * sq)) & 0xF
+        if code:
+            state.pieces[code - 1] |= 1 << sq
+
+    shift = BOARD_BITS
+    for player in range(2):
+        for piece_type in HAND_TYPES:
+            count = (key >> shift) & ((1 << HAND_COUNT_BITS) - 1)
+            state.hands |= count << (HAND_BITS * (player * NUM_TYPES + piece_type))
+            shift += HAND_COUNT_BITS
+    state.side = (key >> SIDE_SHIFT) & 1
+
+    # 相手陣地にいるまぐろの到達フラグは盤面から復元できる
+    for player in range(2):
+        if state.pieces[player * NUM_TYPES + MAGURO] & ENEMY_ROW_MASK[player]:
+            state.maguro_flags |= 1 << player
+    return state
+
+
+def encode_game_state(game_state: GameState) -> int:
+    """GameState の局面キーを計算"""
+    state = BitboardState()
+    for row in range(4):
+        for col in range(3):
+            piece = game_state.board[row][col]
+            if piece:
+                code = PLAYER_INDEX[piece.player] * NUM_TYPES + TYPE_INDEX[piece.type] + 1
+                state.board_key |= code << (4 * (row * 3 + col))
+    for player, pieces in game_state.hand_pieces.items():
+        for piece_type in pieces:
+            state.hands += 1 << (HAND_BITS * (PLAYER_INDEX[player] * NUM_TYPES + TYPE_INDEX[piece_type]))
+    state.side = PLAYER_INDEX[game_state.current_player]
+    return encode_position(state)
+
+
+def _successors(state: BitboardState) -> Iterable[Tuple[Optional[int], int]]:
+    """各合法手の行き先を (子局面キー, 即決着) で列挙
+
+    即決着は 1: 着手側の勝ち、-1: 着手側の負け、0: 継続（子局面キーあり）。
+    """
+    side = PLAYERS[state.side]
+    for move in state.generate_moves():
+        undo = state.play(move)
+        if state.result is None:
+            yield encode_position(state), 0
+        elif state.result == side:
+            yield None, 1
+        elif state.result == 'draw':
+            yield None, 0
+        else:
+            yield None, -1
+        state.unplay(undo)
+
+
+def _is_terminal(state: BitboardState) -> bool:
+    """手番側のまぐろが既に相手陣地で生き残っている（手番側の勝ちで終局済み）"""
+    return bool(state.pieces[state.side * NUM_TYPES + MAGURO] & ENEMY_ROW_MASK[state.side])
+
+
+def _expand_chunk(keys: List[int]) -> List[int]:
+    """局面の子局面キー（終局していないもの）を列挙"""
+    children = set()
+    for key in keys:
+        for child, immediate in _successors(decode_position(key)):
+            if child is not None:
+                children.add(child)
+    return sorted(children)
+
+
+def _resolve_chunk(task: Tuple[str, int, int, int]) -> List[Tuple[int, int]]:
+    """未解決局面のうち、前回までの値から今回確定するものを求める"""
+    path, count, lo, hi = task
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    keys = memoryview(mapped)[:8 * count].cast('Q')
+    values = memoryview(mapped)[8 * count:10 * count].cast('h')
+    try:
+        updates = []
+        for index in range(lo, hi):
+            if values[index]:
+                continue
+            value = _evaluate(decode_position(keys[index]), keys, values, count)
+            if value:
+                updates.append((index, value))
+        return updates
+    finally:
+        keys.release()
+        values.release()
+        mapped.close()
+
+
+def _evaluate(state: BitboardState, keys, values, count: int) -> int:
+    """子局面の値から局面の値を求める（未確定なら0）"""
+    worst_loss = 0
+    all_losing = True
+    has_move = False
+    best_win = 0
+    for child, immediate in _successors(state):
+        has_move = True
+        if immediate == 1:
+            return 1
+        if immediate == -1:
+            worst_loss = max(worst_loss, 1)
+            continue
+        if child is None:
+            all_losing = False
+            continue
+        index = bisect.bisect_left(keys, child, 0, count)
+        value = values[index] if index < count and keys[index] == child else 0
+        if value < 0:
+            # 相手の負けに進める手があれば勝ち（最短のものを選ぶ）
+            distance = 1 - value
+            best_win = distance if not best_win else min(best_win, distance)
+        elif value > 0:
+            worst_loss = max(worst_loss, value + 1)
+        else:
+            all_losing = False
+    if best_win:
+        return best_win
+    if has_move and all_losing:
+        return -worst_loss
+    return 0
+
+
+def _map(executor: Optional[ProcessPoolExecutor], fn, tasks):
+    if executor is None:
+        return map(fn, tasks)
+    return executor.map(fn, tasks)
+
+
+def _chunks(items, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def enumerate_positions(roots: List[BitboardState], executor: Optional[ProcessPoolExecutor] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> array:
+    """根の局面から到達可能な終局前の局面キーを昇順で返す"""
+    visited = array('Q')
+    frontier = sorted({encode_position(r) for r in roots if r.result is None and not _is_terminal(r)})
+    depth = 0
+    while frontier:
+        found = set()
+        for children in _map(executor, _expand_chunk, list(_chunks(frontier, chunk_size))):
+            found.update(children)
+
+        merged = array('Q')
+        merged.extend(_merge_sorted(visited, frontier))
+        visited = merged
+
+        frontier = []
+        for key in sorted(found):
+            index = bisect.bisect_left(visited, key)
+            if index == len(visited) or visited[index] != key:
+                if not _is_terminal(decode_position(key)):
+                    frontier.append(key)
+        depth += 1
+        if progress:
+            progress(f"列挙 {depth}手目: 新規 {len(frontier)} / 累計 {len(visited)}")
+    return visited
+
+
+def _merge_sorted(a, b):
+    """昇順の2列を重複なくマージ"""
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] < b[j]:
+            yield a[i]
+            i += 1
+        elif a[i] > b[j]:
+            yield b[j]
+            j += 1
+        else:
+            yield a[i]
+            i += 1
+            j += 1
+    yield from a[i:]
+    yield from b[j:]
+
+
+def solve_tablebase(path: str, roots: Optional[List[GameState]] = None, workers: Optional[int] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> int:
+    """到達可能な全局面を解析してテーブルを書き出し、局面数を返す"""
+    if roots is None:
+        roots = [initialize_game()]
+    bitboard_roots = [from_game_state(r) for r in roots]
+    workers = workers or os.cpu_count() or 1
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        keys = enumerate_positions(bitboard_roots, executor, chunk_size, progress)
+        count = len(keys)
+
+        # 作業ファイルはキーと値を並べた形式にし、ワーカーはmmapで参照する
+        work_dir = os.path.dirname(os.path.abspath(path))
+        fd, work_path = tempfile.mkstemp(prefix='.tb-work-', dir=work_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                keys.tofile(f)
+                f.write(bytes(2 * count))
+            del keys
+
+            with open(work_path, 'r+b') as f:
+                mapped = mmap.mmap(f.fileno(), 0) if count else None
+                values = memoryview(mapped)[8 * count:].cast('h') if count else None
+                depth = 1
+                while count:
+                    tasks = [(work_path, count, lo, min(lo + chunk_size, count))
+                             for lo in range(0, count, chunk_size)]
+                    # 同じ手数の局面が互いの値を参照しないよう、全チャンクの完了後にまとめて書き込む
+                    updates = []
+                    for chunk in _map(executor, _resolve_chunk, tasks):
+                        updates.extend(chunk)
+                    for index, value in updates:
+                        values[index] = value
+                    if progress:
+                        progress(f"解析 {depth}手: 確定 {len(updates)}")
+                    if not updates:
+                        break
+                    depth += 1
+                if mapped is not None:
+                    values.release()
+                    mapped.flush()
+                    mapped.close()
+
+            with open(path, 'wb') as out, open(work_path, 'rb') as src:
+                out.write(HEADER.pack(MAGIC, VERSION, 0, count))
+                while True:
+                    block = src.read(1 << 20)
+                    if not block:
+                        break
+                    out.write(block)
+        finally:
+            os.remove(work_path)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return count
+
+
+class Tablebase:
+    """解析テーブルをmmapで開いて局面を引く"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = HEADER.unpack_from(self._mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"解析テーブルの形式が不正です: {path}")
+        self._count = count
+        offset = HEADER.size
+        self._keys = memoryview(self._mapped)[offset:offset + 8 * count].cast('Q')
+        self._values = memoryview(self._mapped)[offset + 8 * count:offset + 10 * count].cast('h')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        for view in ('_keys', '_values'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+                delattr(self, view)
+        self._mapped.close()
+        self._file.close()
+
+    def probe_key(self, key: int) -> Optional[TablebaseResult]:
+        """局面キーで引く（テーブルにない局面はNone）"""
+        index = bisect.bisect_left(self._keys, key)
+        if index == self._count or self._keys[index] != key:
+            return None
+        value = self._values[index]
+        if value > 0:
+            return TablebaseResult('win', value)
+        if value < 0:
+            return TablebaseResult('loss', -value)
+        return TablebaseResult('draw', None)
+
+    def probe(self, game_state: GameState) -> Optional[TablebaseResult]:
+        """手番側から見た局面の解析結果（終局済み・対象外の局面はNone）"""
+        if game_state.game_result:
+            return None
+        try:
+            key = encode_game_state(game_state)
+        except ValueError:
+            return None
+        return self.probe_key(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の完全解析テーブルを作成")
+    parser.add_argument('output', help="出力するテーブルファイル")
+    parser.add_argument('--workers', type=int, default=None, help="並列プロセス数（既定: CPU数）")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="1タスクあたりの局面数")
+    args = parser.parse_args()
+
+    count = solve_tablebase(
+        args.output, workers=args.workers, chunk_size=args.chunk_size,
+        progress=lambda message: print(message, file=sys.stderr, flush=True)
+    )
+    print(f"{count} 局面を解析しました: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+おさかな対戦 - 遷移キャッシュ
+局面（盤面・手ゴマ・手番）ごとの合法手と、(局面, 手) → 次の局面の遷移を LRU で保持する
+
+キャッシュするのは局面だけで決まる部分（合法手・エラーメッセージ・次の盤面と手ゴマ・Zobristキー・
+盤面ハッシュ）に限り、履歴に依存するターン数・まぐろの到達フラグ・勝敗・千日手（3回目の同一盤面）は
+呼び出し元の状態から毎回計算する。そのため、履歴の異なる対局で共有しても結果は make_move と一致する。
+
+キーは Zobristキーで、盤面と手ゴマの並びも照合するため衝突しても誤った結果は返さない。
+メモリ使用量は項目ごとの概算バイト数の合計を max_bytes 以下に保ち、超えたら最も古く使われた項目から捨てる。
+複数スレッドから同時に使える。
+"""
+
+import sys
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import List, Optional, Tuple, Union
+
+from board_game_types import PieceType, Piece, Player, GameState, Move
+from board_game_logic import (
+    make_move, generate_legal_moves, get_zobrist_key, get_position_counts, check_maguro_victory,
+    _update_maguro_flags
+)
+from board_game_move_codec import encode_move
+from board_game_persistent import PersistentGameState
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# OrderedDict の1項目（ハッシュ表の枠と順序の連結リスト）の概算バイト数
+_ENTRY_OVERHEAD = 200
+
+AnyGameState = Union[GameState, PersistentGameState]
+# 盤面（行のタプル）・先手と後手の手ゴマ・手番
+PositionIdentity = Tuple[Tuple[Tuple[Optional[Piece], ...], ...], Tuple[PieceType, ...], Tuple[PieceType, ...], Player]
+
+
+@dataclass
+class CacheStats:
+    """キャッシュの統計"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(frozen=True)
+class _Transition:
+    """局面だけで決まる遷移の結果"""
+    identity: PositionIdentity
+    error: Optional[str]
+    board: Tuple[Tuple[Optional[Piece], ...], ...] = ()
+    hands: Tuple[Tuple[PieceType, ...], Tuple[PieceType, ...]] = ((), ())
+    zobrist_key: int = 0
+    board_hash: str = ''
+    # まぐろを捕獲して即勝利したか（手番交代・履歴追加なし）
+    captured_maguro: bool = False
+
+
+def _identity(game_state: AnyGameState) -> PositionIdentity:
+    """局面を正確に表す値（キーの衝突の確認用）"""
+    return (
+        tuple(map(tuple, game_state.board)),
+        tuple(game_state.hand_pieces['first']),
+        tuple(game_state.hand_pieces['second']),
+        game_state.current_player
+    )
+
+
+def _deep_size(value) -> int:
+    """タプル・文字列・整数の概算バイト数（共有インスタンスの Piece・Move・PieceType は数えない）"""
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_deep_size(item) for item in value)
+    if isinstance(value, (str, int)):
+        return sys.getsizeof(value)
+    return 0
+
+
+def _entry_size(key, identity: PositionIdentity, value) -> int:
+    """保持する1項目全体（キー・照合用の局面・値・項目のタプル）の概算バイト数
+
+    永続状態の盤面の行のタプルは項目の間で共有されることがあり、その分は多めに数える。
+    """
+    # 項目は OrderedDict に key → ((identity, value), size) として保持する
+    size = _ENTRY_OVERHEAD + _deep_size(key) + 2 * sys.getsizeof((None, None)) + sys.getsizeof(0)
+    size += _deep_size(identity)
+    if isinstance(value, tuple):
+        # 合法手の一覧（Move は共有インスタンス）
+        return size + sys.getsizeof(value)
+    # 遷移（identity は項目の identity と同じインスタンスなので数えない）
+    size += sys.getsizeof(value) + sys.getsizeof(vars(value))
+    return size + sum(
+        _deep_size(getattr(value, name)) for name in ('error', 'board', 'hands', 'zobrist_key', 'board_hash')
+    )
+
+
+class TransitionCache:
+    """合法手と遷移の LRU キャッシュ"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def stats(self) -> CacheStats:
+        """統計のコピー"""
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats = CacheStats()
+
+    def _get(self, key, identity: PositionIdentity):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0][0] == identity:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry[0][1]
+            self._stats.misses += 1
+            return None
+
+    def _put(self, key, identity: PositionIdentity, value) -> None:
+        size = _entry_size(key, identity, value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._stats.bytes -= old[1]
+            self._entries[key] = ((identity, value), size)
+            self._stats.bytes += size
+            while self._stats.bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._stats.bytes -= evicted_size
+                self._stats.evictions += 1
+            self._stats.entries = len(self._entries)
+
+    def legal_moves(self, game_state: AnyGameState) -> List[Move]:
+        """generate_legal_moves と同じ合法手の一覧"""
+        if game_state.game_result:
+            return []
+        identity = _identity(game_state)
+        key = get_zobrist_key(game_state)
+        moves = self._get(key, identity)
+        if moves is None:
+            moves = tuple(generate_legal_moves(game_state))
+            self._put(key, identity, moves)
+        return list(moves)
+
+    def make_move(self, game_state: AnyGameState, move: Move) -> Tuple[AnyGameState, Optional[str]]:
+        """make_move と同じ結果を返す（局面だけで決まる部分をキャッシュから使う）"""
+        if game_state.game_result:
+            return make_move(game_state, move)
+        identity = _identity(game_state)
+        key = (get_zobrist_key(game_state), encode_move(move))
+        transition = self._get(key, identity)
+        if transition is None:
+            new_state, error = make_move(game_state, move)
+            transition = self._transition(identity, new_state, error)
+            self._put(key, identity, transition)
+            return new_state, error
+        if transition.error:
+            return game_state, transition.error
+        return self._apply(game_state, transition), None
+
+    @staticmethod
+    def _transition(identity: PositionIdentity, new_state: AnyGameState, error: Optional[str]) -> _Transition:
+        """make_move の結果から局面だけで決まる部分を取り出す"""
+        if error:
+            return _Transition(identity, error)
+        # まぐろを捕獲したときだけ手番が交代しない
+        captured_maguro = new_state.current_player == identity[3]
+        return _Transition(
+            identity=identity,
+            error=None,
+            board=tuple(map(tuple, new_state.board)),
+            hands=(tuple(new_state.hand_pieces['first']), tuple(new_state.hand_pieces['second'])),
+            zobrist_key=get_zobrist_key(new_state),
+            board_hash='' if captured_maguro else new_state.history[-1],
+            captured_maguro=captured_maguro
+        )
+
+    @staticmethod
+    def _apply(game_state: AnyGameState, transition: _Transition) -> AnyGameState:
+        """キャッシュした遷移と呼び出し元の履歴・まぐろの到達フラグから次の状態を作る"""
+        player = game_state.current_player
+        persistent = isinstance(game_state, PersistentGameState)
+        flags = dict(game_state.maguro_in_enemy_territory)
+        # GameState の出現回数は make_move と同じく新しい状態にだけ持たせる
+        counts = None if persistent else Counter(get_position_counts(game_state))
+        if transition.captured_maguro:
+            next_player, turn, occurrences = player, game_state.turn, 0
+            history = game_state.history if persistent else list(game_state.history)
+        else:
+            next_player = 'second' if player == 'first' else 'first'
+            turn = game_state.turn + 1
+            _update_maguro_flags(transition.board, flags)
+            board_hash = transition.board_hash
+            if persistent:
+                history = game_state.history.append(board_hash)
+                occurrences = history.count(board_hash)
+            else:
+                occurrences = counts[board_hash] = counts[board_hash] + 1
+                history = game_state.history + [board_hash]
+
+        if persistent:
+            new_state = PersistentGameState(
+                board=transition.board,
+                hand_pieces=MappingProxyType({'first': transition.hands[0], 'second': transition.hands[1]}),
+                current_player=next_player,
+                turn=turn,
+                game_result=None,
+                history=history,
+                maguro_in_enemy_territory=MappingProxyType(flags),
+                zobrist_key=transition.zobrist_key
+            )
+        else:
+            new_state = GameState(
+                board=[list(row) for row in transition.board],
+                hand_pieces={'first': list(transition.hands[0]), 'second': list(transition.hands[1])},
+                current_player=next_player,
+                turn=turn,
+                game_result=None,
+                history=history,
+                maguro_in_enemy_territory=flags,
+                zobrist_key=transition.zobrist_key,
+                position_counts=counts
+            )
+
+        # 勝敗は呼び出し元の履歴によって変わるため毎回判定する
+        if transition.captured_maguro:
+            result = player
+        else:
+            result = check_maguro_victory(new_state) or ('draw' if occurrences >= 3 else None)
+        if result is None:
+            return new_state
+        if persistent:
+            return replace(new_state, game_result=result)
+        new_state.game_result = result
+        return new_state
@@ -1,6 +1,6 @@
 from enum import Enum
-from typing import TypedDict, Literal, Optional, List
-from dataclasses import dataclass
+from typing import TypedDict, Literal, Optional, List, Dict, Set, Tuple
+from dataclasses import dataclass, field
 
 
 class PieceType(Enum):
@@ -14,8 +14,42 @@ class PieceType(Enum):
 Player = Literal['first', 'second']
 
 
-@dataclass(frozen=True)
-class Position:
+class _Interned:
+    """同じ値のインスタンスを1つだけ作って共有する不変クラスの基底
+
+    コンストラクタは値ごとに同じインスタンスを返すため、等価性とハッシュは同一性で判定する。
+    コピー・pickle しても同じインスタンスになる。
+    """
+    __slots__ = ()
+    _instances: dict
+
+    def __new__(cls, *args, **kwargs):
+        try:
+            key = args + tuple(kwargs[name] for name in cls.__slots__[len(args):])
+        except KeyError as error:
+            raise TypeError(f"{cls.__name__}() に引数 {error} がありません") from None
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = object.__new__(cls)
+            for name, value in zip(cls.__slots__, key):
+                object.__setattr__(instance, name, value)
+            cls._instances[key] = instance
+        return instance
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+
+@dataclass(frozen=True, eq=False)
+class Position(_Interned):
+    __slots__ = ('col', 'row')
+    _instances = {}
     col: Literal['A', 'B', 'C']
     row: Literal[1, 2, 3, 4]
     
@@ -23,8 +57,10 @@ class Position:
         return f"{self.col}{self.row}"
 
 
-@dataclass(frozen=True)
-class Piece:
+@dataclass(frozen=True, eq=False)
+class Piece(_Interned):
+    __slots__ = ('type', 'player')
+    _instances = {}
     type: PieceType
     player: Player
     
@@ -32,6 +68,20 @@ class Piece:
         return self.type.value
 
 
+PLAYERS: Tuple[Player, Player] = ('first', 'second')
+
+# マス番号（row * 3 + col）ごとのPosition と、その逆引き
+SQUARE_POSITIONS: Tuple[Position, ...] = tuple(
+    Position(col, row) for row in (1, 2, 3, 4) for col in ('A', 'B', 'C')
+)
+SQUARE_INDEX: Dict[Position, int] = {position: square for square, position in enumerate(SQUARE_POSITIONS)}
+
+# (コマ種類, プレイヤー) ごとの共有Piece
+PIECES: Dict[Tuple[PieceType, Player], Piece] = {
+    (piece_type, player): Piece(piece_type, player) for piece_type in PieceType for player in PLAYERS
+}
+
+
 Board = List[List[Optional[Piece]]]
 
 
@@ -54,21 +104,61 @@ class GameState:
     game_result: Optional[Player]
     history: List[str]
     maguro_in_enemy_territory: MaguroInEnemyTerritory
+    # 以下は make_move の結果と apply_move で進めた状態が持ち、着手・取り消しで差分更新する派生値（なければNone）。
+    # 盤面・手ゴマ・手番・履歴を直接変更した状態では clear_caches() で破棄すること
+    # 盤面・手ゴマ・手番の64ビットZobristキー
+    zobrist_key: Optional[int] = field(default=None, compare=False, repr=False)
+    # history の各盤面ハッシュの出現回数
+    position_counts: Optional[Dict[str, int]] = field(default=None, compare=False, repr=False)
+    # 盤上のコマ（共有Piece）ごとのマス番号（row * 3 + col）の集合
+    piece_locations: Optional[Dict[Piece, Set[int]]] = field(default=None, compare=False, repr=False)
     
     def copy(self):
-        """ディープコピーを作成"""
-        import copy
-        return copy.deepcopy(self)
+        """ディープコピーを作成（コマ・コマ種類は値ごとに共有する不変のインスタンスなので、入れ物だけをコピーする）
+
+        派生値はコピーしないため、コピーは盤面などを直接変更してよい。
+        """
+        return GameState(
+            board=[list(row) for row in self.board],
+            hand_pieces={player: list(pieces) for player, pieces in self.hand_pieces.items()},
+            current_player=self.current_player,
+            turn=self.turn,
+            game_result=self.game_result,
+            history=list(self.history),
+            maguro_in_enemy_territory=dict(self.maguro_in_enemy_territory)
+        )
+    
+    def clear_caches(self) -> None:
+        """差分更新する派生値（Zobristキー・出現回数・コマの位置の索引）を破棄"""
+        self.zobrist_key = None
+        self.position_counts = None
+        self.piece_locations = None
 
 
-@dataclass
-class Move:
+@dataclass(frozen=True, eq=False)
+class Move(_Interned):
+    __slots__ = ('piece_type', 'from_position', 'to_position', 'is_placement')
+    _instances = {}
     piece_type: PieceType
     from_position: Optional[Position]
     to_position: Position
     is_placement: bool
 
 
+@dataclass
+class MoveRecord:
+    """その場で適用した手の差分（取り消し用）"""
+    move: Move
+    moved_piece: Optional[Piece]          # 移動したコマ（配置の場合はNone）
+    captured_piece: Optional[Piece]       # 捕獲したコマ
+    promoted: bool                        # いなだがぶりに出世したか
+    hand_index: Optional[int]             # 手ゴマの増減があった位置
+    history_appended: bool                # 履歴追加・手番交代を行ったか
+    previous_maguro_flags: MaguroInEnemyTerritory
+    previous_result: Optional[Player]
+    previous_zobrist_key: Optional[int] = None
+
+
 # 各コマの移動可能方向を定義（col_delta, row_delta）
 PIECE_MOVES = {
     PieceType.MAGURO: [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)],  # 8方向全て
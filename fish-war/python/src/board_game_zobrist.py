@@ -0,0 +1,60 @@
+"""
+おさかな対戦 - Zobristハッシュ
+盤面・手ゴマ・手番を64ビットの整数キーで表し、着手ごとにXORで差分更新する
+"""
+
+import random
+from typing import Dict, List, Tuple
+
+from board_game_types import PieceType, Player, Piece, Board, HandPieces
+
+
+# 手ゴマは同じ種類を何枚目に持っているかごとに乱数を割り当てる
+MAX_HAND_COUNT = 16
+
+# 再現性のため乱数の種は固定
+_rng = random.Random(0x0F15_4A7E)
+
+PIECE_KEYS: Dict[Tuple[PieceType, Player], List[int]] = {
+    (piece_type, player): [_rng.getrandbits(64) for _ in range(12)]
+    for piece_type in PieceType for player in ('first', 'second')
+}
+
+HAND_KEYS: Dict[Tuple[PieceType, Player], List[int]] = {
+    (piece_type, player): [_rng.getrandbits(64) for _ in range(MAX_HAND_COUNT)]
+    for piece_type in PieceType for player in ('first', 'second')
+}
+
+# 後手番のときにXORする
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def piece_key(piece: Piece, row: int, col: int) -> int:
+    """盤上のコマのキー"""
+    return PIECE_KEYS[(piece.type, piece.player)][row * 3 + col]
+
+
+def hand_key(piece_type: PieceType, player: Player, index: int) -> int:
+    """同じ種類の手ゴマの index 枚目（0始まり）のキー"""
+    return HAND_KEYS[(piece_type, player)][index]
+
+
+def compute_zobrist_key(board: Board, hand_pieces: HandPieces, current_player: Player) -> int:
+    """局面のZobristキーを一から計算"""
+    key = 0
+    for row in range(4):
+        for col in range(3):
+            piece = board[row][col]
+            if piece:
+                key ^= piece_key(piece, row, col)
+
+    for player in ('first', 'second'):
+        counts: Dict[PieceType, int] = {}
+        for piece_type in hand_pieces[player]:
+            index = counts.get(piece_type, 0)
+            key ^= hand_key(piece_type, player, index)
+            counts[piece_type] = index + 1
+
+    if current_player == 'second':
+        key ^= SIDE_KEY
+    return key
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 対局の解析
+棋譜を一度だけ再生して各手数の局面を作り、局面ごとの探索を複数プロセスに分けて行い、
+1手ごとに着手前後の評価値・最善手・悪手の判定を付けたJSONLを手数順に書き出す
+
+    python3 src/game_analysis.py "ま↑B4A3" "か↓A1A2" ... --movetime 200 --workers 4
+    python3 src/game_analysis.py --file game.txt --depth 6 --cache analysis_cache.jsonl
+    python3 src/game_analysis.py --record games.fwgr --game 12 --cache analysis_cache.jsonl
+
+評価値は指した側から見た値（board_game_search と同じ尺度。決着はおよそ ±10000）。
+局面の探索結果は対称性の正規形（board_game_symmetry）と探索条件をキーにキャッシュするため、
+途中まで同じ対局や左右反転・先後入れ替えで同じになる局面を再び解析するときは探索しない。
+--cache を指定するとキャッシュをJSONLファイルに保存し、次回の実行でも使う。
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field, asdict
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from board_game_types import GameState, Move, Player
+from board_game_logic import initialize_game, make_move, parse_move, format_move, get_position_text, parse_position_text
+from board_game_search import Searcher, WIN_SCORE
+from board_game_symmetry import Symmetry, canonicalize, canonical_key, inverse_transform_move
+from parallel_utils import ordered_map
+
+
+DEFAULT_MOVETIME_MS = 200
+# 指した側の評価値がこれ以上下がり、最善手と異なる手を悪手とする（ぶり・いなだ1枚程度）
+DEFAULT_BLUNDER_THRESHOLD = 30
+ANALYSIS_TT_SIZE = 1 << 16
+# 時間で打ち切らないときの制限時間（秒）
+UNLIMITED_TIME = 24 * 60 * 60.0
+
+
+@dataclass
+class PositionAnalysis:
+    """1局面の探索結果（手番側から見た評価値。手は解析した局面での表記）"""
+    score: int
+    depth: int
+    nodes: int
+    best_move: Optional[str] = None
+    pv: List[str] = field(default_factory=list)
+
+
+class AnalysisCache:
+    """局面の探索結果のキャッシュ（path を指定すればJSONLファイルに追記して保存する）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, PositionAnalysis] = {}
+        self._file: Optional[IO[str]] = None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        key = entry.pop('key')
+                        self._entries[key] = PositionAnalysis(**entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[PositionAnalysis]:
+        analysis = self._entries.get(key)
+        if analysis is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return analysis
+
+    def put(self, key: str, analysis: PositionAnalysis) -> None:
+        self._entries[key] = analysis
+        if self.path:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps({'key': key, **asdict(analysis)}, ensure_ascii=False) + '\n')
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ワーカープロセスごとの探索器（置換表は局面ごとに消去し、結果が並列数や解析の順序によらないようにする）
+_searcher: Optional[Searcher] = None
+
+
+def analyse_position(task: Tuple[str, float, int]) -> PositionAnalysis:
+    """(局面の文字列, 制限時間(秒), 最大深さ) の局面を探索する（ワーカープロセスで実行）"""
+    global _searcher
+    position_text, time_limit, max_depth = task
+    if _searcher is None:
+        _searcher = Searcher(ANALYSIS_TT_SIZE)
+    else:
+        _searcher.tt.clear()
+    result = _searcher.search(parse_position_text(position_text), time_limit=time_limit, max_depth=max_depth)
+    return PositionAnalysis(
+        score=result.score,
+        depth=result.depth,
+        nodes=result.nodes,
+        best_move=format_move(result.best_move) if result.best_move else None,
+        pv=[format_move(move) for move in result.pv]
+    )
+
+
+def replay_positions(moves: List[Move]) -> Tuple[List[GameState], Optional[dict]]:
+    """棋譜を再生して各手数の局面（初期局面を含む）と、不正な手があればそのエラーを返す"""
+    states = [initialize_game()]
+    for ply, move in enumerate(moves, 1):
+        if states[-1].game_result:
+            return states, {'ply': ply, 'move': format_move(move), 'error': "ゲームは既に終了しています"}
+        new_state, error = make_move(states[-1], move)
+        if error:
+            return states, {'ply': ply, 'move': format_move(move), 'error': error}
+        states.append(new_state)
+    return states, None
+
+
+def _terminal_score(result: str, mover: Player) -> int:
+    """決着した局面の、指した側から見た評価値"""
+    if result == 'draw':
+        return 0
+    return WIN_SCORE if result == mover else -WIN_SCORE
+
+
+def _restore(analysis: PositionAnalysis, symmetry: Symmetry) -> PositionAnalysis:
+    """正規形の局面での手を元の局面の手に戻す"""
+    if symmetry is Symmetry.IDENTITY:
+        return analysis
+
+    def restore(text: str) -> str:
+        return format_move(inverse_transform_move(parse_move(text), symmetry))
+    return PositionAnalysis(
+        score=analysis.score,
+        depth=analysis.depth,
+        nodes=analysis.nodes,
+        best_move=restore(analysis.best_move) if analysis.best_move else None,
+        pv=[restore(text) for text in analysis.pv]
+    )
+
+
+def iter_position_analyses(states: List[GameState], movetime_ms: Optional[int], max_depth: int,
+                           workers: int = 1, cache: Optional[AnalysisCache] = None
+                           ) -> Iterator[Optional[PositionAnalysis]]:
+    """各局面の探索結果を局面順に返す（決着した局面はNone）
+
+    キャッシュにない局面だけをワーカーに渡し、結果はキャッシュに追加する。
+    """
+    cache = cache if cache is not None else AnalysisCache()
+    time_limit = movetime_ms / 1000 if movetime_ms else UNLIMITED_TIME
+    settings = f"{movetime_ms or '-'}ms/{max_depth}"
+
+    # (キー, 変換, キャッシュの結果) を局面順に並べ、キャッシュにない局面は正規形の局面を探索する
+    plan: List[Tuple[Optional[str], Symmetry, Optional[PositionAnalysis]]] = []
+    tasks: List[Tuple[str, float, int]] = []
+    searched = set()
+    for state in states:
+        if state.game_result:
+            plan.append((None, Symmetry.IDENTITY, None))
+            continue
+        canonical, symmetry = canonicalize(state)
+        key = f"{canonical_key(canonical)} {settings}"
+        cached = None if key in searched else cache.get(key)
+        plan.append((key, symmetry, cached))
+        if cached is None and key not in searched:
+            searched.add(key)
+            tasks.append((get_position_text(canonical), time_limit, max_depth))
+
+    # 探索結果は tasks の順（各キーが初めて現れた順）に届く
+    results = ordered_map(analyse_position, tasks, workers)
+    found: Dict[str, PositionAnalysis] = {}
+    for key, symmetry, analysis in plan:
+        if key is None:
+            yield None
+            continue
+        if analysis is None:
+            analysis = found.get(key)
+            if analysis is None:
+                analysis = found[key] = next(results)
+                cache.put(key, analysis)
+        yield _restore(analysis, symmetry)
+
+
+def iter_annotations(moves: List[Move], movetime_ms: Optional[int] = DEFAULT_MOVETIME_MS, max_depth: int = 64,
+                     workers: int = 1, cache: Optional[AnalysisCache] = None,
+                     blunder_threshold: int = DEFAULT_BLUNDER_THRESHOLD) -> Iterator[dict]:
+    """1手ごとの解析結果を手数順に返し、最後に対局の結果（または不正な手のエラー）を返す"""
+    states, error = replay_positions(moves)
+    analyses = iter_position_analyses(states, movetime_ms, max_depth, workers, cache)
+    before = next(analyses)
+    for ply in range(1, len(states)):
+        after = next(analyses)
+        mover = states[ply - 1].current_player
+        result = states[ply].game_result
+        eval_after = _terminal_score(result, mover) if result else -after.score
+        loss = before.score - eval_after
+        move_text = format_move(moves[ply - 1])
+        yield {
+            'ply': ply,
+            'player': mover,
+            'move': move_text,
+            'eval_before': before.score,
+            'eval_after': eval_after,
+            'best_move': before.best_move,
+            'pv': before.pv,
+            'depth': before.depth,
+            'loss': loss,
+            'blunder': loss >= blunder_threshold and move_text != before.best_move,
+        }
+        before = after
+
+    if error:
+        yield error
+    else:
+        yield {'plies': len(states) - 1, 'result': states[-1].game_result}
+
+
+def analyse_game(moves: List[Move], output: IO[str], **options) -> int:
+    """解析結果を1行1件のJSONLで書き出す（解析した手数を返す）"""
+    plies = 0
+    for annotation in iter_annotations(moves, **options):
+        output.write(json.dumps(annotation, ensure_ascii=False) + '\n')
+        output.flush()
+        if 'move' in annotation and 'error' not in annotation:
+            plies += 1
+    return plies
+
+
+def _read_moves(args: argparse.Namespace) -> List[str]:
+    """引数・テキストファイル・バイナリ棋譜から手の文字列を読む"""
+    if args.record:
+        from board_game_record import GameRecordFile
+        with GameRecordFile(args.record) as records:
+            return [format_move(move) for move in records[args.game].moves]
+    if args.file:
+        if args.file == '-':
+            return sys.stdin.read().split()
+        with open(args.file, encoding='utf-8') as f:
+            return f.read().split()
+    return args.moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の対局を1手ごとに解析してJSONLで出力")
+    parser.add_argument('moves', nargs='*', help="手（parse_move と同じ表記）")
+    parser.add_argument('--file', help="空白区切りの手を書いたテキストファイル（- なら標準入力）")
+    parser.add_argument('--record', help="バイナリ棋譜ファイル（--game の対局を解析）")
+    parser.add_argument('--game', type=int, default=0, help="バイナリ棋譜の対局番号")
+    parser.add_argument('--movetime', type=int, help=f"1局面あたりの探索時間（ミリ秒、既定 {DEFAULT_MOVETIME_MS}。"
+                                                     "--depth だけを指定すると時間では打ち切らない）")
+    parser.add_argument('--depth', type=int, help="最大探索深さ（既定 64）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="並列プロセス数")
+    parser.add_argument('--cache', help="探索結果のキャッシュファイル（JSONL）")
+    parser.add_argument('--blunder', type=int, default=DEFAULT_BLUNDER_THRESHOLD, help="悪手とする評価値の下がり幅")
+    args = parser.parse_args()
+
+    texts = _read_moves(args)
+    moves = []
+    for text in texts:
+        move = parse_move(text)
+        if move is None:
+            parser.error(f"無効な手 '{text}'")
+        moves.append(move)
+
+    movetime = args.movetime
+    if movetime is None and args.depth is None:
+        movetime = DEFAULT_MOVETIME_MS
+    with AnalysisCache(args.cache) as cache:
+        analyse_game(moves, sys.stdout, movetime_ms=movetime, max_depth=args.depth or 64, workers=args.workers,
+                     cache=cache, blunder_threshold=args.blunder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 常駐エンジン
+標準入出力で USI 風の1行1コマンドのテキストプロトコル（UTF-8）を話し、1つのプロセスで
+任意の数の局面設定・合法手の列挙・探索を続けて処理する（起動とインポートは最初の1回だけ）
+
+    usi                                       id と usiok を返す
+    isready                                   readyok を返す
+    usinewgame                                置換表を消去
+    position startpos [moves <手>...]         初期局面から手を進めた局面にする
+    position text <局面> [moves <手>...]      get_position_text 形式の局面から手を進めた局面にする
+    moves <手>...                             現在の局面に手を進める
+    legal                                     legal <手>...（合法手の一覧）
+    result                                    result <first|second|draw|none>
+    show                                      position <局面>（現在の局面）
+    go [movetime <ms>] [depth <深さ>]         info を深さごとに返し、最後に bestmove <手|none>
+    quit                                      終了
+
+手は parse_move と同じ表記。エラーは error <メッセージ> の1行で返す（手順に不正な手があれば、
+局面はその手の前まで進めた状態になる）。
+position で前回と同じ開始局面を指定すると、前回の手順との共通部分はそのまま使い、
+異なる部分だけを取り消し・適用する（対局中に毎回全手順を送っても再生し直さない）。
+
+    python3 src/game_engine.py --movetime 500
+"""
+
+import argparse
+import sys
+from typing import IO, Callable, List, Optional, Tuple
+
+from board_game_types import GameState, Move
+from board_game_logic import (
+    initialize_game, parse_move, format_move, generate_legal_moves, get_position_text, parse_position_text
+)
+from board_game_search import Searcher, SearchResult, DEFAULT_TT_SIZE, WIN_SCORE, MATE_THRESHOLD
+from board_game_session import GameSession
+
+
+ENGINE_NAME = "fish-war engine"
+DEFAULT_MOVETIME_MS = 1000
+# get_position_text の空白区切りの項目数
+POSITION_TEXT_FIELDS = 5
+
+
+def format_info(result: SearchResult) -> str:
+    """探索の途中経過の info 行（詰みは score mate <手数>、負けなら負の手数）"""
+    if abs(result.score) >= MATE_THRESHOLD:
+        plies = WIN_SCORE - abs(result.score)
+        score = f"mate {plies if result.score > 0 else -plies}"
+    else:
+        score = f"cp {result.score}"
+    line = (
+        f"info depth {result.depth} score {score} nodes {result.nodes} nps {result.nps} "
+        f"time {int(result.elapsed * 1000)}"
+    )
+    if result.pv:
+        line += " pv " + ' '.join(format_move(move) for move in result.pv)
+    return line
+
+
+class Engine:
+    """1行のコマンドを受け取り、応答の行を返すエンジン（入出力から独立）"""
+
+    def __init__(self, tt_size: int = DEFAULT_TT_SIZE, default_movetime_ms: int = DEFAULT_MOVETIME_MS):
+        self.searcher = Searcher(tt_size)
+        self.default_movetime_ms = default_movetime_ms
+        self.session = GameSession()
+        # 現在の局面の開始局面（startpos なら None、それ以外は局面の文字列）
+        self._base: Optional[str] = None
+
+    @property
+    def state(self) -> GameState:
+        return self.session.state
+
+    def handle(self, line: str, emit: Callable[[str], None]) -> bool:
+        """1行のコマンドを処理して応答を emit に渡す（quit なら False）"""
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == 'quit':
+            return False
+        if command == 'usi':
+            emit(f"id name {ENGINE_NAME}")
+            emit("usiok")
+        elif command == 'isready':
+            emit("readyok")
+        elif command == 'usinewgame':
+            self.searcher.tt.clear()
+        elif command == 'position':
+            self._position(arguments, emit)
+        elif command == 'moves':
+            self._apply_moves(arguments, emit)
+        elif command == 'legal':
+            emit(' '.join(['legal'] + [format_move(move) for move in generate_legal_moves(self.state)]))
+        elif command == 'result':
+            emit(f"result {self.state.game_result or 'none'}")
+        elif command == 'show':
+            emit(f"position {get_position_text(self.state)}")
+        elif command == 'go':
+            self._go(arguments, emit)
+        else:
+            emit(f"error 不明なコマンドです: {command}")
+        return True
+
+    def _parse_moves(self, texts: List[str], emit: Callable[[str], None]) -> Optional[List[Move]]:
+        moves = []
+        for text in texts:
+            move = parse_move(text)
+            if move is None:
+                emit(f"error 手の形式が不正です: {text}")
+                return None
+            moves.append(move)
+        return moves
+
+    def _position(self, arguments: List[str], emit: Callable[[str], None]) -> None:
+        if arguments[:1] == ['startpos']:
+            base, rest = None, arguments[1:]
+        elif arguments[:1] == ['text']:
+            base = ' '.join(arguments[1:1 + POSITION_TEXT_FIELDS])
+            rest = arguments[1 + POSITION_TEXT_FIELDS:]
+        else:
+            emit("error position には startpos または text <局面> を指定してください")
+            return
+        if rest and rest[0] != 'moves':
+            emit(f"error 不明な引数です: {rest[0]}")
+            return
+        moves = self._parse_moves(rest[1:], emit)
+        if moves is None:
+            return
+
+        if base != self._base:
+            initial = initialize_game() if base is None else parse_position_text(base)
+            if initial is None:
+                emit(f"error 局面の形式が不正です: {base}")
+                return
+            self.session = GameSession(initial)
+            self._base = base
+
+        # 前回の手順との共通部分まで戻し、残りを適用する
+        current = self.session.moves
+        common = 0
+        while common < min(len(current), len(moves)) and current[common] is moves[common]:
+            common += 1
+        for _ in range(len(current) - common):
+            self.session.undo()
+        self._apply_moves_parsed(moves[common:], common, emit)
+
+    def _apply_moves(self, texts: List[str], emit: Callable[[str], None]) -> None:
+        moves = self._parse_moves(texts, emit)
+        if moves is not None:
+            self._apply_moves_parsed(moves, len(self.session.undo_stack), emit)
+
+    def _apply_moves_parsed(self, moves: List[Move], offset: int, emit: Callable[[str], None]) -> None:
+        """手を順に適用する（不正な手があればその手の前で止める）"""
+        for index, move in enumerate(moves):
+            error = self.session.apply(move)
+            if error:
+                emit(f"error {offset + index + 1}手目 {format_move(move)}: {error}")
+                return
+
+    def _parse_go(self, arguments: List[str]) -> Tuple[float, int]:
+        """go の引数から (制限時間(秒), 最大深さ)"""
+        movetime_ms, depth = self.default_movetime_ms, 64
+        options = dict(zip(arguments[::2], arguments[1::2]))
+        if 'movetime' in options:
+            movetime_ms = int(options['movetime'])
+        if 'depth' in options:
+            depth = int(options['depth'])
+            if 'movetime' not in options:
+                # 深さだけの指定なら時間では打ち切らない
+                movetime_ms = 24 * 60 * 60 * 1000
+        return movetime_ms / 1000, depth
+
+    def _go(self, arguments: List[str], emit: Callable[[str], None]) -> None:
+        try:
+            time_limit, max_depth = self._parse_go(arguments)
+        except ValueError:
+            emit(f"error go の引数が不正です: {' '.join(arguments)}")
+            return
+        if self.state.game_result:
+            emit("bestmove none")
+            return
+        result = self.searcher.search(
+            self.state, time_limit=time_limit, max_depth=max_depth, info=lambda info: emit(format_info(info))
+        )
+        emit(f"bestmove {format_move(result.best_move) if result.best_move else 'none'}")
+
+
+def run(engine: Engine, input_stream: IO[str], output: IO[str]) -> None:
+    """入力の各行を処理し、応答はコマンドごとにまとめて書き出す"""
+    def emit(line: str) -> None:
+        output.write(line + '\n')
+
+    for line in input_stream:
+        running = engine.handle(line, emit)
+        output.flush()
+        if not running:
+            break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の常駐エンジン（標準入出力のUSI風プロトコル）")
+    parser.add_argument('--movetime', type=int, default=DEFAULT_MOVETIME_MS, help="go で時間を省略したときの思考時間（ミリ秒）")
+    parser.add_argument('--tt-size', type=int, default=DEFAULT_TT_SIZE, help="置換表のエントリ数")
+    args = parser.parse_args()
+
+    try:
+        run(Engine(args.tt_size, args.movetime), sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 対局サーバーの負荷試験
+多数の接続から hotseat の対局をランダムな手で指し続け、MOVE を送ってから
+STATE（または END・ERR）を受け取るまでの時間の分布を表示する
+
+    python3 src/game_load_client.py --sessions 10000 --duration 30 --think 1.0
+    python3 src/game_load_client.py --port 7878 --sessions 100 --spectators 10 --stalled-spectators 5
+
+--port を省略すると game_server.py を別プロセスで起動して試験する。
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple
+
+from board_game_logic import initialize_game, apply_move, generate_legal_moves, format_move
+
+
+@dataclass
+class LoadStats:
+    """負荷試験の集計"""
+    latencies: List[float] = field(default_factory=list)
+    connected: int = 0
+    connect_errors: int = 0
+    games_finished: int = 0
+    errors: int = 0
+    spectator_updates: int = 0
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """fraction（0〜1）の分位点（values は昇順）"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def _read_until(reader: asyncio.StreamReader, prefixes: tuple) -> str:
+    """prefixes のいずれかで始まる行まで読み進める"""
+    while True:
+        raw = await reader.readline()
+        if not raw:
+            raise ConnectionError("サーバーが切断しました")
+        line = raw.decode('utf-8').rstrip('\n')
+        if line.startswith(prefixes):
+            return line
+
+
+def _parse_game_id(line: str) -> int:
+    """OK NEW <対局番号> ... の応答から対局番号（形式が不正なら ConnectionError）"""
+    try:
+        return int(line.split()[2])
+    except (IndexError, ValueError):
+        raise ConnectionError(f"応答の形式が不正です: {line}") from None
+
+
+async def run_session(host: str, port: int, measure_from: float, deadline: float, stats: LoadStats,
+                      rng: random.Random, think: float, clock: float, max_plies: int,
+                      connect_limit: asyncio.Semaphore, game_ids: List[int]) -> None:
+    """1接続で期限まで対局を繰り返す（measure_from より前の応答時間は数えない）"""
+    async with connect_limit:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            stats.connect_errors += 1
+            return
+    stats.connected += 1
+    try:
+        while time.monotonic() < deadline:
+            writer.write(f"NEW {clock} hotseat\n".encode('utf-8'))
+            game_id = _parse_game_id(await _read_until(reader, ('OK NEW',)))
+            await _read_until(reader, ('STATE',))
+            game_ids.append(game_id)
+
+            game_state = initialize_game()
+            finished = False
+            while not finished and time.monotonic() < deadline:
+                if think:
+                    await asyncio.sleep(rng.uniform(0, 2 * think))
+                move = rng.choice(generate_legal_moves(game_state))
+                start = time.perf_counter()
+                writer.write(f"MOVE {format_move(move)}\n".encode('utf-8'))
+                line = await _read_until(reader, ('STATE', 'ERR', 'END'))
+                if time.monotonic() >= measure_from:
+                    stats.latencies.append(time.perf_counter() - start)
+                if line.startswith('ERR'):
+                    stats.errors += 1
+                    finished = True
+                    continue
+                apply_move(game_state, move)
+                if line.startswith('END'):
+                    stats.games_finished += 1
+                    finished = True
+                elif line.split()[2] != '-':
+                    await _read_until(reader, ('END',))
+                    stats.games_finished += 1
+                    finished = True
+                elif game_state.turn > max_plies:
+                    writer.write(b"RESIGN\n")
+                    await _read_until(reader, ('END',))
+                    finished = True
+            if not finished:
+                writer.write(b"RESIGN\n")
+                await _read_until(reader, ('END',))
+    except ConnectionError:
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def run_spectator(host: str, port: int, deadline: float, stats: LoadStats, rng: random.Random,
+                        game_ids: List[int], stalled: bool, watch_count: int) -> None:
+    """対局を観戦する（stalled なら受信せず、サーバーの送信が詰まる状況を作る）"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+    except OSError:
+        stats.connect_errors += 1
+        return
+    try:
+        while not game_ids and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if not game_ids:
+            return
+        for _ in range(watch_count):
+            writer.write(f"WATCH {rng.choice(game_ids)}\n".encode('utf-8'))
+        if stalled:
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+            return
+        while time.monotonic() < deadline:
+            try:
+                raw = await asyncio.wait_for(reader.readline(), max(0.01, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
+            if not raw:
+                break
+            fields = raw.decode('utf-8').split()
+            if fields and fields[0] == 'STATE':
+                stats.spectator_updates += 1
+                if fields[2] != '-':
+                    # 終局したら別の対局に移る
+                    writer.write(f"WATCH {rng.choice(game_ids)}\n".encode('utf-8'))
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, sessions: int, duration: float, think: float = 0.0,
+                   clock: float = 600.0, max_plies: int = 200, spectators: int = 0,
+                   stalled_spectators: int = 0, seed: int = 0, warmup: float = 0.0,
+                   connect_parallelism: int = 256) -> LoadStats:
+    """負荷試験を実行して集計を返す（接続がそろうまでの warmup 秒は応答時間を数えない）"""
+    stats = LoadStats()
+    rng = random.Random(seed)
+    measure_from = time.monotonic() + warmup
+    deadline = measure_from + duration
+    connect_limit = asyncio.Semaphore(connect_parallelism)
+    game_ids: List[int] = []
+    tasks = [
+        run_session(host, port, measure_from, deadline, stats, random.Random(rng.random()), think, clock,
+                    max_plies, connect_limit, game_ids)
+        for _ in range(sessions)
+    ]
+    tasks += [
+        run_spectator(host, port, deadline, stats, random.Random(rng.random()), game_ids, index < stalled_spectators, 50)
+        for index in range(spectators + stalled_spectators)
+    ]
+    await asyncio.gather(*tasks)
+    stats.latencies.sort()
+    return stats
+
+
+def format_stats(stats: LoadStats, duration: float) -> str:
+    """集計を表示用の文字列にする"""
+    latencies = stats.latencies
+    return '\n'.join([
+        f"接続: {stats.connected}（失敗 {stats.connect_errors}）",
+        f"手数: {len(latencies)}（{len(latencies) / duration:.0f} 手/秒）, 終局: {stats.games_finished}, エラー: {stats.errors}",
+        f"応答時間(ms): p50 {percentile(latencies, 0.5) * 1e3:.2f}, p90 {percentile(latencies, 0.9) * 1e3:.2f}, "
+        f"p99 {percentile(latencies, 0.99) * 1e3:.2f}, 最大 {(latencies[-1] if latencies else 0.0) * 1e3:.2f}",
+        f"観戦者の受信: {stats.spectator_updates}",
+    ])
+
+
+def _spawn_server() -> Tuple[subprocess.Popen, int]:
+    """game_server.py を空いているポートで起動"""
+    process = subprocess.Popen(
+        [sys.executable, str(Path(__file__).parent / 'game_server.py'), '--port', '0'],
+        stdout=subprocess.PIPE, text=True
+    )
+    match = re.search(r':(\d+) ', process.stdout.readline())
+    if not match:
+        process.kill()
+        raise RuntimeError("対局サーバーを起動できませんでした")
+    return process, int(match.group(1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の対局サーバーの負荷試験")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="試験するサーバーのポート（省略時は別プロセスで起動）")
+    parser.add_argument('--sessions', type=int, default=1000, help="同時に対局する接続数")
+    parser.add_argument('--duration', type=float, default=20.0, help="計測する時間（秒）")
+    parser.add_argument('--warmup', type=float, default=5.0, help="計測を始めるまでの接続・立ち上がりの時間（秒）")
+    parser.add_argument('--think', type=float, default=1.0, help="1手あたりの平均思考時間（秒、0 で待たずに指す）")
+    parser.add_argument('--clock', type=float, default=600.0, help="各対局の持ち時間（秒）")
+    parser.add_argument('--max-plies', type=int, default=200, help="この手数を超えたら投了して次の対局へ")
+    parser.add_argument('--spectators', type=int, default=0, help="受信する観戦者の接続数")
+    parser.add_argument('--stalled-spectators', type=int, default=0, help="受信しない観戦者の接続数")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    port = args.port
+    if port is None:
+        process, port = _spawn_server()
+    try:
+        stats = asyncio.run(run_load(
+            args.host, port, args.sessions, args.duration, args.think, args.clock, args.max_plies,
+            args.spectators, args.stalled_spectators, args.seed, args.warmup
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(format_stats(stats, args.duration))
+
+
+if __name__ == "__main__":
+    main()
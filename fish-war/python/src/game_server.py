@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 対局サーバー
+1つのプロセスで多数の対局を asyncio のTCPサーバーとして提供する
+
+1行1コマンドのテキストプロトコル（UTF-8）:
+    NEW [持ち時間(秒)] [hotseat]   対局を作成して先手で参加（hotseat なら両方の手番を指す）
+    JOIN <対局番号>                 後手で参加（そろった時点で時計が動き出す）
+    WATCH <対局番号>                観戦（局面が変わるたびに STATE を受け取る）
+    MOVE <手>                       手を指す（parse_move と同じ表記）
+    RESIGN                          投了
+    QUIT                            切断
+
+サーバーからの行:
+    OK <コマンド> <対局番号> [手番]
+    STATE <対局番号> <結果|-> <先手の残り(ms)|-> <後手の残り(ms)|-> <局面>   局面は get_position_text 形式
+    END <対局番号> <結果> <理由>     理由は move・timeout・resign・disconnect
+    ERR <メッセージ>
+
+対局者への行は欠落させない。観戦者への STATE は、読み出しが遅い相手には対局ごとに最新の1行だけを
+保留して送るため、遅い観戦者がいても対局や他の接続は止まらない。
+
+    python3 src/game_server.py --port 7878
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from board_game_types import Player, GameState
+from board_game_logic import initialize_game, apply_move, parse_move, get_position_text
+
+
+DEFAULT_PORT = 7878
+MAX_LINE = 1024
+# 観戦者への送信を保留に切り替える送信バッファの大きさ
+SPECTATOR_HIGH_WATER = 64 * 1024
+# 対局者への送信バッファがこれを超えたら、読み出していないとみなして切断する
+PLAYER_BUFFER_LIMIT = 1024 * 1024
+# 接続・対局が数万のオブジェクトになると全世代のGCが数百msかかるため、GCの頻度を下げる
+GC_THRESHOLDS = (50_000, 20, 100)
+
+
+class Connection(asyncio.Protocol):
+    """1つのクライアント接続
+
+    接続ごとにタスクやストリームを作らず、受信したデータを行に分けてその場でサーバーに渡す。
+    """
+
+    def __init__(self, server: 'GameServer'):
+        self.server = server
+        self.transport: Optional[asyncio.Transport] = None
+        self.game: Optional['ServerGame'] = None
+        self.role: Optional[str] = None
+        self.watching: Set[int] = set()
+        self._buffer = b''
+        self._paused = False
+        # 観戦中の対局ごとに、まだ送っていない最新の STATE
+        self._pending: Dict[int, str] = {}
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        transport.set_write_buffer_limits(high=SPECTATOR_HIGH_WATER)
+
+    def data_received(self, data: bytes) -> None:
+        lines = (self._buffer + data).split(b'\n')
+        self._buffer = lines.pop()
+        for raw in lines:
+            if self.closing:
+                return
+            line = raw.decode('utf-8', errors='replace').strip()
+            if not line:
+                continue
+            if line.upper() == 'QUIT':
+                self.transport.close()
+                return
+            self.server.handle_command(self, line)
+        if len(self._buffer) > MAX_LINE:
+            self.send("ERR 行が長すぎます")
+            self.transport.close()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.server.disconnect(self)
+
+    def pause_writing(self) -> None:
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        """送信バッファが空いたら保留中の局面を送る"""
+        self._paused = False
+        if self._pending:
+            lines = list(self._pending.values())
+            self._pending.clear()
+            self.transport.write(''.join(line + '\n' for line in lines).encode('utf-8'))
+
+    @property
+    def closing(self) -> bool:
+        return self.transport.is_closing()
+
+    def send(self, line: str) -> None:
+        """欠落させずに送る（読み出さない相手は切断する）"""
+        if self.closing:
+            return
+        self.transport.write(line.encode('utf-8') + b'\n')
+        if self.transport.get_write_buffer_size() > PLAYER_BUFFER_LIMIT:
+            self.transport.abort()
+
+    def publish(self, game_id: int, line: str) -> None:
+        """局面を送る（送信が詰まっていれば対局ごとに最新の1行だけを保留する）"""
+        if self.closing:
+            return
+        if self._paused:
+            self._pending[game_id] = line
+        else:
+            self.transport.write(line.encode('utf-8') + b'\n')
+
+
+@dataclass
+class ServerGame:
+    """サーバー上の1対局"""
+    game_id: int
+    # 対局ごとに1つの状態をその場で更新する（コピーや履歴の共有構造を残さず、GCの負担を抑える）
+    state: GameState
+    clock: Optional[Dict[Player, float]]
+    hotseat: bool = False
+    players: Dict[Player, Optional[Connection]] = field(default_factory=lambda: {'first': None, 'second': None})
+    spectators: Set[Connection] = field(default_factory=set)
+    turn_started: Optional[float] = None
+    timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def started(self) -> bool:
+        return self.hotseat or self.players['second'] is not None
+
+
+class GameServer:
+    """多数の対局を受け持つサーバー"""
+
+    def __init__(self, default_clock: Optional[float] = None):
+        self.default_clock = default_clock
+        self.games: Dict[int, ServerGame] = {}
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.moves_played = 0
+
+    async def start(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> int:
+        """待ち受けを開始し、実際のポート番号を返す"""
+        self._server = await asyncio.get_running_loop().create_server(
+            lambda: Connection(self), host, port, backlog=4096
+        )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        for game in list(self.games.values()):
+            self._cancel_timer(game)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def handle_command(self, connection: Connection, line: str) -> None:
+        """1行のコマンドを処理する"""
+        command, _, argument = line.partition(' ')
+        command = command.upper()
+        argument = argument.strip()
+        if command == 'MOVE':
+            self._move(connection, argument)
+        elif command == 'NEW':
+            self._new(connection, argument.split())
+        elif command == 'JOIN':
+            self._join(connection, argument)
+        elif command == 'WATCH':
+            self._watch(connection, argument)
+        elif command == 'RESIGN':
+            self._resign(connection)
+        else:
+            connection.send(f"ERR 不明なコマンドです: {command}")
+
+    def _find_game(self, connection: Connection, argument: str) -> Optional[ServerGame]:
+        try:
+            game = self.games.get(int(argument))
+        except ValueError:
+            game = None
+        if game is None:
+            connection.send(f"ERR 対局がありません: {argument}")
+        return game
+
+    def _new(self, connection: Connection, arguments: List[str]) -> None:
+        if connection.game is not None:
+            connection.send("ERR 既に対局に参加しています")
+            return
+        hotseat = 'hotseat' in arguments
+        numbers = [argument for argument in arguments if argument != 'hotseat']
+        try:
+            seconds = float(numbers[0]) if numbers else self.default_clock
+        except ValueError:
+            connection.send(f"ERR 持ち時間が不正です: {numbers[0]}")
+            return
+        clock = {'first': seconds, 'second': seconds} if seconds and seconds > 0 else None
+        game = ServerGame(next(self._ids), initialize_game(), clock, hotseat)
+        game.players['first'] = connection
+        if hotseat:
+            game.players['second'] = connection
+        self.games[game.game_id] = game
+        connection.game = game
+        connection.role = 'hotseat' if hotseat else 'first'
+        connection.send(f"OK NEW {game.game_id} {connection.role}")
+        if game.started:
+            self._start_clock(game)
+            self._broadcast(game)
+
+    def _join(self, connection: Connection, argument: str) -> None:
+        if connection.game is not None:
+            connection.send("ERR 既に対局に参加しています")
+            return
+        game = self._find_game(connection, argument)
+        if game is None:
+            return
+        if game.players['second'] is not None:
+            connection.send(f"ERR 対局 {game.game_id} は満員です")
+            return
+        game.players['second'] = connection
+        connection.game = game
+        connection.role = 'second'
+        connection.send(f"OK JOIN {game.game_id} second")
+        self._start_clock(game)
+        self._broadcast(game)
+
+    def _watch(self, connection: Connection, argument: str) -> None:
+        game = self._find_game(connection, argument)
+        if game is None:
+            return
+        game.spectators.add(connection)
+        connection.watching.add(game.game_id)
+        connection.send(f"OK WATCH {game.game_id}")
+        connection.publish(game.game_id, self._state_line(game))
+
+    def _move(self, connection: Connection, argument: str) -> None:
+        game = connection.game
+        if game is None:
+            connection.send("ERR 対局に参加していません")
+            return
+        if not game.started:
+            connection.send("ERR 相手がまだ参加していません")
+            return
+        if connection.role != 'hotseat' and connection.role != game.state.current_player:
+            connection.send("ERR 相手の手番です")
+            return
+        move = parse_move(argument)
+        if move is None:
+            connection.send(f"ERR 手の形式が正しくありません: {argument}")
+            return
+
+        now = asyncio.get_running_loop().time()
+        player = game.state.current_player
+        # 消費時間は手が通ってから差し引く（不正な手で差し引くと、次の手で同じ時間を二重に数える）
+        elapsed = now - game.turn_started
+        if game.clock is not None and game.clock[player] <= elapsed:
+            game.clock[player] -= elapsed
+            self._finish(game, 'second' if player == 'first' else 'first', 'timeout')
+            return
+        _, error = apply_move(game.state, move)
+        if error:
+            connection.send(f"ERR {error}")
+            return
+        if game.clock is not None:
+            game.clock[player] -= elapsed
+
+        self.moves_played += 1
+        if game.state.game_result:
+            self._finish(game, game.state.game_result, 'move')
+            return
+        game.turn_started = now
+        self._schedule_timeout(game)
+        self._broadcast(game)
+
+    def _resign(self, connection: Connection) -> None:
+        game = connection.game
+        if game is None:
+            connection.send("ERR 対局に参加していません")
+            return
+        loser = game.state.current_player if connection.role == 'hotseat' else connection.role
+        self._finish(game, 'second' if loser == 'first' else 'first', 'resign')
+
+    def _start_clock(self, game: ServerGame) -> None:
+        game.turn_started = asyncio.get_running_loop().time()
+        self._schedule_timeout(game)
+
+    def _schedule_timeout(self, game: ServerGame) -> None:
+        """手番側の残り時間が尽きたら終局させるタイマーを設定"""
+        self._cancel_timer(game)
+        if game.clock is not None:
+            remaining = game.clock[game.state.current_player]
+            game.timer = asyncio.get_running_loop().call_later(remaining, self._on_timeout, game)
+
+    def _cancel_timer(self, game: ServerGame) -> None:
+        if game.timer is not None:
+            game.timer.cancel()
+            game.timer = None
+
+    def _on_timeout(self, game: ServerGame) -> None:
+        game.timer = None
+        player = game.state.current_player
+        game.clock[player] = 0.0
+        self._finish(game, 'second' if player == 'first' else 'first', 'timeout')
+
+    def _remaining_ms(self, game: ServerGame, player: Player) -> str:
+        if game.clock is None:
+            return '-'
+        remaining = game.clock[player]
+        if player == game.state.current_player and game.turn_started is not None and not game.state.game_result:
+            remaining -= asyncio.get_running_loop().time() - game.turn_started
+        return str(max(0, round(remaining * 1000)))
+
+    def _state_line(self, game: ServerGame) -> str:
+        return (
+            f"STATE {game.game_id} {game.state.game_result or '-'} "
+            f"{self._remaining_ms(game, 'first')} {self._remaining_ms(game, 'second')} "
+            f"{get_position_text(game.state)}"
+        )
+
+    def _broadcast(self, game: ServerGame) -> None:
+        """対局者と観戦者に現在の局面を送る"""
+        line = self._state_line(game)
+        for connection in set(game.players.values()):
+            if connection is not None:
+                connection.send(line)
+        for spectator in game.spectators:
+            spectator.publish(game.game_id, line)
+
+    def _finish(self, game: ServerGame, result: str, reason: str) -> None:
+        """終局を通知して対局を片付ける"""
+        self._cancel_timer(game)
+        game.state.game_result = result
+        self._broadcast(game)
+        end = f"END {game.game_id} {result} {reason}"
+        for connection in set(game.players.values()):
+            if connection is not None:
+                connection.send(end)
+                connection.game = None
+                connection.role = None
+        for spectator in game.spectators:
+            spectator.watching.discard(game.game_id)
+        game.spectators.clear()
+        del self.games[game.game_id]
+
+    def disconnect(self, connection: Connection) -> None:
+        """切断した接続を対局と観戦から外す"""
+        for game_id in connection.watching:
+            game = self.games.get(game_id)
+            if game is not None:
+                game.spectators.discard(connection)
+        connection.watching.clear()
+        game = connection.game
+        if game is None:
+            return
+        if game.hotseat or not game.started:
+            self._cancel_timer(game)
+            for spectator in game.spectators:
+                spectator.watching.discard(game.game_id)
+            del self.games[game.game_id]
+            connection.game = None
+            return
+        loser = connection.role
+        game.players[loser] = None
+        self._finish(game, 'second' if loser == 'first' else 'first', 'disconnect')
+
+
+async def _serve(host: str, port: int, clock: Optional[float]) -> None:
+    server = GameServer(default_clock=clock)
+    actual_port = await server.start(host, port)
+    # 起動時までに作ったオブジェクト（表など）はGCの対象から外す
+    gc.set_threshold(*GC_THRESHOLDS)
+    gc.freeze()
+    print(f"対局サーバーを {host}:{actual_port} で起動しました", flush=True)
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の対局サーバー")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="待ち受けるポート（0 で空いているポート）")
+    parser.add_argument('--clock', type=float, help="NEW で持ち時間を省略したときの持ち時間（秒）")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args.host, args.port, args.clock))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
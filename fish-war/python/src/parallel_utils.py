@@ -0,0 +1,34 @@
+"""
+おさかな対戦 - 並列実行ユーティリティ
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def ordered_map(fn: Callable[[T], R], items: Iterable[T], workers: int = 1,
+                window: Optional[int] = None) -> Iterator[R]:
+    """fn を複数プロセスで実行し、入力順に結果を返す
+
+    実行中のタスクは最大 window 個に制限するため、入力を先読みしすぎず
+    メモリ使用量は入力全体の大きさに依存しない。workers が1以下なら同じプロセスで実行する。
+    """
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
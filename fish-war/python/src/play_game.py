@@ -3,11 +3,13 @@
 おさかな対戦 - インタラクティブCLI版
 """
 
+import argparse
 import sys
 from board_game_logic import (
     initialize_game, get_board_text, get_game_info_text,
     parse_move, make_move
 )
+from board_game_search import Searcher
 
 
 def print_game_state(game_state):
@@ -31,16 +33,45 @@ def print_help():
     print("================\n")
 
 
+def play_computer_move(game_state, searcher, time_limit):
+    """コンピュータの手を探索して実行（指せる手がなければ None）"""
+    result = searcher.search(game_state, time_limit=time_limit)
+    move = result.best_move
+    if move is None:
+        print("\nコンピュータの指せる手がありません。")
+        return None
+    source = move.from_position if move.from_position else "手ゴマ"
+    print(f"\nコンピュータの手: {move.piece_type.value} {source}→{move.to_position}")
+    print(f"（深さ: {result.depth}, ノード数: {result.nodes}, {result.nps} nodes/s）")
+    new_state, _ = make_move(game_state, move)
+    return new_state
+
+
 def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦 - インタラクティブCLI版")
+    parser.add_argument('--cpu', choices=['first', 'second'], help="コンピュータが担当する手番")
+    parser.add_argument('--time', type=float, default=1.0, help="コンピュータの1手あたりの思考時間（秒）")
+    args = parser.parse_args()
+    
     print("おさかな対戦へようこそ！")
     print("'help'でヘルプを表示します。")
     
     game_state = initialize_game()
+    searcher = Searcher() if args.cpu else None
     print_game_state(game_state)
     
     while game_state.game_result is None:
         player = "先手" if game_state.current_player == 'first' else "後手"
         
+        if game_state.current_player == args.cpu:
+            new_state = play_computer_move(game_state, searcher, args.time)
+            if new_state is None:
+                print("ゲームを終了します。")
+                sys.exit(0)
+            game_state = new_state
+            print_game_state(game_state)
+            continue
+        
         try:
             move_input = input(f"\n{player}の番です。手を入力してください: ").strip()
             
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+おさかな対戦 - 自己対局データ生成
+複数プロセスで自己対局を行い、(局面, 手, 最終結果) をサイズ上限付きのシャードファイルに書き出す
+
+ゲームごとの乱数の種はシードとゲーム番号から決まる。
+書き出しはゲーム番号順に行い、progress.json に書き出し済みのゲーム番号とファイル位置を記録するため、
+中断後に再実行すると記録位置以降を切り詰めてから続きを生成する（重複も欠落もしない）。
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from board_game_types import GameState, Move
+from board_game_logic import (
+    initialize_game, make_move, generate_legal_moves, format_move, get_position_text
+)
+from parallel_utils import ordered_map
+
+
+Policy = Callable[[GameState, random.Random], Move]
+
+PROGRESS_FILE = 'progress.json'
+DEFAULT_SHARD_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_PLIES = 200
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+
+def random_policy(game_state: GameState, rng: random.Random) -> Move:
+    """合法手から一様ランダムに選ぶ"""
+    return rng.choice(generate_legal_moves(game_state))
+
+
+def _mcts_policy(argument: Optional[str]) -> Policy:
+    from board_game_mcts import MCTSPlayer
+    iterations = int(argument) if argument else 200
+
+    def policy(game_state: GameState, rng: random.Random) -> Move:
+        return MCTSPlayer(iterations=iterations, seed=rng.getrandbits(32)).search(game_state).best_move
+    return policy
+
+
+def _search_policy(argument: Optional[str]) -> Policy:
+    from board_game_search import Searcher
+    # 再現性のため時間ではなく深さで探索を打ち切る
+    max_depth = int(argument) if argument else 3
+    searcher = Searcher(tt_size=1 << 14)
+    # 置換表は対局ごとに消去する（乱数は対局ごとに作られるので、乱数が変わったら別の対局）
+    current_rng: Optional[random.Random] = None
+
+    def policy(game_state: GameState, rng: random.Random) -> Move:
+        nonlocal current_rng
+        if rng is not current_rng:
+            searcher.tt.clear()
+            current_rng = rng
+        return searcher.search(game_state, time_limit=3600.0, max_depth=max_depth).best_move
+    return policy
+
+
+# 方策名 → (引数文字列から方策を作る関数)
+POLICIES: Dict[str, Callable[[Optional[str]], Policy]] = {
+    'random': lambda argument: random_policy,
+    'mcts': _mcts_policy,
+    'search': _search_policy,
+}
+
+_policy_cache: Dict[str, Policy] = {}
+
+
+def load_policy(spec: str) -> Policy:
+    """方策を名前で読み込む（'mcts:500' のように引数を付けられる。'module.path:function' も可）"""
+    if spec in _policy_cache:
+        return _policy_cache[spec]
+
+    name, _, argument = spec.partition(':')
+    if name in POLICIES:
+        policy = POLICIES[name](argument or None)
+    elif argument:
+        policy = getattr(importlib.import_module(name), argument)
+    else:
+        raise ValueError(f"不明な方策です: {spec}")
+    _policy_cache[spec] = policy
+    return policy
+
+
+def play_self_play_game(task: Tuple[int, str, str, int, int]) -> Tuple[int, str, int]:
+    """1局を自己対局し、(ゲーム番号, JSONL文字列, 手数) を返す"""
+    game_id, first_policy, second_policy, seed, max_plies = task
+    rng = random.Random(seed * 1_000_003 + game_id)
+    policies = {'first': load_policy(first_policy), 'second': load_policy(second_policy)}
+
+    game_state = initialize_game()
+    plies: List[Tuple[str, str]] = []
+    while game_state.game_result is None and len(plies) < max_plies:
+        if not generate_legal_moves(game_state):
+            break
+        move = policies[game_state.current_player](game_state, rng)
+        position = get_position_text(game_state)
+        game_state, error = make_move(game_state, move)
+        if error:
+            raise ValueError(f"方策が不正な手を返しました: {format_move(move)} ({error})")
+        plies.append((position, format_move(move)))
+
+    lines = [
+        json.dumps({
+            'game': game_id, 'ply': ply, 'position': position,
+            'move': move, 'outcome': game_state.game_result
+        }, ensure_ascii=False) + '\n'
+        for ply, (position, move) in enumerate(plies)
+    ]
+    return game_id, ''.join(lines), len(plies)
+
+
+@dataclass
+class SelfPlayStats:
+    """生成の統計"""
+    games: int
+    plies: int
+    elapsed: float
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def plies_per_second(self) -> float:
+        return self.plies / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class ShardWriter:
+    """サイズ上限付きシャードへの書き出しと再開位置の記録"""
+
+    def __init__(self, out_dir: str, shard_size: int):
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        os.makedirs(out_dir, exist_ok=True)
+
+        progress = self._load_progress()
+        self.next_game = progress['next_game']
+        self.shard = progress['shard']
+        self.offset = progress['offset']
+
+        # 記録位置より後ろは中断時の書きかけなので切り詰める
+        self._file = open(self._shard_path(self.shard), 'ab')
+        self._file.truncate(self.offset)
+        self._file.seek(self.offset)
+
+    def _shard_path(self, shard: int) -> str:
+        return os.path.join(self.out_dir, f"shard-{shard:05d}.jsonl")
+
+    def _load_progress(self) -> dict:
+        path = os.path.join(self.out_dir, PROGRESS_FILE)
+        if not os.path.exists(path):
+            return {'next_game': 0, 'shard': 0, 'offset': 0}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def checkpoint(self) -> None:
+        """書き出し済みのデータを永続化し、再開位置を記録"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        path = os.path.join(self.out_dir, PROGRESS_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'next_game': self.next_game, 'shard': self.shard, 'offset': self.offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+    def write_game(self, game_id: int, data: bytes) -> None:
+        """1局分のレコードを書き出す（上限を超えるなら次のシャードへ）"""
+        if self.offset and self.offset + len(data) > self.shard_size:
+            self.checkpoint()
+            self._file.close()
+            self.shard += 1
+            self.offset = 0
+            self._file = open(self._shard_path(self.shard), 'wb')
+            self.checkpoint()
+
+        self._file.write(data)
+        self.offset += len(data)
+        self.next_game = game_id + 1
+
+    def close(self) -> None:
+        self.checkpoint()
+        self._file.close()
+
+
+def run_self_play(out_dir: str, games: int, policy: str = 'random', opponent_policy: Optional[str] = None,
+                  workers: int = 1, seed: int = 0, max_plies: int = DEFAULT_MAX_PLIES,
+                  shard_size: int = DEFAULT_SHARD_SIZE, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                  report: Optional[Callable[[SelfPlayStats], None]] = None,
+                  report_interval: float = 5.0) -> SelfPlayStats:
+    """games 局に達するまで自己対局を生成する（既存の出力があれば続きから）"""
+    writer = ShardWriter(out_dir, shard_size)
+    opponent_policy = opponent_policy or policy
+    tasks = (
+        (game_id, policy, opponent_policy, seed, max_plies)
+        for game_id in range(writer.next_game, games)
+    )
+
+    start = time.perf_counter()
+    last_report = start
+    stats = SelfPlayStats(0, 0, 0.0)
+    try:
+        for game_id, lines, plies in ordered_map(play_self_play_game, tasks, workers):
+            writer.write_game(game_id, lines.encode('utf-8'))
+            stats.games += 1
+            stats.plies += plies
+            if stats.games % checkpoint_interval == 0:
+                writer.checkpoint()
+
+            now = time.perf_counter()
+            if report and now - last_report >= report_interval:
+                stats.elapsed = now - start
+                report(stats)
+                last_report = now
+    finally:
+        writer.close()
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _print_stats(stats: SelfPlayStats) -> None:
+    print(
+        f"{stats.games} 局 ({stats.games_per_second:.1f} 局/秒), "
+        f"{stats.plies} 手 ({stats.plies_per_second:.1f} 手/秒)",
+        file=sys.stderr, flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="おさかな対戦の自己対局データを生成")
+    parser.add_argument('out_dir', help="シャードファイルの出力先ディレクトリ")
+    parser.add_argument('--games', type=int, required=True, help="生成する総対局数")
+    parser.add_argument('--policy', default='random', help="先手の方策（random / mcts:回数 / search:深さ / module:function）")
+    parser.add_argument('--opponent-policy', default=None, help="後手の方策（省略時は先手と同じ）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="並列プロセス数")
+    parser.add_argument('--seed', type=int, default=0, help="乱数の種")
+    parser.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES, help="1局の最大手数")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help="シャードの最大バイト数")
+    args = parser.parse_args()
+
+    stats = run_self_play(
+        args.out_dir, args.games, policy=args.policy, opponent_policy=args.opponent_policy,
+        workers=args.workers, seed=args.seed, max_plies=args.max_plies,
+        shard_size=args.shard_size, report=_print_stats
+    )
+    _print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
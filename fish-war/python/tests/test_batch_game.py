@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import board_game_instrumentation
+from batch_game import replay_record, run_corpus, main
+
+
+class TestBatchCorpus(unittest.TestCase):
+    """棋譜コーパス一括検証のテスト"""
+
+    CORPUS = [
+        "い↑B3B2 か↓A1A2\n",
+        "\n",
+        "い↑B3B2 か↓A1A2 ま↑B4A3 xx\n",
+        "い↑B3B2 い↑B3B2\n",
+        "た↑A4B1\n",
+    ]
+
+    def test_replay_record(self):
+        """結果と最初のエラーの手数を返す"""
+        self.assertEqual(replay_record(1, self.CORPUS[0]), {'line': 1, 'plies': 2, 'result': None})
+        record = replay_record(3, self.CORPUS[2])
+        self.assertEqual((record['ply'], record['move']), (3, 'xx'))
+        record = replay_record(4, self.CORPUS[3])
+        self.assertEqual(record['ply'], 1)
+        self.assertIn('error', record)
+
+    def test_maguro_capture_result(self):
+        """まぐろ捕獲で決着した棋譜の結果"""
+        line = "ま↑B4A3 か↓A1A2 ま↓A3B4 ま↓B1C2 か↑C4C3 ま↓C2B3 ま↑B4B3"
+        self.assertEqual(replay_record(1, line)['result'], 'first')
+        self.assertIn('error', replay_record(1, line + " か↑B3B2"))
+
+    def test_corpus_order(self):
+        """空行を飛ばし、入力順・行番号付きで書き出す（並列でも同じ）"""
+        serial = io.StringIO()
+        parallel = io.StringIO()
+        self.assertEqual(run_corpus(iter(self.CORPUS * 20), serial, chunk_size=3), 80)
+        run_corpus(iter(self.CORPUS * 20), parallel, workers=2, chunk_size=3)
+        self.assertEqual(serial.getvalue(), parallel.getvalue())
+        lines = [json.loads(line)['line'] for line in serial.getvalue().splitlines()]
+        self.assertEqual(lines, [n for n in range(1, 101) if n % 5 != 2])
+
+    def test_corpus_option_in_any_position(self):
+        """--corpus は他のオプションの後にも書ける"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'kifu.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(self.CORPUS)
+            outputs = []
+            for argv in (['--corpus', path, '--workers', '1'], ['--workers', '1', '--chunk-size', '2', '--corpus', path]):
+                output = io.StringIO()
+                with mock.patch.object(sys, 'argv', ['batch_game.py'] + argv), redirect_stdout(output):
+                    main()
+                outputs.append(output.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(len(outputs[0].splitlines()), 4)
+
+    def test_profile_json(self):
+        """--profile json で計測結果をJSONで標準エラー出力に表示する"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'kifu.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(self.CORPUS)
+            errors = io.StringIO()
+            argv = ['batch_game.py', '--profile', 'json', '--corpus', path, '--workers', '1']
+            try:
+                with mock.patch.object(sys, 'argv', argv), redirect_stdout(io.StringIO()), redirect_stderr(errors):
+                    main()
+            finally:
+                board_game_instrumentation.disable()
+                board_game_instrumentation.reset()
+        self.assertGreater(json.loads(errors.getvalue())['validate_move']['calls'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
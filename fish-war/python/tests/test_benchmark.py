@@ -0,0 +1,55 @@
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import make_move, generate_legal_moves
+from benchmark import perft, perft_position, compare_results, PERFT_POSITIONS
+
+
+def copying_perft(game_state, depth):
+    """make_move で局面を複製しながら数える perft（比較用）"""
+    if depth == 0:
+        return 1
+    return sum(copying_perft(make_move(game_state, move)[0], depth - 1) for move in generate_legal_moves(game_state))
+
+
+class TestBenchmark(unittest.TestCase):
+    """ベンチマークのテスト"""
+
+    def test_perft_initial(self):
+        """初期局面からの perft の局面数"""
+        game_state = perft_position('initial')
+        self.assertEqual([perft(game_state, depth) for depth in range(1, 6)], [4, 17, 110, 780, 6179])
+
+    def test_perft_matches_make_move(self):
+        """その場で着手・取り消す perft と make_move による perft が一致し、局面が元に戻る"""
+        for name in PERFT_POSITIONS:
+            game_state = perft_position(name)
+            before = game_state.copy()
+            self.assertEqual(perft(game_state, 3), copying_perft(game_state, 3), name)
+            self.assertEqual(game_state, before)
+
+    def test_compare_results(self):
+        """基準値より遅い処理と局面数の不一致を検出する"""
+        baseline = {'benchmarks': {
+            'parse_move': {'ns_per_op': 100.0},
+            'make_move': {'ns_per_op': 1000.0},
+            'perft_initial': {'depth': 5, 'nodes': 6179, 'ns_per_op': 900.0},
+        }}
+        current = {'benchmarks': {
+            'parse_move': {'ns_per_op': 120.0},
+            'make_move': {'ns_per_op': 1300.0},
+            'perft_initial': {'depth': 5, 'nodes': 6180, 'ns_per_op': 800.0},
+        }}
+        failures = compare_results(baseline, current, threshold=0.25)
+        self.assertEqual(len(failures), 2)
+        self.assertTrue(failures[0].startswith('make_move'))
+        self.assertTrue(failures[1].startswith('perft_initial'))
+        self.assertEqual(compare_results(baseline, current, threshold=0.5), failures[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from board_game_types import PieceType
+from board_game_logic import initialize_game, make_move, generate_legal_moves, parse_move
+from board_game_move_codec import MOVES, encode_move
+
+if np is not None:
+    from board_game_batch import BatchGameEngine, LEGAL_CODES, RESULT_NAMES, legal_codes, random_actions
+
+
+def normalized(state):
+    """手ゴマの並び順を種類順にそろえる（一括エンジンは手ゴマを種類ごとの個数で持つため）"""
+    state = state.copy()
+    for player, pieces in state.hand_pieces.items():
+        pieces.sort(key=lambda piece_type: list(PieceType).index(piece_type))
+    return state
+
+
+@unittest.skipIf(np is None, "NumPy がインストールされていません")
+class TestBatchEngine(unittest.TestCase):
+    """NumPyによる一括対局エンジンのテスト"""
+
+    def test_matches_scalar_logic(self):
+        """ランダム対局で合法手・着手結果・終局判定が board_game_logic と一致する"""
+        num_games = 32
+        engine = BatchGameEngine(num_games)
+        states = [initialize_game() for _ in range(num_games)]
+        rng = np.random.default_rng(0)
+        finished = 0
+        for _ in range(400):
+            mask = engine.legal_mask()
+            for index, state in enumerate(states):
+                expected = sorted(encode_move(move) for move in generate_legal_moves(state))
+                self.assertEqual(legal_codes(mask[index]), expected)
+
+            actions = random_actions(mask, rng)
+            done, results = engine.step(actions, validate=True)
+            for index in range(num_games):
+                states[index], error = make_move(states[index], MOVES[actions[index]])
+                self.assertIsNone(error)
+                if states[index].game_result:
+                    self.assertTrue(done[index])
+                    self.assertEqual(RESULT_NAMES[int(results[index])], states[index].game_result)
+                    states[index] = initialize_game()
+                    finished += 1
+                else:
+                    self.assertFalse(done[index])
+                    self.assertEqual(engine.to_game_state(index), normalized(states[index]))
+        self.assertGreater(finished, 100)
+
+    def test_legal_candidates(self):
+        """legal_candidates は legal_mask の LEGAL_CODES の列と一致し、random_actions で同じ手を選ぶ"""
+        engine = BatchGameEngine(64)
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            mask = engine.legal_mask()
+            candidates = engine.legal_candidates()
+            np.testing.assert_array_equal(candidates, mask[:, LEGAL_CODES])
+            self.assertFalse(np.delete(mask, LEGAL_CODES, axis=1).any())
+            seed = int(rng.integers(1 << 30))
+            actions = random_actions(candidates, np.random.default_rng(seed))
+            np.testing.assert_array_equal(actions, random_actions(mask, np.random.default_rng(seed)))
+            done, _ = engine.step(actions, validate=True)
+            engine.reset(np.flatnonzero(done))
+
+    def test_from_game_states(self):
+        """GameState との相互変換"""
+        state = initialize_game()
+        for move_str in ["い↑B3B2", "か↓A1A2"]:
+            state, _ = make_move(state, parse_move(move_str))
+        engine = BatchGameEngine.from_game_states([initialize_game(), state])
+        self.assertEqual(engine.to_game_state(0), initialize_game())
+        self.assertEqual(engine.to_game_state(1), state)
+        self.assertEqual(engine.planes().shape, (2, 10, 12))
+        self.assertEqual(int(engine.planes()[1].sum()), 7)
+
+    def test_validate_rejects_illegal(self):
+        """validate を指定すると不正な手を拒否する"""
+        engine = BatchGameEngine(2)
+        code = encode_move(parse_move("い↑B3B2"))
+        with self.assertRaises(ValueError):
+            engine.step(np.array([code, encode_move(parse_move("た↑A4A3"))]), validate=True)
+        done, _ = engine.step(np.array([code, code]), validate=True)
+        self.assertFalse(done.any())
+        self.assertEqual(engine.turn.tolist(), [2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
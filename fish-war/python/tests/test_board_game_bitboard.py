@@ -0,0 +1,102 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Position, Move
+from board_game_logic import (
+    initialize_game, parse_move, make_move, validate_move
+)
+from board_game_bitboard import (
+    from_game_state, to_game_state, validate_bitboard_move,
+    make_bitboard_move, move_to_bitboard, bitboard_to_move, get_bitboard_hash
+)
+
+
+def all_candidate_moves():
+    """形式上ありうるすべての手（不正な手を含む）"""
+    positions = [Position(col, row) for row in range(1, 5) for col in 'ABC']
+    moves = []
+    for piece_type in PieceType:
+        for to_position in positions:
+            moves.append(Move(piece_type, None, to_position, True))
+            for from_position in positions:
+                moves.append(Move(piece_type, from_position, to_position, False))
+    return moves
+
+
+class TestBitboard(unittest.TestCase):
+    """ビットボード版ゲーム状態のテスト"""
+
+    def assert_same_state(self, game_state, bitboard_state):
+        """GameState とビットボードが同じ局面を表すことを確認"""
+        converted = to_game_state(bitboard_state)
+        self.assertEqual(converted.board, game_state.board)
+        for player in ('first', 'second'):
+            self.assertEqual(
+                sorted(p.value for p in converted.hand_pieces[player]),
+                sorted(p.value for p in game_state.hand_pieces[player])
+            )
+        self.assertEqual(converted.current_player, game_state.current_player)
+        self.assertEqual(converted.turn, game_state.turn)
+        self.assertEqual(converted.game_result, game_state.game_result)
+        self.assertEqual(converted.history, game_state.history)
+        self.assertEqual(converted.maguro_in_enemy_territory, game_state.maguro_in_enemy_territory)
+
+    def test_round_trip_initial_state(self):
+        """初期状態の相互変換"""
+        game_state = initialize_game()
+        bitboard_state = from_game_state(game_state)
+        self.assert_same_state(game_state, bitboard_state)
+        self.assertEqual(get_bitboard_hash(bitboard_state), game_state.history[0])
+
+    def test_move_conversion(self):
+        """手の相互変換"""
+        for move_str in ('い↑B3B2', 'い*A3', 'ま↓B1A2'):
+            move = parse_move(move_str)
+            self.assertEqual(bitboard_to_move(move_to_bitboard(move)), move)
+
+    def test_matches_make_move_on_random_games(self):
+        """ランダムな対局で make_move / validate_move と結果が一致する"""
+        rng = random.Random(1234)
+        candidates = all_candidate_moves()
+        for _ in range(30):
+            game_state = initialize_game()
+            bitboard_state = from_game_state(game_state)
+            for _ in range(80):
+                legal = []
+                for move in candidates:
+                    expected = validate_move(game_state, move)
+                    self.assertEqual(validate_bitboard_move(bitboard_state, move), expected)
+                    if expected is None:
+                        legal.append(move)
+
+                self.assertEqual(
+                    sorted(bitboard_state.generate_moves()),
+                    sorted(move_to_bitboard(m) for m in legal)
+                )
+                if not legal:
+                    break
+
+                move = rng.choice(legal)
+                game_state, error = make_move(game_state, move)
+                self.assertIsNone(error)
+                bitboard_state, error = make_bitboard_move(bitboard_state, move)
+                self.assertIsNone(error)
+                self.assert_same_state(game_state, bitboard_state)
+
+    def test_unplay_restores_state(self):
+        """play/unplay で元の状態に戻る"""
+        bitboard_state = from_game_state(initialize_game())
+        before = to_game_state(bitboard_state)
+        undo = bitboard_state.play(move_to_bitboard(parse_move('い↑B3B2')))
+        bitboard_state.unplay(undo)
+        self.assert_same_state(before, bitboard_state)
+        self.assertEqual(bitboard_state.counts, {bitboard_state.history[0]: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import subprocess
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import board_game_logic
+import board_game_instrumentation as instrumentation
+from board_game_logic import initialize_game, make_move, parse_move
+
+
+class TestInstrumentation(unittest.TestCase):
+    """処理時間計測のテスト"""
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_counts_stages(self):
+        """make_move の各段階の呼び出し回数を数える"""
+        original = board_game_logic.validate_move
+        state = initialize_game()
+        instrumentation.enable()
+        self.assertTrue(instrumentation.is_enabled())
+        for move_str in ["い↑B3B2", "か↓A1A2", "ま↑B4A3"]:
+            state, error = make_move(state, parse_move(move_str))
+            self.assertIsNone(error)
+
+        stats = instrumentation.snapshot()
+        for stage in ('validate_move', 'copy', 'board_mutation', 'update_maguro_status',
+                      'check_maguro_victory', 'check_for_draw', 'get_board_hash'):
+            self.assertEqual(stats[stage].calls, 3, stage)
+        self.assertTrue(all(stage_stats.seconds >= 0 for stage_stats in stats.values()))
+        self.assertIn('board_mutation', instrumentation.format_report())
+        self.assertIn('"check_for_draw"', instrumentation.report_json())
+
+        # 無効にすると元の関数に戻り、計測されなくなる
+        instrumentation.disable()
+        self.assertIs(board_game_logic.validate_move, original)
+        make_move(state, parse_move("か↓A2A3"))
+        self.assertEqual(instrumentation.snapshot()['validate_move'].calls, 3)
+
+    def test_merge_and_reset(self):
+        """別の計測結果の足し合わせと消去"""
+        instrumentation.merge({'copy': instrumentation.StageStats(calls=2, seconds=0.5)})
+        self.assertEqual(instrumentation.snapshot()['copy'].calls, 2)
+        self.assertAlmostEqual(instrumentation.snapshot()['copy'].seconds, 0.5)
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot()['copy'].calls, 0)
+
+    def test_environment_variable(self):
+        """環境変数で有効にできる"""
+        src = str(Path(__file__).parent.parent / "src")
+        for imports in ("board_game_logic, board_game_instrumentation as i",
+                        "board_game_instrumentation as i, board_game_logic"):
+            code = f"import {imports}; print(i.is_enabled())"
+            for value, expected in (('1', 'True'), ('0', 'False')):
+                env = dict(os.environ, FISH_WAR_INSTRUMENT=value, PYTHONPATH=src)
+                output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+                self.assertEqual(output.stdout.strip(), expected)
+
+    def test_worker_task_enables_instrumentation(self):
+        """一括検証のタスクで計測を指定すると、有効にしていないワーカー（spawn で起動した場合）でも計測する"""
+        from batch_game import _replay_chunk
+        self.assertFalse(instrumentation.is_enabled())
+        count, _, stats = _replay_chunk(([(1, "い↑B3B2 か↓A1A2")], True))
+        self.assertEqual(count, 1)
+        self.assertEqual(stats['validate_move'].calls, 2)
+        self.assertIsNone(_replay_chunk(([(1, "い↑B3B2")], False))[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,20 @@
+import random
 import unittest
 import sys
+from collections import Counter
 from pathlib import Path
 
 # srcディレクトリをPythonパスに追加
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from board_game_types import PieceType, Position
+from board_game_types import PieceType, Position, Move
 from board_game_logic import (
-    initialize_game, parse_move, make_move
+    initialize_game, parse_move, make_move, validate_move,
+    get_possible_moves, generate_legal_moves, get_position_counts,
+    format_move, get_position_text, parse_position_text,
+    get_piece_locations, find_maguro, check_for_draw, get_board_hash
 )
+from board_game_session import GameSession
 
 
 class TestBoardGameLogic(unittest.TestCase):
@@ -130,4 +136,143 @@ class TestBoardGameLogic(unittest.TestCase):
         move = parse_move('ま↑B4B3')
         new_state, error = make_move(self.game_state, move)
         # B3には先手のいなだがいるので移動できない
-        self.assertEqual(error, "自分のコマがある位置には移動できません")
\ No newline at end of file
+        self.assertEqual(error, "自分のコマがある位置には移動できません")
+    
+    def test_get_possible_moves(self):
+        """移動可能位置の計算のテスト"""
+        # 先手のいなだは前（上）のみ
+        self.assertEqual(get_possible_moves(PieceType.INADA, Position('B', 3), 'first'), [Position('B', 2)])
+        # 後手のいなだは下へ進む
+        self.assertEqual(get_possible_moves(PieceType.INADA, Position('B', 2), 'second'), [Position('B', 3)])
+        # 盤外には移動できない
+        self.assertEqual(len(get_possible_moves(PieceType.MAGURO, Position('A', 1), 'first')), 3)
+    
+    def test_generate_legal_moves_initial(self):
+        """初期局面の合法手列挙のテスト"""
+        moves = generate_legal_moves(self.game_state)
+        for move in moves:
+            self.assertIsNone(validate_move(self.game_state, move))
+        self.assertIn(parse_move('い↑B3B2'), moves)
+        self.assertNotIn(parse_move('ま↑B4B3'), moves)
+    
+    def test_generate_legal_moves_matches_validate_move(self):
+        """ランダム対局で合法手列挙が validate_move と一致するテスト"""
+        positions = [Position(col, row) for row in range(1, 5) for col in 'ABC']
+        candidates = []
+        for piece_type in PieceType:
+            for to_position in positions:
+                candidates.append(Move(piece_type, None, to_position, True))
+                for from_position in positions:
+                    candidates.append(Move(piece_type, from_position, to_position, False))
+        
+        rng = random.Random(7)
+        for _ in range(20):
+            game_state = initialize_game()
+            for _ in range(60):
+                expected = [m for m in candidates if validate_move(game_state, m) is None]
+                moves = generate_legal_moves(game_state)
+                self.assertEqual(sorted(map(repr, moves)), sorted(map(repr, expected)))
+                if not moves:
+                    break
+                game_state, error = make_move(game_state, rng.choice(moves))
+                self.assertIsNone(error)
+    
+    def test_threefold_repetition_draw(self):
+        """同じ盤面が3回出現したら引き分けになるテスト"""
+        shuffle = ['ま↑B4A3', 'ま↓B1A2', 'ま↓A3B4', 'ま↑A2B1']
+        game_state = self.game_state
+        for i, move_str in enumerate(shuffle * 2):
+            game_state, error = make_move(game_state, parse_move(move_str))
+            self.assertIsNone(error)
+            if i < 7:
+                self.assertIsNone(game_state.game_result)
+        
+        self.assertEqual(game_state.game_result, 'draw')
+        self.assertEqual(get_position_counts(game_state)[game_state.history[0]], 3)
+    
+    def test_draw_without_position_counts(self):
+        """出現回数を持たない状態では、履歴全体から3回出現した盤面を探すテスト"""
+        game_state = initialize_game()
+        repeated = get_board_hash(game_state.board)
+        game_state.history = [repeated, 'a', repeated, 'b', repeated, 'c']
+        self.assertIsNone(game_state.position_counts)
+        self.assertTrue(check_for_draw(game_state))
+        game_state.history = [repeated, 'a', repeated, 'b']
+        self.assertFalse(check_for_draw(game_state))
+    
+    def test_position_counts_follow_history(self):
+        """出現回数が履歴と一致し、undo で元に戻るテスト"""
+        session = GameSession()
+        rng = random.Random(11)
+        snapshots = []
+        while session.state.game_result is None and session.state.turn < 60:
+            moves = generate_legal_moves(session.state)
+            if not moves:
+                break
+            snapshots.append(dict(get_position_counts(session.state)))
+            self.assertIsNone(session.apply(rng.choice(moves)))
+            self.assertEqual(get_position_counts(session.state), Counter(session.state.history))
+        
+        while snapshots:
+            session.undo()
+            self.assertEqual(dict(get_position_counts(session.state)), snapshots.pop())
+    
+    def test_piece_locations_follow_board(self):
+        """コマの位置の索引が着手（捕獲・出世・配置を含む）と undo で盤面と一致するテスト"""
+        def scan(board):
+            return {
+                (piece.type, piece.player, row * 3 + col)
+                for row, cells in enumerate(board) for col, piece in enumerate(cells) if piece
+            }
+        
+        def indexed(game_state):
+            return {
+                (piece.type, piece.player, square)
+                for piece, squares in get_piece_locations(game_state).items() for square in squares
+            }
+        
+        self.assertEqual(find_maguro(self.game_state, 'first'), 10)
+        self.assertEqual(find_maguro(self.game_state, 'second'), 1)
+        for seed in range(20):
+            rng = random.Random(seed)
+            game_state = initialize_game()
+            session = GameSession(initialize_game())
+            while game_state.game_result is None and game_state.turn < 80:
+                move = rng.choice(generate_legal_moves(game_state))
+                previous = game_state
+                game_state, _ = make_move(game_state, move)
+                self.assertEqual(indexed(game_state), scan(game_state.board))
+                # コピー元の索引は変わらない
+                self.assertEqual(indexed(previous), scan(previous.board))
+                session.apply(move)
+            
+            while session.undo():
+                self.assertEqual(indexed(session.state), scan(session.state.board))
+        
+        # まぐろを捕獲すると盤上からなくなる
+        game_state = initialize_game()
+        for move_str in ["ま↑B4A3", "か↓A1A2", "ま↓A3B4", "ま↓B1C2", "か↑C4C3", "ま↓C2B3", "ま↑B4B3"]:
+            game_state, _ = make_move(game_state, parse_move(move_str))
+        self.assertEqual(game_state.game_result, 'first')
+        self.assertIsNone(find_maguro(game_state, 'second'))
+    
+    def test_format_move(self):
+        """手の文字列化のテスト"""
+        for move_str in ('い↑B3B2', 'ま↓B1B2', 'た→A3B3', 'か←C4B4', 'い*A3'):
+            self.assertEqual(format_move(parse_move(move_str)), move_str)
+    
+    def test_position_text_round_trip(self):
+        """局面文字列の相互変換のテスト"""
+        game_state = self.game_state
+        for move_str in ('い↑B3B2', 'た↓C1B2', 'い*A3'):
+            game_state, error = make_move(game_state, parse_move(move_str))
+            self.assertIsNone(error)
+        
+        text = get_position_text(game_state)
+        parsed = parse_position_text(text)
+        self.assertEqual(parsed.board, game_state.board)
+        self.assertEqual(parsed.hand_pieces, game_state.hand_pieces)
+        self.assertEqual(parsed.current_player, game_state.current_player)
+        self.assertEqual(parsed.turn, game_state.turn)
+        self.assertEqual(get_position_text(parsed), text)
+        self.assertIsNone(parse_position_text('invalid'))
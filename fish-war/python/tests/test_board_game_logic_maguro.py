@@ -7,7 +7,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from board_game_types import PieceType, Position, Piece, GameState
 from board_game_logic import (
-    initialize_game, parse_move, make_move, check_maguro_victory
+    initialize_game, parse_move, make_move, apply_move, check_maguro_victory, update_maguro_status,
+    find_maguro, get_piece_locations, _build_piece_locations
 )
 
 
@@ -251,4 +252,41 @@ class TestMaguroVictory(unittest.TestCase):
         self.assertIsNone(error)
         
         # まぐろ捕獲で後手の勝利
-        self.assertEqual(new_state.game_result, 'second')
\ No newline at end of file
+        self.assertEqual(new_state.game_result, 'second')
+
+    def test_victory_after_editing_board_directly(self):
+        """盤面を直接変更して clear_caches() を呼べば、まぐろの位置と勝利を盤面どおりに判定する"""
+        def move_first_maguro_to_enemy_row(state):
+            # 先手のまぐろをB4から後手のまぐろのいるB1へ直接置き換える
+            state.board[0][1] = state.board[3][1]
+            state.board[3][1] = None
+            state.clear_caches()
+            update_maguro_status(state)
+        
+        # make_move に渡した状態（索引を持たない）
+        state = initialize_game()
+        make_move(state, parse_move('い↑B3B2'))
+        move_first_maguro_to_enemy_row(state)
+        self.assertTrue(state.maguro_in_enemy_territory['first'])
+        self.assertEqual(check_maguro_victory(state), 'first')
+        
+        # make_move の結果（コマの位置の索引を持つ状態）
+        state = initialize_game()
+        for move_str in ('い↑B3B2', 'か↓A1A2'):
+            state, error = make_move(state, parse_move(move_str))
+            self.assertIsNone(error)
+        self.assertIsNotNone(state.piece_locations)
+        move_first_maguro_to_enemy_row(state)
+        self.assertIsNone(state.piece_locations)
+        self.assertEqual(find_maguro(state, 'first'), 1)
+        self.assertEqual(check_maguro_victory(state), 'first')
+        
+        # まぐろを直接取り除けば勝ちにならない
+        state.board[0][1] = None
+        state.clear_caches()
+        self.assertIsNone(find_maguro(state, 'first'))
+        self.assertIsNone(check_maguro_victory(state))
+        
+        # apply_move は索引を作り直して差分更新を続ける
+        self.assertIsNone(apply_move(state, parse_move('い↑B2B1'))[1])
+        self.assertEqual(get_piece_locations(state), _build_piece_locations(state.board))
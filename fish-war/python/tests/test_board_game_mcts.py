@@ -0,0 +1,70 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Piece, Position, GameState
+from board_game_logic import initialize_game, validate_move
+from board_game_bitboard import from_game_state
+from board_game_mcts import MCTSPlayer, random_playout
+
+
+class TestMCTS(unittest.TestCase):
+    """モンテカルロ木探索のテスト"""
+
+    def test_reproducible_with_seed(self):
+        """同じシードなら同じ結果になる"""
+        first = MCTSPlayer(iterations=300, seed=5).search(initialize_game())
+        second = MCTSPlayer(iterations=300, seed=5).search(initialize_game())
+        self.assertEqual(first.move_stats, second.move_stats)
+        self.assertEqual(sum(visits for _, visits, _ in first.move_stats), 300)
+        self.assertIsNone(validate_move(initialize_game(), first.best_move))
+
+    def test_parallel_search_is_reproducible(self):
+        """ワーカー数を固定すれば並列でも結果が再現する"""
+        with MCTSPlayer(iterations=400, seed=3, workers=2) as player:
+            first = player.search(initialize_game())
+            second = player.search(initialize_game())
+        self.assertEqual(first.move_stats, second.move_stats)
+        self.assertEqual(sum(visits for _, visits, _ in first.move_stats), 400)
+
+    def test_prefers_maguro_capture(self):
+        """まぐろを捕獲できる局面では捕獲を選ぶ"""
+        board = [[None for _ in range(3)] for _ in range(4)]
+        board[2][1] = Piece(PieceType.MAGURO, 'first')
+        board[1][2] = Piece(PieceType.MAGURO, 'second')
+        board[3][0] = Piece(PieceType.TAKO, 'first')
+        board[0][0] = Piece(PieceType.KAREI, 'second')
+        state = GameState(
+            board=board,
+            hand_pieces={'first': [], 'second': []},
+            current_player='first',
+            turn=1,
+            game_result=None,
+            history=[],
+            maguro_in_enemy_territory={'first': False, 'second': False}
+        )
+        result = MCTSPlayer(iterations=200, seed=0).search(state)
+        self.assertEqual(result.best_move.to_position, Position('C', 2))
+
+    def test_random_playout_ends_game(self):
+        """プレイアウトは決着するか手数上限で打ち切る"""
+        rng = random.Random(0)
+        for _ in range(50):
+            state = from_game_state(initialize_game())
+            result = random_playout(state, rng, max_plies=300)
+            self.assertEqual(result, state.result)
+            self.assertIn(result, ('first', 'second', 'draw', None))
+
+    def test_finished_game_has_no_move(self):
+        """終局済みの局面では手を返さない"""
+        state = initialize_game()
+        state.game_result = 'first'
+        self.assertIsNone(MCTSPlayer(iterations=10).search(state).best_move)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import re
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Position, Move
+from board_game_logic import initialize_game, parse_move, format_move, generate_legal_moves
+from board_game_move_codec import (
+    MOVES, NUM_MOVE_CODES, encode_move, decode_move, parse_move_code, format_move_code
+)
+
+
+def regex_parse_move(move_str):
+    """正規表現による従来の解析（比較用）"""
+    placement_match = re.match(r'^([まいぶたか])\*([ABC])([1-4])$', move_str)
+    if placement_match:
+        piece_char, col, row = placement_match.groups()
+        return Move(PieceType(piece_char), None, Position(col, int(row)), True)
+    move_match = re.match(r'^([まいぶたか])[↑↓→←]([ABC])([1-4])([ABC])([1-4])$', move_str)
+    if move_match:
+        piece_char, from_col, from_row, to_col, to_row = move_match.groups()
+        return Move(PieceType(piece_char), Position(from_col, int(from_row)), Position(to_col, int(to_row)), False)
+    return None
+
+
+class TestMoveCodec(unittest.TestCase):
+    """手の符号化のテスト"""
+
+    def test_codes_round_trip(self):
+        """全コードで Move・文字列との相互変換が一致する"""
+        self.assertEqual(len(MOVES), NUM_MOVE_CODES)
+        self.assertEqual(len(set(MOVES)), NUM_MOVE_CODES)
+        for code in range(NUM_MOVE_CODES):
+            self.assertEqual(encode_move(decode_move(code)), code)
+            self.assertEqual(parse_move_code(format_move_code(code)), code)
+
+    def test_matches_regex_parser(self):
+        """受理する文字列と解析結果が正規表現版と一致する"""
+        pieces = 'まいぶたかx'
+        squares = [c + r for c in 'ABCD' for r in '01245']
+        candidates = [p + '*' + s for p in pieces for s in squares]
+        candidates += [p + a + f + t for p in pieces for a in '↑↓→←*' for f in squares for t in squares]
+        candidates += ['', 'い', 'い↑B3B2\n', 'い↑B3B2\n\n', 'い*B2\n', ' い*B2', 'い↑B3B2 ']
+        for text in candidates:
+            self.assertEqual(parse_move(text), regex_parse_move(text), text)
+
+    def test_shared_instances(self):
+        """解析・合法手列挙の結果は共有のMoveで、変更できない"""
+        self.assertIs(parse_move('い↑B3B2'), parse_move('い↓B3B2'))
+        self.assertIn(parse_move('い↑B3B2'), generate_legal_moves(initialize_game()))
+        self.assertTrue(all(any(m is shared for shared in MOVES) for m in generate_legal_moves(initialize_game())))
+        with self.assertRaises(AttributeError):
+            parse_move('い*B2').is_placement = False
+
+    def test_format_move(self):
+        """方向記号は移動の向きから決まる"""
+        self.assertEqual(format_move(parse_move('い←B3B2')), 'い↑B3B2')
+        self.assertEqual(format_move(Move(PieceType.MAGURO, Position('A', 1), Position('B', 1), False)), 'ま→A1B1')
+
+
+if __name__ == "__main__":
+    unittest.main()
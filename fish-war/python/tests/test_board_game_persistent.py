@@ -0,0 +1,103 @@
+import pickle
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, parse_move, generate_legal_moves, get_position_text
+from board_game_persistent import PersistentHistory, freeze_game_state, thaw_game_state
+
+
+def assert_same_state(test, mutable, persistent):
+    """変更可能な状態と永続状態が同じ局面を表すことを確認"""
+    thawed = thaw_game_state(persistent)
+    test.assertEqual(thawed.board, mutable.board)
+    test.assertEqual(thawed.hand_pieces, mutable.hand_pieces)
+    test.assertEqual(thawed.current_player, mutable.current_player)
+    test.assertEqual(thawed.turn, mutable.turn)
+    test.assertEqual(thawed.game_result, mutable.game_result)
+    test.assertEqual(thawed.history, mutable.history)
+    test.assertEqual(thawed.maguro_in_enemy_territory, mutable.maguro_in_enemy_territory)
+    test.assertEqual(persistent.zobrist_key, mutable.zobrist_key)
+
+
+class TestPersistentState(unittest.TestCase):
+    """永続ゲーム状態のテスト"""
+
+    def test_matches_mutable_state(self):
+        """ランダム対局の各手で通常の状態と同じ結果になる"""
+        rng = random.Random(3)
+        for _ in range(40):
+            mutable = initialize_game()
+            persistent = freeze_game_state(mutable)
+            while mutable.game_result is None and mutable.turn < 300:
+                move = rng.choice(generate_legal_moves(mutable))
+                self.assertEqual(generate_legal_moves(persistent), generate_legal_moves(mutable))
+                mutable, error = make_move(mutable, move)
+                self.assertIsNone(error)
+                persistent, error = make_move(persistent, move)
+                self.assertIsNone(error)
+                assert_same_state(self, mutable, persistent)
+
+    def test_threefold_repetition_draw(self):
+        """同じ盤面が3回出現したら引き分けになる"""
+        shuffle = ['ま↑B4A3', 'ま↓B1A2', 'ま↓A3B4', 'ま↑A2B1']
+        mutable = initialize_game()
+        persistent = freeze_game_state(mutable)
+        for move_str in shuffle * 2:
+            mutable, _ = make_move(mutable, parse_move(move_str))
+            persistent, _ = make_move(persistent, parse_move(move_str))
+            assert_same_state(self, mutable, persistent)
+        self.assertEqual(persistent.game_result, 'draw')
+        self.assertEqual(persistent.history.count(persistent.history[-1]), 3)
+
+    def test_branches_share_and_do_not_interfere(self):
+        """同じ状態から分岐しても元の状態と他の分岐は変わらず、変更のない行は共有される"""
+        root = freeze_game_state(initialize_game())
+        before = get_position_text(root)
+        left, _ = make_move(root, parse_move("か↑C4C3"))
+        right, _ = make_move(root, parse_move("ま↑B4A3"))
+        self.assertEqual(get_position_text(root), before)
+        self.assertIsNot(left.board[2], root.board[2])
+        self.assertIs(left.board[0], root.board[0])
+        self.assertIs(left.board[1], root.board[1])
+        self.assertIs(right.board[0], root.board[0])
+        self.assertIs(left.history._parent, root.history)
+        self.assertIs(right.history._parent, root.history)
+        self.assertIs(root.copy(), root)
+
+        left_again, _ = make_move(left, parse_move("か↓A1A2"))
+        self.assertEqual(len(left_again.history), len(root.history) + 2)
+        self.assertEqual(len(right.history), len(root.history) + 1)
+        self.assertNotEqual(right.board, left.board)
+
+    def test_invalid_move_returns_same_state(self):
+        """不正な手では同じ状態とエラーを返す"""
+        root = freeze_game_state(initialize_game())
+        state, error = make_move(root, parse_move("い↓B1B2"))
+        self.assertIs(state, root)
+        self.assertIsNotNone(error)
+
+    def test_history_counts_and_pickle(self):
+        """履歴の出現回数と、別プロセスへ渡すための pickle"""
+        history = PersistentHistory.from_iterable(['a', 'b', 'a', 'c', 'a'])
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[-1], 'a')
+        self.assertEqual(history[1], 'b')
+        self.assertEqual(list(history), ['a', 'b', 'a', 'c', 'a'])
+        self.assertEqual((history.count('a'), history.count('b'), history.count('x')), (3, 1, 0))
+        self.assertEqual(history, ['a', 'b', 'a', 'c', 'a'])
+
+        restored = pickle.loads(pickle.dumps(history))
+        self.assertEqual(restored, history)
+        self.assertEqual(restored.count('a'), 3)
+
+        state = freeze_game_state(initialize_game())
+        self.assertEqual(pickle.loads(pickle.dumps(state)), state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, generate_legal_moves
+from board_game_position_index import PositionIndex, PositionStats, game_positions
+
+
+def random_games(seed, count, max_plies=30):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        state = initialize_game()
+        moves = []
+        while state.game_result is None and len(moves) < max_plies:
+            move = rng.choice(generate_legal_moves(state))
+            moves.append(move)
+            state, _ = make_move(state, move)
+        games.append(moves)
+    return games
+
+
+def expected_occurrences(games, key):
+    """全対局を再生して局面を探す（比較用）"""
+    found = []
+    for game_id, moves in enumerate(games):
+        keys, _ = game_positions(moves)
+        found.extend((game_id, ply) for ply, position_key in enumerate(keys) if position_key == key)
+    return found
+
+
+class TestPositionIndex(unittest.TestCase):
+    """局面索引のテスト"""
+
+    def test_lookup_matches_replay(self):
+        """索引の検索結果が全対局の再生と一致する（セグメント分割・まとめ後も）"""
+        games = random_games(0, 40)
+        with tempfile.TemporaryDirectory() as tmp:
+            with PositionIndex(tmp) as index:
+                index.add_games(games[:25], run_size=200)
+                index.add_games(games[25:], run_size=200)
+                self.assertEqual(index.games, 40)
+                self.assertGreater(index.segment_count, 2)
+                before = {}
+                probe_keys = {key for moves in games[:10] for key in game_positions(moves)[0]}
+                for key in probe_keys:
+                    occurrences = index.occurrences(key)
+                    self.assertEqual(occurrences, expected_occurrences(games, key))
+                    before[key] = index.lookup(key)
+                index.compact()
+                self.assertEqual(index.segment_count, 1)
+
+            # 開き直しても同じ結果になる
+            with PositionIndex(tmp) as index:
+                for key, stats in before.items():
+                    self.assertEqual(index.lookup(key), stats)
+                    self.assertEqual(index.occurrences(key), expected_occurrences(games, key))
+
+    def test_outcome_counts(self):
+        """勝敗は対局ごとに1回だけ数える"""
+        games = random_games(1, 30, max_plies=200)
+        with tempfile.TemporaryDirectory() as tmp, PositionIndex(tmp) as index:
+            index.add_games(games)
+            stats = index.lookup(initialize_game())
+            self.assertEqual(stats.games, 30)
+            results = [game_positions(moves)[1] for moves in games]
+            self.assertEqual(stats.first_wins, results.count('first'))
+            self.assertEqual(stats.second_wins, results.count('second'))
+            self.assertEqual(stats.draws, results.count('draw'))
+            self.assertEqual(len(index.occurrences(initialize_game(), limit=5)), 5)
+            self.assertEqual(index.lookup(12345), PositionStats())
+
+
+if __name__ == "__main__":
+    unittest.main()
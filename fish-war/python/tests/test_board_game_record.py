@@ -0,0 +1,85 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, generate_legal_moves, parse_move
+from board_game_move_codec import MOVES
+from board_game_record import (
+    GameRecord, GameRecordWriter, GameRecordFile, encode_moves, decode_moves,
+    iter_records, build_index, index_path, text_to_records, records_to_text
+)
+
+
+def random_game(rng, max_plies=60):
+    state = initialize_game()
+    moves = []
+    while state.game_result is None and len(moves) < max_plies:
+        move = rng.choice(generate_legal_moves(state))
+        moves.append(move)
+        state, _ = make_move(state, move)
+    return GameRecord(moves, state.game_result, f"game {len(moves)}")
+
+
+class TestGameRecord(unittest.TestCase):
+    """バイナリ棋譜形式のテスト"""
+
+    def test_encode_moves(self):
+        """指しうる手は1バイト、それ以外も含め全ての手が復元できる"""
+        self.assertEqual(decode_moves(encode_moves(MOVES)), MOVES)
+        rng = random.Random(0)
+        for _ in range(20):
+            record = random_game(rng)
+            self.assertEqual(len(encode_moves(record.moves)), len(record.moves))
+        self.assertEqual(len(encode_moves([parse_move('ま↑A1C4')])), 3)
+
+    def test_write_and_read(self):
+        """書き出した対局を順読み・番号指定で読める"""
+        rng = random.Random(1)
+        records = [random_game(rng) for _ in range(30)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'games.fwr')
+            with GameRecordWriter(path) as writer:
+                for game_id, record in enumerate(records):
+                    self.assertEqual(writer.write(record), game_id)
+
+            self.assertEqual(list(iter_records(path)), records)
+            with GameRecordFile(path) as games:
+                self.assertEqual(len(games), 30)
+                self.assertEqual(games[17], records[17])
+                self.assertEqual(list(games), records)
+                with self.assertRaises(IndexError):
+                    games[30]
+
+            # 索引がなければ作り直す
+            os.remove(index_path(path))
+            with GameRecordFile(path) as games:
+                self.assertEqual(games[29], records[29])
+            self.assertEqual(build_index(path), 30)
+
+    def test_text_conversion(self):
+        """1行1局の棋譜との相互変換"""
+        lines = [
+            "い↑B3B2 か↓A1A2\n",
+            "\n",
+            "ま↑B4A3 か↓A1A2 ま↓A3B4 ま↓B1C2 か↑C4C3 ま↓C2B3 ま↑B4B3\n",
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'games.fwr')
+            self.assertEqual(text_to_records(lines, path), 2)
+            output = io.StringIO()
+            self.assertEqual(records_to_text(path, output), 2)
+            self.assertEqual(output.getvalue(), lines[0] + lines[2])
+            self.assertEqual([record.result for record in iter_records(path)], [None, 'first'])
+            with self.assertRaises(ValueError):
+                text_to_records(["い↑B3B2 xx"], path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, parse_move, generate_legal_moves, get_position_text
+from board_game_persistent import thaw_game_state
+from board_game_replay import ReplayCursor
+
+
+def random_game(seed, max_plies=150):
+    """シード付きランダム対局の手と各手数の局面（初期局面を含む）"""
+    rng = random.Random(seed)
+    game_state = initialize_game()
+    moves, states = [], [game_state]
+    while game_state.game_result is None and len(moves) < max_plies:
+        move = rng.choice(generate_legal_moves(game_state))
+        game_state, _ = make_move(game_state, move)
+        moves.append(move)
+        states.append(game_state)
+    return moves, states
+
+
+class TestReplayCursor(unittest.TestCase):
+    """再生カーソルのテスト"""
+
+    def assert_state(self, cursor, expected):
+        state = thaw_game_state(cursor.state)
+        self.assertEqual(get_position_text(state), get_position_text(expected))
+        self.assertEqual(state.history, expected.history)
+        self.assertEqual(state.game_result, expected.game_result)
+        self.assertEqual(state.maguro_in_enemy_territory, expected.maguro_in_enemy_territory)
+
+    def test_seek_matches_replay(self):
+        """任意の手数への移動が最初からの再生と一致する（間隔によらない）"""
+        moves, states = random_game(1)
+        rng = random.Random(2)
+        for interval in (1, 5, 32, 1000):
+            cursor = ReplayCursor(moves, checkpoint_interval=interval)
+            self.assertEqual(len(cursor), len(moves))
+            self.assertEqual(cursor.checkpoint_count, len(moves) // interval + 1)
+            for ply in [len(moves), 0] + [rng.randint(0, len(moves)) for _ in range(30)]:
+                cursor.seek(ply)
+                self.assertEqual(cursor.ply, ply)
+                self.assert_state(cursor, states[ply])
+
+    def test_step_and_undo_redo(self):
+        """1手ずつの前後移動と取り消し・やり直し"""
+        moves, states = random_game(3)
+        cursor = ReplayCursor(moves, checkpoint_interval=4)
+        self.assertIsNone(cursor.back())
+        self.assertIsNone(cursor.undo())
+        for ply in range(1, len(moves) + 1):
+            cursor.forward()
+            self.assert_state(cursor, states[ply])
+        self.assertIsNone(cursor.forward())
+        self.assertIsNone(cursor.redo())
+        for ply in range(len(moves) - 1, -1, -1):
+            self.assertIs(cursor.undo(), moves[ply])
+            self.assert_state(cursor, states[ply])
+        self.assertIs(cursor.redo(), moves[0])
+        self.assert_state(cursor, states[1])
+        with self.assertRaises(IndexError):
+            cursor.seek(len(moves) + 1)
+
+    def test_play_replaces_following_moves(self):
+        """途中の局面で別の手を指すと、それ以降の手が置き換わる"""
+        moves = [parse_move(m) for m in ["ま↑B4A3", "か↓A1A2", "ま↓A3B4", "ま↓B1C2", "か↑C4C3", "ま↓C2B3", "ま↑B4B3"]]
+        cursor = ReplayCursor(moves, checkpoint_interval=2)
+        cursor.seek(7)
+        self.assertEqual(cursor.state.game_result, 'first')
+        cursor.seek(3)
+        self.assertIsNone(cursor.play(moves[3]))
+        self.assertEqual((cursor.ply, len(cursor)), (4, 7))
+        cursor.seek(2)
+        self.assertIsNotNone(cursor.play(parse_move("い↓B1B2")))
+        self.assertIsNone(cursor.play(parse_move("か↑C4C3")))
+        self.assertEqual((cursor.ply, len(cursor)), (3, 3))
+        self.assertEqual(cursor.checkpoint_count, 2)
+
+        expected = initialize_game()
+        for move in cursor.moves:
+            expected, _ = make_move(expected, move)
+        self.assert_state(cursor, expected)
+        cursor.seek(0)
+        cursor.seek(3)
+        self.assert_state(cursor, expected)
+
+    def test_illegal_move_truncates(self):
+        """不正な手があればその手の前までを扱い、エラーを記録する"""
+        moves = [parse_move(m) for m in ["ま↑B4A3", "か↓A1A2", "い↓B1B2", "ま↓A3B4"]]
+        cursor = ReplayCursor(moves)
+        self.assertEqual(len(cursor), 2)
+        self.assertEqual(cursor.error[0], 3)
+        cursor.seek(2)
+        self.assertEqual(cursor.state.turn, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Piece, Position, GameState
+from board_game_logic import initialize_game, make_move, validate_move
+from board_game_search import (
+    Searcher, TranspositionTable, find_best_move, WIN_SCORE, EXACT
+)
+
+
+def make_state(cells, current_player='first'):
+    """指定したコマだけを置いた局面を作成"""
+    board = [[None for _ in range(3)] for _ in range(4)]
+    for (row, col), piece in cells.items():
+        board[row][col] = piece
+    return GameState(
+        board=board,
+        hand_pieces={'first': [], 'second': []},
+        current_player=current_player,
+        turn=1,
+        game_result=None,
+        history=[],
+        maguro_in_enemy_territory={'first': False, 'second': False}
+    )
+
+
+class TestSearch(unittest.TestCase):
+    """探索エンジンのテスト"""
+
+    def test_captures_maguro_immediately(self):
+        """まぐろを捕獲できるなら即座に捕獲する"""
+        state = make_state({
+            (2, 1): Piece(PieceType.MAGURO, 'first'),
+            (1, 2): Piece(PieceType.MAGURO, 'second'),
+            (3, 0): Piece(PieceType.TAKO, 'first'),
+        })
+        result = find_best_move(state, time_limit=1.0)
+        self.assertEqual(result.best_move.to_position, Position('C', 2))
+        self.assertEqual(result.score, WIN_SCORE - 1)
+        new_state, error = make_move(state, result.best_move)
+        self.assertIsNone(error)
+        self.assertEqual(new_state.game_result, 'first')
+
+    def test_finds_forced_win(self):
+        """完全解析で5手勝ちの局面で勝ちを読み切る"""
+        state = make_state({
+            (3, 1): Piece(PieceType.MAGURO, 'first'),
+            (2, 1): Piece(PieceType.TAKO, 'first'),
+            (0, 1): Piece(PieceType.MAGURO, 'second'),
+        })
+        result = Searcher().search(state, time_limit=5.0)
+        self.assertEqual(result.score, WIN_SCORE - 5)
+        self.assertEqual(result.pv[0], result.best_move)
+
+        # 読み筋はすべて合法手
+        game_state = state
+        for move in result.pv:
+            self.assertIsNone(validate_move(game_state, move))
+            game_state, _ = make_move(game_state, move)
+
+    def test_respects_time_limit(self):
+        """制限時間を守り、探索情報を報告する"""
+        reports = []
+        start = time.perf_counter()
+        result = Searcher().search(initialize_game(), time_limit=0.3, info=reports.append)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertGreater(result.nodes, 0)
+        self.assertGreater(result.nps, 0)
+        self.assertEqual([r.depth for r in reports], list(range(1, result.depth + 1)))
+        self.assertIsNone(validate_move(initialize_game(), result.best_move))
+
+    def test_transposition_table_is_bounded(self):
+        """置換表はサイズを超えず、深い結果を浅い結果で上書きしない"""
+        table = TranspositionTable(size=8)
+        for key in range(100):
+            table.store(key, key % 5, 0, EXACT, None)
+        self.assertEqual(len(table.slots), 8)
+
+        table = TranspositionTable(size=1)
+        table.store(1, 5, 10, EXACT, None)
+        table.store(2, 3, 20, EXACT, None)
+        self.assertIsNotNone(table.probe(1))
+        self.assertIsNone(table.probe(2))
+
+        # 次の探索では古い情報を置き換える
+        table.new_search()
+        table.store(2, 3, 20, EXACT, None)
+        self.assertIsNotNone(table.probe(2))
+
+    def test_no_move_for_finished_game(self):
+        """終局済みの局面では手を返さない"""
+        state = initialize_game()
+        state.game_result = 'draw'
+        self.assertIsNone(find_best_move(state, time_limit=0.1).best_move)
+
+
+if __name__ == "__main__":
+    unittest.main()
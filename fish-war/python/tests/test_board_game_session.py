@@ -0,0 +1,102 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Piece, GameState, Move, Position
+from board_game_logic import initialize_game, parse_move, make_move, validate_move
+from board_game_session import GameSession
+
+
+def random_legal_move(game_state, rng):
+    """validate_move を通る手をランダムに1つ選ぶ"""
+    positions = [Position(col, row) for row in range(1, 5) for col in 'ABC']
+    candidates = []
+    for piece_type in PieceType:
+        for to_position in positions:
+            candidates.append(Move(piece_type, None, to_position, True))
+            for from_position in positions:
+                candidates.append(Move(piece_type, from_position, to_position, False))
+    legal = [m for m in candidates if validate_move(game_state, m) is None]
+    return rng.choice(legal) if legal else None
+
+
+class TestGameSession(unittest.TestCase):
+    """取り消し可能なゲームセッションのテスト"""
+
+    def test_apply_matches_make_move(self):
+        """apply の結果が make_move と一致する"""
+        session = GameSession()
+        expected = initialize_game()
+        for move_str in ('い↑B3B2', 'ま↓B1B2', 'ま↑B4B3', 'ま↓B2B3'):
+            move = parse_move(move_str)
+            expected, error = make_move(expected, move)
+            self.assertIsNone(error)
+            self.assertIsNone(session.apply(move))
+            self.assertEqual(session.state, expected)
+        self.assertEqual(session.state.game_result, 'second')
+
+    def test_invalid_move_keeps_state(self):
+        """不正な手はエラーを返し、スタックにも積まない"""
+        session = GameSession()
+        error = session.apply(parse_move('た←A1A2'))
+        self.assertEqual(error, "相手のコマは動かせません")
+        self.assertEqual(session.state, initialize_game())
+        self.assertFalse(session.can_undo)
+        self.assertIsNone(session.undo())
+
+    def test_undo_restores_every_ply(self):
+        """ランダムな対局を最後まで進めて全手を取り消すと各局面に戻る"""
+        rng = random.Random(42)
+        for _ in range(20):
+            session = GameSession()
+            snapshots = [session.state.copy()]
+            while session.state.game_result is None and len(snapshots) < 60:
+                move = random_legal_move(session.state, rng)
+                if move is None:
+                    break
+                self.assertIsNone(session.apply(move))
+                snapshots.append(session.state.copy())
+
+            snapshots.pop()
+            while snapshots:
+                session.undo()
+                self.assertEqual(session.state, snapshots.pop())
+            self.assertFalse(session.can_undo)
+
+    def test_undo_restores_hand_order_and_promotion(self):
+        """手ゴマの並び順と出世が元に戻る"""
+        board = [[None for _ in range(3)] for _ in range(4)]
+        board[0][0] = Piece(PieceType.MAGURO, 'second')
+        board[0][1] = Piece(PieceType.BURI, 'second')
+        board[1][1] = Piece(PieceType.INADA, 'first')
+        board[3][2] = Piece(PieceType.MAGURO, 'first')
+        state = GameState(
+            board=board,
+            hand_pieces={'first': [PieceType.TAKO, PieceType.KAREI, PieceType.TAKO], 'second': []},
+            current_player='first',
+            turn=5,
+            game_result=None,
+            history=[],
+            maguro_in_enemy_territory={'first': False, 'second': False}
+        )
+        session = GameSession(state.copy())
+
+        self.assertIsNone(session.apply(parse_move('い↑B2B1')))
+        self.assertEqual(session.state.board[0][1], Piece(PieceType.BURI, 'first'))
+        self.assertEqual(session.state.hand_pieces['first'][-1], PieceType.INADA)
+        self.assertIsNone(session.apply(parse_move('ま↓A1A2')))
+        self.assertIsNone(session.apply(parse_move('か*C2')))
+        self.assertEqual(session.state.hand_pieces['first'],
+                         [PieceType.TAKO, PieceType.TAKO, PieceType.INADA])
+
+        for _ in range(3):
+            session.undo()
+        self.assertEqual(session.state, state)
+
+
+if __name__ == "__main__":
+    unittest.main()
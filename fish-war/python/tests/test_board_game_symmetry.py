@@ -0,0 +1,101 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import (
+    initialize_game, make_move, parse_move, generate_legal_moves, get_position_text, parse_position_text
+)
+from board_game_persistent import PersistentGameState, freeze_game_state
+from board_game_symmetry import (
+    Symmetry, transform_state, transform_move, inverse_transform_move, canonical_key, canonicalize
+)
+
+
+def random_states(seed, count=60):
+    """シード付きランダム対局の途中局面"""
+    rng = random.Random(seed)
+    game_state = initialize_game()
+    states = []
+    while game_state.game_result is None and len(states) < count:
+        states.append(game_state)
+        game_state, _ = make_move(game_state, rng.choice(generate_legal_moves(game_state)))
+    return states
+
+
+class TestSymmetry(unittest.TestCase):
+    """局面の対称性のテスト"""
+
+    def test_transforms_preserve_rules(self):
+        """変換した局面の合法手・着手結果は、元の局面のものを変換したものと一致する"""
+        for seed in range(10):
+            for game_state in random_states(seed):
+                legal_moves = generate_legal_moves(game_state)
+                for symmetry in Symmetry:
+                    transformed = transform_state(game_state, symmetry)
+                    self.assertEqual(
+                        sorted(map(id, (transform_move(move, symmetry) for move in legal_moves))),
+                        sorted(map(id, generate_legal_moves(transformed)))
+                    )
+                    move = legal_moves[0]
+                    expected = transform_state(make_move(game_state, move)[0], symmetry)
+                    actual, error = make_move(transformed, transform_move(move, symmetry))
+                    self.assertIsNone(error)
+                    self.assertEqual(get_position_text(actual), get_position_text(expected))
+                    self.assertEqual(actual.history, expected.history)
+                    self.assertEqual(actual.game_result, expected.game_result)
+                    self.assertEqual(actual.maguro_in_enemy_territory, expected.maguro_in_enemy_territory)
+
+    def test_transforms_are_involutions(self):
+        """どの変換も2回行うと元に戻る"""
+        game_state = random_states(1)[-1]
+        for symmetry in Symmetry:
+            self.assertEqual(transform_state(transform_state(game_state, symmetry), symmetry), game_state)
+            for move in generate_legal_moves(game_state):
+                self.assertIs(inverse_transform_move(transform_move(move, symmetry), symmetry), move)
+
+    def test_flip_swaps_players(self):
+        """180度回転は先手と後手・手ゴマ・勝敗を入れ替える"""
+        game_state = parse_position_text("かsまsたs00いs0000いf00たfまfかf second い - 3")
+        game_state.game_result = 'second'
+        flipped = transform_state(game_state, Symmetry.FLIP)
+        self.assertEqual(get_position_text(flipped), "かsまsたs00いs0000いf00たfまfかf first - い 3")
+        self.assertEqual(flipped.game_result, 'first')
+        self.assertEqual(transform_move(parse_move("い↑B3B2"), Symmetry.FLIP), parse_move("い↓B2B3"))
+        self.assertEqual(transform_move(parse_move("た*A2"), Symmetry.MIRROR), parse_move("た*C2"))
+
+    def test_canonical_form(self):
+        """4通りの変換で移り合う局面は同じ正規形になり、正規形での手を元に戻せる"""
+        for game_state in random_states(4):
+            key = canonical_key(game_state)
+            canonical, symmetry = canonicalize(game_state)
+            self.assertEqual(get_position_text(canonical).rsplit(' ', 1)[0], key)
+            for other in Symmetry:
+                transformed = transform_state(game_state, other)
+                self.assertEqual(canonical_key(transformed), key)
+                self.assertEqual(get_position_text(canonicalize(transformed)[0]), get_position_text(canonical))
+            for move in generate_legal_moves(canonical):
+                self.assertIsNone(make_move(game_state, inverse_transform_move(move, symmetry))[1])
+
+        # 初期局面は180度回転で自分自身に移る
+        initial = initialize_game()
+        flipped = transform_state(initial, Symmetry.FLIP)
+        self.assertEqual(flipped.board, initial.board)
+        self.assertEqual(flipped.current_player, 'second')
+
+    def test_persistent_state(self):
+        """永続状態は永続状態のまま変換する"""
+        game_state = random_states(5)[-1]
+        frozen = freeze_game_state(game_state)
+        canonical, symmetry = canonicalize(frozen)
+        self.assertIsInstance(canonical, PersistentGameState)
+        self.assertEqual(canonical_key(frozen), canonical_key(game_state))
+        self.assertEqual(get_position_text(transform_state(frozen, Symmetry.FLIP)),
+                         get_position_text(transform_state(game_state, Symmetry.FLIP)))
+
+
+if __name__ == '__main__':
+    unittest.main()
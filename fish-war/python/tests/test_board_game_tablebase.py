@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Piece, GameState
+from board_game_logic import initialize_game, parse_move, make_move
+from board_game_bitboard import from_game_state
+from board_game_tablebase import (
+    solve_tablebase, Tablebase, TablebaseResult,
+    encode_position, decode_position, encode_game_state, _successors
+)
+
+
+def make_state(cells, current_player='first'):
+    """指定したコマだけを置いた局面を作成"""
+    board = [[None for _ in range(3)] for _ in range(4)]
+    for (row, col), piece in cells.items():
+        board[row][col] = piece
+    return GameState(
+        board=board,
+        hand_pieces={'first': [], 'second': []},
+        current_player=current_player,
+        turn=1,
+        game_result=None,
+        history=[],
+        maguro_in_enemy_territory={'first': False, 'second': False}
+    )
+
+
+class TestTablebase(unittest.TestCase):
+    """完全解析テーブルのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'endgame.tb')
+        # まぐろ2枚とたこ1枚の小さな終盤（手ゴマのやりとりも含む）
+        self.root = make_state({
+            (3, 1): Piece(PieceType.MAGURO, 'first'),
+            (2, 1): Piece(PieceType.TAKO, 'first'),
+            (0, 1): Piece(PieceType.MAGURO, 'second'),
+        })
+        self.count = solve_tablebase(self.path, roots=[self.root], workers=1, chunk_size=500)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_encode_decode_round_trip(self):
+        """局面キーの相互変換"""
+        game_state, _ = make_move(initialize_game(), parse_move('い↑B3B2'))
+        state = from_game_state(game_state)
+        key = encode_position(state)
+        self.assertEqual(key, encode_game_state(game_state))
+        decoded = decode_position(key)
+        self.assertEqual(decoded.board_key, state.board_key)
+        self.assertEqual(decoded.hands, state.hands)
+        self.assertEqual(decoded.side, state.side)
+
+    def test_probe_simple_positions(self):
+        """単純な局面の解析結果"""
+        with Tablebase(self.path) as table:
+            self.assertEqual(len(table), self.count)
+            self.assertEqual(table.probe(self.root).outcome, 'win')
+
+            # 隣り合ったまぐろは手番側がすぐに捕獲できる
+            adjacent = make_state({
+                (2, 1): Piece(PieceType.MAGURO, 'first'),
+                (1, 1): Piece(PieceType.MAGURO, 'second'),
+                (3, 0): Piece(PieceType.TAKO, 'first'),
+            }, current_player='second')
+            self.assertEqual(table.probe(adjacent), TablebaseResult('win', 1))
+
+            finished = self.root.copy()
+            finished.game_result = 'first'
+            self.assertIsNone(table.probe(finished))
+
+    def test_values_are_consistent_with_successors(self):
+        """各局面の値が子局面の値と矛盾しない（最短勝ち・最長負け）"""
+        with Tablebase(self.path) as table:
+            for index in range(len(table)):
+                key = table._keys[index]
+                result = table.probe_key(key)
+                wins, losses, others = [], [], 0
+                for child, immediate in _successors(decode_position(key)):
+                    if immediate == 1:
+                        wins.append(1)
+                    elif immediate == -1:
+                        losses.append(1)
+                    elif child is None:
+                        others += 1
+                    else:
+                        child_result = table.probe_key(child)
+                        if child_result.outcome == 'loss':
+                            wins.append(child_result.distance + 1)
+                        elif child_result.outcome == 'win':
+                            losses.append(child_result.distance + 1)
+                        else:
+                            others += 1
+
+                if wins:
+                    self.assertEqual(result, TablebaseResult('win', min(wins)))
+                elif losses and not others:
+                    self.assertEqual(result, TablebaseResult('loss', max(losses)))
+                else:
+                    self.assertEqual(result.outcome, 'draw')
+
+    def test_parallel_solve_matches_serial(self):
+        """複数プロセスでも同じテーブルになる"""
+        parallel_path = os.path.join(self.temp_dir.name, 'parallel.tb')
+        solve_tablebase(parallel_path, roots=[self.root], workers=2, chunk_size=300)
+        with open(self.path, 'rb') as a, open(parallel_path, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import gc
+import random
+import threading
+import tracemalloc
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, parse_move, generate_legal_moves, get_position_text
+from board_game_persistent import freeze_game_state
+from board_game_transition_cache import TransitionCache
+
+
+# 同じ盤面を繰り返して千日手になる手順
+REPETITION = ["ま↑B4A3", "ま↓B1A2", "ま↓A3B4", "ま↑A2B1"] * 2
+
+
+class TestTransitionCache(unittest.TestCase):
+    """遷移キャッシュのテスト"""
+
+    def assert_same_state(self, actual, expected):
+        self.assertEqual(get_position_text(actual), get_position_text(expected))
+        self.assertEqual(list(actual.history), list(expected.history))
+        self.assertEqual(actual.game_result, expected.game_result)
+        self.assertEqual(dict(actual.maguro_in_enemy_territory), dict(expected.maguro_in_enemy_territory))
+        self.assertEqual(actual.turn, expected.turn)
+
+    def play_random(self, cache, seed, persistent):
+        """キャッシュ経由と直接の make_move で同じランダム対局を指して比べる"""
+        rng = random.Random(seed)
+        expected = initialize_game()
+        actual = freeze_game_state(expected) if persistent else initialize_game()
+        while expected.game_result is None and expected.turn < 120:
+            moves = generate_legal_moves(expected)
+            self.assertEqual(cache.legal_moves(actual), moves)
+            move = rng.choice(moves)
+            expected, error = make_move(expected, move)
+            actual, cached_error = cache.make_move(actual, move)
+            self.assertIsNone(cached_error)
+            self.assertIsNone(error)
+            self.assert_same_state(actual, expected)
+
+    def test_matches_make_move(self):
+        """変更可能な状態・永続状態のどちらでも make_move と同じ結果になる（2回目はキャッシュから）"""
+        cache = TransitionCache()
+        for persistent in (False, True):
+            for seed in range(4):
+                self.play_random(cache, seed, persistent)
+        stats = cache.stats()
+        self.assertGreater(stats.hits, 0)
+        self.assertEqual(stats.evictions, 0)
+        self.assertEqual(stats.entries, stats.misses)
+
+    def test_repetition_uses_callers_history(self):
+        """同じ遷移でも呼び出し元の履歴によって千日手の判定が変わる"""
+        cache = TransitionCache()
+        for persistent in (False, True):
+            expected = initialize_game()
+            actual = freeze_game_state(expected) if persistent else initialize_game()
+            for text in REPETITION:
+                move = parse_move(text)
+                expected, _ = make_move(expected, move)
+                actual, error = cache.make_move(actual, move)
+                self.assertIsNone(error)
+                self.assert_same_state(actual, expected)
+            self.assertEqual(actual.game_result, 'draw')
+            self.assertEqual(cache.make_move(actual, parse_move("ま↑B4A3"))[1], "ゲームは既に終了しています")
+
+    def test_maguro_capture(self):
+        """まぐろの捕獲は手番を交代せず即座に勝ちになる"""
+        moves = [parse_move(m) for m in ["ま↑B4A3", "か↓A1A2", "ま↓A3B4", "ま↓B1C2", "か↑C4C3", "ま↓C2B3", "ま↑B4B3"]]
+        cache = TransitionCache()
+        for _ in range(2):
+            expected = initialize_game()
+            actual = initialize_game()
+            for move in moves:
+                expected, _ = make_move(expected, move)
+                actual, _ = cache.make_move(actual, move)
+                self.assert_same_state(actual, expected)
+            self.assertEqual(actual.game_result, 'first')
+            self.assertEqual(actual.current_player, 'first')
+
+    def test_illegal_move_is_cached(self):
+        """不正な手のエラーもキャッシュし、元の状態を返す"""
+        cache = TransitionCache()
+        game_state = initialize_game()
+        move = parse_move("い↓B3B4")
+        first = cache.make_move(game_state, move)
+        second = cache.make_move(game_state, move)
+        self.assertIsNotNone(first[1])
+        self.assertEqual(first[1], second[1])
+        self.assertIs(second[0], game_state)
+        self.assertEqual(cache.stats().hits, 1)
+
+    def test_lru_eviction(self):
+        """上限を超えると最も古く使われた項目から捨てる"""
+        cache = TransitionCache(max_bytes=10_000)
+        for seed in range(3):
+            self.play_random(cache, seed, False)
+        stats = cache.stats()
+        self.assertGreater(stats.evictions, 0)
+        self.assertLessEqual(stats.bytes, 10_000)
+        self.assertEqual(stats.entries + stats.evictions, stats.misses)
+
+        # 直前に使った項目は残る
+        game_state = initialize_game()
+        cache.legal_moves(game_state)
+        cache.legal_moves(game_state)
+        self.assertEqual(cache.stats().hits, stats.hits + 1)
+        cache.clear()
+        self.assertEqual((cache.stats().entries, cache.stats().bytes), (0, 0))
+
+    def test_memory_stays_under_limit(self):
+        """キャッシュが実際に保持するメモリ（消去で解放される量）が概算バイト数以下で、上限を超えない"""
+        max_bytes = 200_000
+        cache = TransitionCache(max_bytes=max_bytes)
+        tracemalloc.start()
+        try:
+            for seed in range(40):
+                self.play_random(cache, seed, seed % 2 == 0)
+            gc.collect()
+            held = tracemalloc.get_traced_memory()[0]
+            stats = cache.stats()
+            cache.clear()
+            gc.collect()
+            freed = held - tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(stats.evictions, 0)
+        self.assertLessEqual(stats.bytes, max_bytes)
+        self.assertLessEqual(freed, stats.bytes)
+
+    def test_threads(self):
+        """複数スレッドから同時に使っても結果が正しい"""
+        cache = TransitionCache(max_bytes=50_000)
+        failures = []
+
+        def worker(seed):
+            try:
+                self.play_random(cache, seed % 3, seed % 2 == 0)
+            except AssertionError as error:
+                failures.append(error)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+        stats = cache.stats()
+        self.assertLessEqual(stats.bytes, 50_000)
+        self.assertEqual(stats.entries, len(cache._entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
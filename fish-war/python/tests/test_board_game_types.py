@@ -0,0 +1,66 @@
+import copy
+import pickle
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType, Position, Piece, Move, PIECES, SQUARE_POSITIONS, SQUARE_INDEX
+from board_game_logic import (
+    initialize_game, make_move, parse_move, parse_position_text, position_to_index, index_to_position
+)
+from board_game_move_codec import MOVES
+
+
+class TestFlyweightTypes(unittest.TestCase):
+    """共有インスタンス（Position・Piece・Move）のテスト"""
+
+    def test_same_value_is_same_instance(self):
+        """同じ値のコンストラクタ呼び出しは同じインスタンスを返す"""
+        self.assertIs(Position('B', 3), Position(col='B', row=3))
+        self.assertIs(Piece(PieceType.BURI, 'first'), PIECES[(PieceType.BURI, 'first')])
+        move = Move(PieceType.INADA, Position('B', 3), Position('B', 2), False)
+        self.assertIs(move, parse_move("い↑B3B2"))
+        self.assertIn(move, MOVES)
+        self.assertNotEqual(Piece(PieceType.BURI, 'first'), Piece(PieceType.BURI, 'second'))
+        self.assertEqual(repr(Position('A', 1)), "Position(col='A', row=1)")
+
+    def test_copy_and_pickle_keep_identity(self):
+        """コピー・pickle しても同じインスタンスになる"""
+        piece = PIECES[(PieceType.MAGURO, 'second')]
+        self.assertIs(copy.deepcopy(piece), piece)
+        self.assertIs(pickle.loads(pickle.dumps(Position('C', 4))), Position('C', 4))
+        self.assertIs(pickle.loads(pickle.dumps(parse_move("ま*A2"))), parse_move("ま*A2"))
+
+        game_state = initialize_game()
+        copied = game_state.copy()
+        self.assertIsNot(copied.board, game_state.board)
+        self.assertIs(copied.board[0][1], game_state.board[0][1])
+
+    def test_immutable(self):
+        """属性は変更できず、引数が足りなければ TypeError"""
+        with self.assertRaises(AttributeError):
+            Position('A', 1).row = 2
+        with self.assertRaises(TypeError):
+            Position('A')
+
+    def test_square_tables(self):
+        """マス番号と Position・配列インデックスの対応"""
+        for square, position in enumerate(SQUARE_POSITIONS):
+            self.assertEqual(SQUARE_INDEX[position], square)
+            self.assertEqual(position_to_index(position), divmod(square, 3))
+            self.assertIs(index_to_position(*divmod(square, 3)), position)
+        self.assertIsNone(index_to_position(4, 0))
+
+    def test_promotion_uses_shared_piece(self):
+        """出世したコマも共有インスタンス"""
+        game_state = parse_position_text('00まs00いf000000000000まf00 first - - 5')
+        game_state, error = make_move(game_state, parse_move("い↑A2A1"))
+        self.assertIsNone(error)
+        self.assertIs(game_state.board[0][0], PIECES[(PieceType.BURI, 'first')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_types import PieceType
+from board_game_logic import (
+    initialize_game, parse_move, make_move, generate_legal_moves,
+    get_zobrist_key, get_board_hash
+)
+from board_game_session import GameSession
+from board_game_zobrist import compute_zobrist_key
+
+
+def full_key(game_state):
+    """局面のキーを一から計算"""
+    return compute_zobrist_key(game_state.board, game_state.hand_pieces, game_state.current_player)
+
+
+class TestZobrist(unittest.TestCase):
+    """Zobristハッシュのテスト"""
+
+    def test_incremental_update_matches_full_computation(self):
+        """make_move の差分更新が一から計算したキーと一致する"""
+        rng = random.Random(99)
+        for _ in range(30):
+            game_state = initialize_game()
+            while game_state.game_result is None and game_state.turn < 80:
+                moves = generate_legal_moves(game_state)
+                if not moves:
+                    break
+                game_state, error = make_move(game_state, rng.choice(moves))
+                self.assertIsNone(error)
+                self.assertEqual(game_state.zobrist_key, full_key(game_state))
+
+    def test_key_depends_on_side_and_hands(self):
+        """手番と手ゴマがキーに反映される"""
+        game_state = initialize_game()
+        other_side = game_state.copy()
+        other_side.current_player = 'second'
+        self.assertNotEqual(get_zobrist_key(game_state), get_zobrist_key(other_side))
+
+        with_hand = game_state.copy()
+        with_hand.hand_pieces['first'].append(PieceType.TAKO)
+        self.assertNotEqual(get_zobrist_key(game_state), get_zobrist_key(with_hand))
+
+    def test_caches_do_not_outlive_direct_edits(self):
+        """make_move は渡した状態に派生値を保持させず、コピーは派生値を引き継がない"""
+        game_state = initialize_game()
+        new_state, _ = make_move(game_state, parse_move('い↑B3B2'))
+        self.assertEqual(new_state.zobrist_key, full_key(new_state))
+        for state in (game_state, new_state.copy()):
+            self.assertIsNone(state.zobrist_key)
+            self.assertIsNone(state.position_counts)
+            self.assertIsNone(state.piece_locations)
+            state.hand_pieces['first'].append(PieceType.TAKO)
+            self.assertEqual(get_zobrist_key(state), full_key(state))
+
+        # 結果の状態を直接変更したら clear_caches() で破棄する
+        new_state.board[2][1] = None
+        new_state.clear_caches()
+        self.assertEqual(get_zobrist_key(new_state), full_key(new_state))
+
+    def test_undo_restores_key(self):
+        """undo でキーが元に戻る"""
+        session = GameSession()
+        keys = [get_zobrist_key(session.state)]
+        for move_str in ('い↑B3B2', 'た↓C1B2', 'い*A3', 'か↓A1A2'):
+            self.assertIsNone(session.apply(parse_move(move_str)))
+            self.assertEqual(session.state.zobrist_key, full_key(session.state))
+            keys.append(session.state.zobrist_key)
+        keys.pop()
+        while keys:
+            session.undo()
+            self.assertEqual(session.state.zobrist_key, keys.pop())
+
+    def test_string_hash_still_available(self):
+        """従来の文字列ハッシュは履歴に残る"""
+        game_state, _ = make_move(initialize_game(), parse_move('い↑B3B2'))
+        self.assertEqual(game_state.history[-1], get_board_hash(game_state.board))
+
+
+if __name__ == "__main__":
+    unittest.main()
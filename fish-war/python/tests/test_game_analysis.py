@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, parse_move, generate_legal_moves
+from board_game_search import WIN_SCORE
+from board_game_symmetry import Symmetry, transform_move, transform_state
+from game_analysis import iter_annotations, iter_position_analyses, analyse_game, replay_positions, AnalysisCache
+
+
+# 後手が6手目で悪手を指し、先手がまぐろを捕獲して勝つ手順
+FIRST_WINS = ["ま↑B4A3", "か↓A1A2", "ま↓A3B4", "ま↓B1C2", "か↑C4C3", "ま↓C2B3", "ま↑B4B3"]
+# 探索の深さだけで打ち切り、結果を再現可能にする
+OPTIONS = {'movetime_ms': None, 'max_depth': 3}
+
+
+def random_moves(seed, max_plies=30):
+    rng = random.Random(seed)
+    game_state = initialize_game()
+    moves = []
+    while game_state.game_result is None and len(moves) < max_plies:
+        move = rng.choice(generate_legal_moves(game_state))
+        game_state, _ = make_move(game_state, move)
+        moves.append(move)
+    return moves
+
+
+class TestGameAnalysis(unittest.TestCase):
+    """対局の解析のテスト"""
+
+    def test_annotations(self):
+        """1手ごとに評価値・最善手・悪手の判定を付け、最後に結果を返す"""
+        moves = [parse_move(m) for m in FIRST_WINS]
+        annotations = list(iter_annotations(moves, **OPTIONS))
+        self.assertEqual([a['ply'] for a in annotations[:-1]], list(range(1, 8)))
+        self.assertEqual(annotations[-1], {'plies': 7, 'result': 'first'})
+
+        states, error = replay_positions(moves)
+        self.assertIsNone(error)
+        for annotation, state in zip(annotations[:-1], states):
+            self.assertEqual(annotation['player'], state.current_player)
+            self.assertIn(parse_move(annotation['best_move']), generate_legal_moves(state))
+            self.assertEqual(annotation['loss'], annotation['eval_before'] - annotation['eval_after'])
+
+        self.assertTrue(annotations[5]['blunder'])
+        self.assertLessEqual(annotations[5]['eval_after'], -(WIN_SCORE - 10))
+        self.assertEqual(annotations[6]['eval_after'], WIN_SCORE)
+        self.assertEqual(annotations[6]['best_move'], "ま↑B4B3")
+        self.assertFalse(annotations[6]['blunder'])
+
+    def test_illegal_move(self):
+        """不正な手があれば、その前までの解析とエラーを返す"""
+        moves = [parse_move(m) for m in ["ま↑B4A3", "か↓A1A2", "い↓B1B2"]]
+        output = io.StringIO()
+        self.assertEqual(analyse_game(moves, output, **OPTIONS), 2)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual((lines[-1]['ply'], lines[-1]['move']), (3, "い↓B1B2"))
+        self.assertIn('error', lines[-1])
+
+    def test_parallel_matches_serial(self):
+        """並列に解析しても結果と順序は変わらない"""
+        moves = random_moves(2)
+        serial = list(iter_annotations(moves, workers=1, **OPTIONS))
+        parallel = list(iter_annotations(moves, workers=2, **OPTIONS))
+        self.assertEqual(parallel, serial)
+
+    def test_cache_reuses_shared_prefix(self):
+        """途中まで同じ対局や対称な対局の局面は探索し直さず、キャッシュファイルは次回も使える"""
+        moves = random_moves(5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.jsonl')
+            with AnalysisCache(path) as cache:
+                first = list(iter_annotations(moves, cache=cache, **OPTIONS))
+                searched = len(cache)
+                self.assertEqual(cache.hits, 0)
+
+                # 先頭の手が同じ別の対局は、共通部分をキャッシュから使う
+                prefix = moves[:len(moves) // 2]
+                game_state = initialize_game()
+                for move in prefix:
+                    game_state, _ = make_move(game_state, move)
+                other = prefix + [generate_legal_moves(game_state)[-1]]
+                hits = cache.hits
+                annotations = list(iter_annotations(other, cache=cache, **OPTIONS))
+                self.assertGreaterEqual(cache.hits - hits, len(prefix))
+                self.assertEqual(annotations[:len(prefix) - 1], first[:len(prefix) - 1])
+
+                # 対称な局面はすべてキャッシュから使い、最善手は元の局面に合わせて変換する
+                states, _ = replay_positions(moves)
+                originals = list(iter_position_analyses(states, cache=cache, **OPTIONS))
+                misses = cache.misses
+                for symmetry in Symmetry:
+                    transformed = [transform_state(state, symmetry) for state in states]
+                    analyses = list(iter_position_analyses(transformed, cache=cache, **OPTIONS))
+                    for analysis, original in zip(analyses, originals):
+                        if original is None:
+                            self.assertIsNone(analysis)
+                            continue
+                        self.assertEqual(analysis.score, original.score)
+                        self.assertIs(parse_move(analysis.best_move),
+                                      transform_move(parse_move(original.best_move), symmetry))
+                self.assertEqual(cache.misses, misses)
+
+            with AnalysisCache(path) as cache:
+                self.assertGreaterEqual(len(cache), searched)
+                self.assertEqual(list(iter_annotations(moves, cache=cache, **OPTIONS)), first)
+                self.assertEqual(cache.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
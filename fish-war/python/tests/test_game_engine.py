@@ -0,0 +1,127 @@
+import io
+import subprocess
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import initialize_game, make_move, parse_move, generate_legal_moves, format_move
+from game_engine import Engine, run
+
+
+# 先手が勝つ手順
+FIRST_WINS = ["ま↑B4A3", "か↓A1A2", "ま↓A3B4", "ま↓B1C2", "か↑C4C3", "ま↓C2B3", "ま↑B4B3"]
+INITIAL_TEXT = "かsまsたs00いs0000いf00たfまfかf first - - 1"
+
+
+class TestGameEngine(unittest.TestCase):
+    """常駐エンジンのテスト"""
+
+    def setUp(self):
+        self.engine = Engine(tt_size=1 << 12, default_movetime_ms=50)
+
+    def send(self, line):
+        lines = []
+        self.engine.handle(line, lines.append)
+        return lines
+
+    def test_handshake(self):
+        """usi・isready に応答する"""
+        self.assertEqual(self.send("usi")[-1], "usiok")
+        self.assertEqual(self.send("isready"), ["readyok"])
+        self.assertEqual(self.send(""), [])
+        self.assertTrue(self.send("foo")[0].startswith("error "))
+
+    def test_position_and_queries(self):
+        """局面の設定と合法手・結果・局面の問い合わせ"""
+        self.assertEqual(self.send("show"), [f"position {INITIAL_TEXT}"])
+        self.assertEqual(self.send("position startpos moves " + ' '.join(FIRST_WINS[:2])), [])
+        expected = initialize_game()
+        for move in FIRST_WINS[:2]:
+            expected, _ = make_move(expected, parse_move(move))
+        self.assertEqual(self.send("legal"), [' '.join(['legal'] + [format_move(m) for m in generate_legal_moves(expected)])])
+        self.assertEqual(self.send("result"), ["result none"])
+
+        self.send("moves " + ' '.join(FIRST_WINS[2:]))
+        self.assertEqual(self.send("result"), ["result first"])
+        self.assertEqual(self.send("legal"), ["legal"])
+        self.assertEqual(self.send("go"), ["bestmove none"])
+
+        self.send(f"position text {INITIAL_TEXT} moves い↑B3B2")
+        self.assertEqual(self.engine.state.turn, 2)
+        self.assertTrue(self.send("position text 00 first - - 1")[0].startswith("error 局面"))
+
+    def test_position_reuses_common_moves(self):
+        """同じ開始局面なら前回の手順との共通部分は再生し直さない"""
+        self.send("position startpos moves " + ' '.join(FIRST_WINS[:4]))
+        records = list(self.engine.session.undo_stack)
+        self.send("position startpos moves " + ' '.join(FIRST_WINS[:5]))
+        self.assertEqual(self.engine.session.undo_stack[:4], records)
+        self.assertEqual(len(self.engine.session.undo_stack), 5)
+
+        # 途中から別の手順にすると、分かれた手以降だけを置き換える
+        self.send("position startpos moves " + ' '.join(FIRST_WINS[:2] + ["ま↑A3A2"]))
+        self.assertEqual(self.engine.session.undo_stack[:2], records[:2])
+        expected = initialize_game()
+        for move in FIRST_WINS[:2] + ["ま↑A3A2"]:
+            expected, _ = make_move(expected, parse_move(move))
+        self.assertEqual(self.engine.state.turn, 4)
+        self.assertEqual(self.engine.state.board, expected.board)
+        self.assertEqual(self.engine.state.history, expected.history)
+
+    def test_illegal_move_stops_before_it(self):
+        """手順に不正な手があればエラーを返し、その手の前まで進める"""
+        lines = self.send("position startpos moves ま↑B4A3 い↓B1B2 ま↓A3B4")
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith("error 2手目 い↓B1B2"))
+        self.assertEqual(self.engine.state.turn, 2)
+        self.assertTrue(self.send("position startpos moves xx")[0].startswith("error 手の形式"))
+        self.assertEqual(self.engine.state.turn, 2)
+
+    def test_go(self):
+        """探索は深さごとの info と最善手を返す"""
+        self.send("position startpos")
+        lines = self.send("go depth 3")
+        self.assertEqual([line.split()[2] for line in lines[:-1]], ['1', '2', '3'])
+        self.assertTrue(all(line.startswith("info depth ") and " pv " in line for line in lines[:-1]))
+        bestmove = lines[-1].split()
+        self.assertEqual(bestmove[0], "bestmove")
+        self.assertIn(parse_move(bestmove[1]), generate_legal_moves(initialize_game()))
+
+        # 1手で勝てる局面は詰みの評価値を返す
+        self.send("position startpos moves " + ' '.join(FIRST_WINS[:6]))
+        lines = self.send("go movetime 200")
+        self.assertIn("score mate 1", lines[0])
+        self.assertEqual(lines[-1], "bestmove ま↑B4B3")
+        self.assertTrue(self.send("go depth x")[0].startswith("error "))
+
+    def test_run_loop(self):
+        """標準入出力のループは quit で終了する"""
+        output = io.StringIO()
+        run(self.engine, io.StringIO("isready\nposition startpos moves ま↑B4A3\nresult\nquit\nisready\n"), output)
+        self.assertEqual(output.getvalue(), "readyok\nresult none\n")
+
+    def test_subprocess(self):
+        """別プロセスのエンジンと1行ずつやり取りできる"""
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).parent.parent / "src" / "game_engine.py")],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding='utf-8'
+        )
+        try:
+            for _ in range(3):
+                process.stdin.write("isready\n")
+                process.stdin.flush()
+                self.assertEqual(process.stdout.readline(), "readyok\n")
+            process.stdin.write("quit\n")
+            process.stdin.flush()
+            self.assertEqual(process.wait(10), 0)
+        finally:
+            process.kill()
+            process.stdin.close()
+            process.stdout.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
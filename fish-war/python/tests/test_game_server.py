@@ -0,0 +1,178 @@
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from game_server import GameServer, Connection
+from game_load_client import run_load
+
+
+# 先手が勝つ手順
+FIRST_WINS = ["ま↑B4A3", "か↓A1A2", "ま↓A3B4", "ま↓B1C2", "か↑C4C3", "ま↓C2B3", "ま↑B4B3"]
+
+
+class FakeTransport:
+    """送信内容を記録するだけのトランスポート"""
+
+    def __init__(self):
+        self.written = []
+
+    def set_write_buffer_limits(self, high=None):
+        pass
+
+    def is_closing(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def write(self, data):
+        self.written.append(data.decode('utf-8'))
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    """対局サーバーのテスト"""
+
+    async def asyncSetUp(self):
+        self.server = GameServer()
+        self.port = await self.server.start('127.0.0.1', 0)
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for _, writer in self.clients:
+            writer.close()
+        await self.server.close()
+
+    async def connect(self):
+        client = await asyncio.open_connection('127.0.0.1', self.port)
+        self.clients.append(client)
+        return client
+
+    async def send(self, client, line):
+        client[1].write((line + '\n').encode('utf-8'))
+        await client[1].drain()
+
+    async def receive(self, client):
+        raw = await asyncio.wait_for(client[0].readline(), 5)
+        return raw.decode('utf-8').rstrip('\n')
+
+    async def test_two_player_game(self):
+        """2人で参加して指し、観戦者にも局面が届き、終局が通知される"""
+        first, second, spectator = await self.connect(), await self.connect(), await self.connect()
+        await self.send(first, "NEW")
+        self.assertEqual(await self.receive(first), "OK NEW 1 first")
+        await self.send(first, "MOVE ま↑B4A3")
+        self.assertEqual(await self.receive(first), "ERR 相手がまだ参加していません")
+
+        await self.send(second, "JOIN 1")
+        self.assertEqual(await self.receive(second), "OK JOIN 1 second")
+        initial = "STATE 1 - - - かsまsたs00いs0000いf00たfまfかf first - - 1"
+        self.assertEqual(await self.receive(first), initial)
+        self.assertEqual(await self.receive(second), initial)
+        await self.send(spectator, "WATCH 1")
+        self.assertEqual(await self.receive(spectator), "OK WATCH 1")
+        self.assertEqual(await self.receive(spectator), initial)
+
+        await self.send(second, "MOVE か↓A1A2")
+        self.assertEqual(await self.receive(second), "ERR 相手の手番です")
+        await self.send(first, "MOVE い↓B3B4")
+        self.assertTrue((await self.receive(first)).startswith("ERR "))
+        await self.send(first, "MOVE あいう")
+        self.assertTrue((await self.receive(first)).startswith("ERR 手の形式"))
+
+        for ply, move in enumerate(FIRST_WINS):
+            player = first if ply % 2 == 0 else second
+            await self.send(player, f"MOVE {move}")
+            for client in (first, second, spectator):
+                line = await self.receive(client)
+                self.assertTrue(line.startswith("STATE 1 "), line)
+        self.assertEqual(line.split()[2], 'first')
+        self.assertEqual(await self.receive(first), "END 1 first move")
+        self.assertEqual(await self.receive(second), "END 1 first move")
+        self.assertEqual(self.server.games, {})
+        self.assertEqual(self.server.moves_played, len(FIRST_WINS))
+
+    async def test_timeout_and_resign(self):
+        """持ち時間切れと投了で終局する"""
+        client = await self.connect()
+        await self.send(client, "NEW 0.1 hotseat")
+        self.assertEqual(await self.receive(client), "OK NEW 1 hotseat")
+        state = (await self.receive(client)).split()
+        self.assertEqual(state[3:5], ['100', '100'])
+        await self.send(client, "MOVE ま↑B4A3")
+        self.assertTrue((await self.receive(client)).startswith("STATE 1 - "))
+        self.assertTrue((await self.receive(client)).startswith("STATE 1 first "))
+        self.assertEqual(await self.receive(client), "END 1 first timeout")
+
+        await self.send(client, "NEW hotseat")
+        self.assertEqual(await self.receive(client), "OK NEW 2 hotseat")
+        await self.receive(client)
+        await self.send(client, "RESIGN")
+        self.assertTrue((await self.receive(client)).startswith("STATE 2 second "))
+        self.assertEqual(await self.receive(client), "END 2 second resign")
+
+    async def test_illegal_move_does_not_charge_time_twice(self):
+        """不正な手の後に指した手では、手番の開始からの時間を一度だけ差し引く"""
+        client = await self.connect()
+        await self.send(client, "NEW 1.0 hotseat")
+        self.assertEqual(await self.receive(client), "OK NEW 1 hotseat")
+        await self.receive(client)
+        await asyncio.sleep(0.2)
+        await self.send(client, "MOVE い↓B3B4")
+        self.assertTrue((await self.receive(client)).startswith("ERR "))
+        await asyncio.sleep(0.2)
+        await self.send(client, "MOVE ま↑B4A3")
+        state = (await self.receive(client)).split()
+        self.assertGreater(int(state[3]), 500)
+        self.assertLessEqual(int(state[3]), 600)
+        self.assertGreater(int(state[4]), 990)
+
+    async def test_disconnect_loses(self):
+        """対局中に切断すると相手の勝ち"""
+        first, second = await self.connect(), await self.connect()
+        await self.send(first, "NEW")
+        await self.receive(first)
+        await self.send(second, "JOIN 1")
+        await self.receive(second)
+        await self.receive(second)
+        await self.send(first, "QUIT")
+        self.assertTrue((await self.receive(second)).startswith("STATE 1 second "))
+        self.assertEqual(await self.receive(second), "END 1 second disconnect")
+
+    async def test_join_with_invalid_game_number(self):
+        """数字として解釈できない対局番号には ERR を返す"""
+        client = await self.connect()
+        for argument in ("²", "x1", ""):
+            await self.send(client, f"JOIN {argument}".rstrip())
+            self.assertTrue((await self.receive(client)).startswith("ERR "))
+        await self.send(client, "WATCH ²")
+        self.assertEqual(await self.receive(client), "ERR 対局がありません: ²")
+
+    async def test_slow_spectator_gets_latest_state_only(self):
+        """送信が詰まった観戦者には対局ごとに最新の局面だけを送る"""
+        connection = Connection(self.server)
+        transport = FakeTransport()
+        connection.connection_made(transport)
+        connection.publish(1, "STATE 1 a")
+        connection.pause_writing()
+        for line in ["STATE 1 b", "STATE 2 x", "STATE 1 c"]:
+            connection.publish(int(line.split()[1]), line)
+        connection.send("OK WATCH 3")
+        self.assertEqual(transport.written, ["STATE 1 a\n", "OK WATCH 3\n"])
+        connection.resume_writing()
+        self.assertEqual(transport.written[-1], "STATE 1 c\nSTATE 2 x\n")
+
+    async def test_load_client(self):
+        """負荷試験クライアントが対局を指し続けて応答時間を集計する"""
+        stats = await run_load('127.0.0.1', self.port, sessions=5, duration=0.5, spectators=1, stalled_spectators=1)
+        self.assertEqual(stats.connected, 5)
+        self.assertEqual(stats.errors, 0)
+        self.assertGreater(len(stats.latencies), 50)
+        self.assertEqual(stats.latencies, sorted(stats.latencies))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# srcディレクトリをPythonパスに追加
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from board_game_logic import parse_position_text, get_position_text, make_move, parse_move
+from self_play import run_self_play, play_self_play_game, load_policy, random_policy, PROGRESS_FILE
+
+
+def read_records(out_dir):
+    records = []
+    for name in sorted(os.listdir(out_dir)):
+        if name.startswith('shard-'):
+            with open(os.path.join(out_dir, name), encoding='utf-8') as f:
+                records.extend(json.loads(line) for line in f)
+    return records
+
+
+class TestSelfPlay(unittest.TestCase):
+    """自己対局データ生成のテスト"""
+
+    def test_game_is_reproducible(self):
+        """同じシードとゲーム番号なら同じ棋譜になる"""
+        task = (3, 'random', 'random', 7, 60)
+        self.assertEqual(play_self_play_game(task), play_self_play_game(task))
+        self.assertNotEqual(play_self_play_game(task)[1], play_self_play_game((4, 'random', 'random', 7, 60))[1])
+
+    def test_search_policy_game_is_reproducible(self):
+        """探索の方策でも、前に別の対局を行ったかによらず同じ棋譜になる"""
+        task = (1, 'search:2', 'random', 5, 30)
+        fresh = play_self_play_game(task)
+        play_self_play_game((2, 'search:2', 'random', 5, 30))
+        self.assertEqual(play_self_play_game(task), fresh)
+
+    def test_records_replay(self):
+        """レコードの局面に手を適用すると次のレコードの局面になる"""
+        _, lines, plies = play_self_play_game((0, 'random', 'random', 1, 80))
+        records = [json.loads(line) for line in lines.splitlines()]
+        self.assertEqual(len(records), plies)
+        for current, following in zip(records, records[1:]):
+            state = parse_position_text(current['position'])
+            next_state, error = make_move(state, parse_move(current['move']))
+            self.assertIsNone(error)
+            self.assertEqual(get_position_text(next_state), following['position'])
+        self.assertEqual(len({record['outcome'] for record in records}), 1)
+
+    def test_resume_after_crash(self):
+        """途中で中断しても再実行で重複・欠落なく同じ出力になる"""
+        with tempfile.TemporaryDirectory() as fresh, tempfile.TemporaryDirectory() as resumed:
+            run_self_play(fresh, 12, seed=2, max_plies=40, shard_size=4096)
+
+            run_self_play(resumed, 5, seed=2, max_plies=40, shard_size=4096, checkpoint_interval=2)
+            # 記録後に書きかけのデータが残った状態を再現する
+            with open(os.path.join(resumed, PROGRESS_FILE), encoding='utf-8') as f:
+                progress = json.load(f)
+            with open(os.path.join(resumed, f"shard-{progress['shard']:05d}.jsonl"), 'a', encoding='utf-8') as f:
+                f.write('{"game": 99, "ply": 0, "posi')
+            run_self_play(resumed, 12, seed=2, max_plies=40, shard_size=4096)
+
+            fresh_records = read_records(fresh)
+            self.assertEqual(fresh_records, read_records(resumed))
+            self.assertEqual(sorted({record['game'] for record in fresh_records}), list(range(12)))
+            self.assertGreater(len([name for name in os.listdir(fresh) if name.startswith('shard-')]), 1)
+
+    def test_load_policy(self):
+        """方策を名前とモジュールパスで読み込める"""
+        self.assertIs(load_policy('random'), random_policy)
+        self.assertIs(load_policy('self_play:random_policy'), random_policy)
+        with self.assertRaises(ValueError):
+            load_policy('unknown')
+
+
+if __name__ == "__main__":
+    unittest.main()